@@ -0,0 +1,171 @@
+import threading
+from bisect import bisect_right, insort
+from collections import OrderedDict
+
+from django.conf import settings
+
+
+class _BufferProyecto:
+    """Mensajes serializados de un proyecto ordenados por id."""
+
+    __slots__ = ('ids', 'mensajes', 'desde_id', 'version')
+
+    def __init__(self):
+        self.ids = []
+        self.mensajes = {}
+        # Cursor a partir del cual el buffer es completo (None = cargando)
+        self.desde_id = None
+        # Versión de mensajes del proyecto (VersionRecurso) con la que coincide
+        self.version = None
+
+
+class BufferChat:
+    """
+    Ring buffer en memoria de los últimos mensajes por proyecto.
+
+    Invariante: si ``desde_id`` no es None, el buffer contiene TODOS los mensajes
+    del proyecto con id > desde_id hasta la versión ``version`` de VersionRecurso.
+    El buffer es por proceso: sólo ve los mensajes creados aquí con
+    ``crear_mensaje_validado``, que avanzan la versión sólo si es la siguiente a la
+    suya. Una lectura con otra versión (escrituras de otros procesos) es un miss y
+    el buffer se descarta para recargarlo.
+    """
+
+    def __init__(self, tamano=None, max_proyectos=None):
+        self.tamano = tamano or getattr(settings, 'CHAT_BUFFER_TAMANO', 200)
+        self.max_proyectos = max_proyectos or getattr(settings, 'CHAT_BUFFER_MAX_PROYECTOS', 100)
+        self._lock = threading.Lock()
+        self._proyectos = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _obtener(self, proyecto_id, crear=False):
+        buffer = self._proyectos.get(proyecto_id)
+        if buffer is not None:
+            self._proyectos.move_to_end(proyecto_id)
+        elif crear:
+            buffer = self._proyectos[proyecto_id] = _BufferProyecto()
+            while len(self._proyectos) > self.max_proyectos:
+                self._proyectos.popitem(last=False)
+        return buffer
+
+    def _insertar(self, buffer, mensaje):
+        mensaje_id = mensaje['id']
+        if mensaje_id in buffer.mensajes:
+            return
+        if buffer.desde_id is not None and mensaje_id <= buffer.desde_id:
+            return
+        insort(buffer.ids, mensaje_id)
+        buffer.mensajes[mensaje_id] = mensaje
+
+        # Recortar por el frente y avanzar el cursor de cobertura
+        exceso = len(buffer.ids) - self.tamano
+        if exceso > 0:
+            descartados = buffer.ids[:exceso]
+            del buffer.ids[:exceso]
+            for descartado_id in descartados:
+                del buffer.mensajes[descartado_id]
+            if buffer.desde_id is not None:
+                buffer.desde_id = max(buffer.desde_id, descartados[-1])
+
+    def agregar(self, proyecto_id, mensaje, version=None):
+        """
+        Añade un mensaje serializado. Sólo afecta a proyectos ya cargados.
+        `version` es la que dejó la escritura del mensaje: si es la siguiente a la del
+        buffer no hubo escrituras de otros procesos en medio y el buffer sigue al día.
+        """
+        with self._lock:
+            buffer = self._obtener(proyecto_id)
+            if buffer is not None:
+                self._insertar(buffer, mensaje)
+                if version is not None and buffer.version is not None and version == buffer.version + 1:
+                    buffer.version = version
+
+    def leer(self, proyecto_id, desde_id, limite, version):
+        """
+        Returns: list de mensajes con id > desde_id, o None si el cursor está frío
+        o el buffer no está en `version` (si va atrasado se descarta)
+        """
+        with self._lock:
+            buffer = self._obtener(proyecto_id)
+            if buffer is not None and buffer.version is not None and buffer.version < version:
+                del self._proyectos[proyecto_id]
+                buffer = None
+            if (buffer is None or buffer.desde_id is None or buffer.version != version
+                    or desde_id < buffer.desde_id):
+                self.misses += 1
+                return None
+            self.hits += 1
+            inicio = bisect_right(buffer.ids, desde_id)
+            return [buffer.mensajes[i] for i in buffer.ids[inicio:inicio + limite]]
+
+    def cobertura(self, proyecto_id):
+        """
+        Returns: tuple (desde_id, mensajes en el buffer, version),
+        o None si el proyecto no está cargado
+        """
+        with self._lock:
+            buffer = self._proyectos.get(proyecto_id)
+            if buffer is None or buffer.desde_id is None:
+                return None
+            return buffer.desde_id, len(buffer.ids), buffer.version
+
+    def iniciar_carga(self, proyecto_id):
+        """
+        Crea el buffer vacío antes de consultar la BD para no perder escrituras concurrentes.
+        Returns: bool, True si el proyecto no estaba cargado
+        """
+        with self._lock:
+            if proyecto_id in self._proyectos:
+                return False
+            self._obtener(proyecto_id, crear=True)
+            return True
+
+    def completar_carga(self, proyecto_id, mensajes, version):
+        """
+        Integra los últimos mensajes leídos de la BD (orden ascendente), que incluyen
+        al menos todo lo escrito hasta `version` (leída antes de la consulta).
+        Si la BD devolvió menos que ``tamano`` el buffer cubre todo el historial.
+        """
+        with self._lock:
+            buffer = self._obtener(proyecto_id)
+            if buffer is None or buffer.desde_id is not None:
+                return
+            buffer.version = version
+            if len(mensajes) < self.tamano:
+                buffer.desde_id = 0
+            else:
+                buffer.desde_id = mensajes[0]['id'] - 1
+            for mensaje_id in [i for i in buffer.ids if i <= buffer.desde_id]:
+                buffer.ids.remove(mensaje_id)
+                del buffer.mensajes[mensaje_id]
+            for mensaje in mensajes:
+                self._insertar(buffer, mensaje)
+
+    def descartar(self, proyecto_id):
+        """Olvida el buffer de un proyecto (p.ej. si falló la carga)"""
+        with self._lock:
+            self._proyectos.pop(proyecto_id, None)
+
+    def limpiar(self):
+        with self._lock:
+            self._proyectos.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def estadisticas(self):
+        """Contadores para dimensionar el buffer"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / total, 4) if total else None,
+                'proyectos': len(self._proyectos),
+                'mensajes': sum(len(b.ids) for b in self._proyectos.values()),
+                'tamano': self.tamano,
+                'max_proyectos': self.max_proyectos,
+            }
+
+
+buffer_chat = BufferChat()
@@ -0,0 +1,179 @@
+import re
+
+from django.db import connection, transaction
+from django.utils.html import escape
+
+# Tablas FTS5 (migraciones 0005, 0006 y 0013), rowid = id del modelo.
+# Las sincronizan los signals de app/signals.py.
+TABLA_FTS_EXPERTOS = 'app_experto_fts'
+TABLA_FTS_MENSAJES = 'app_mensajechat_fts'
+TABLA_FTS_ITEMS = 'app_itemtormentaideas_fts'
+
+# INSERT ... SELECT que genera las filas de cada tabla (alias "e" para filtrar por id)
+_FILAS_FTS = {
+    TABLA_FTS_EXPERTOS: f'''
+        INSERT INTO {TABLA_FTS_EXPERTOS}(rowid, nombre, cargo_actual, departamento, categoria, grado_cientifico)
+        SELECT e.id, u.first_name || ' ' || u.last_name,
+               e.cargo_actual, e.departamento, e.categoria, e.grado_cientifico
+        FROM app_experto e JOIN auth_user u ON u.id = e.usuario_id
+    ''',
+    TABLA_FTS_MENSAJES: f'''
+        INSERT INTO {TABLA_FTS_MENSAJES}(rowid, contenido, proyecto_id)
+        SELECT e.id, e.contenido, e.proyecto_id FROM app_mensajechat e
+    ''',
+    TABLA_FTS_ITEMS: f'''
+        INSERT INTO {TABLA_FTS_ITEMS}(rowid, titulo, descripcion, proyecto_id)
+        SELECT e.id, e.titulo, e.descripcion, e.proyecto_id FROM app_itemtormentaideas e
+    ''',
+}
+
+# Marcas de resaltado fuera del texto normal; se convierten a <mark> tras escapar el HTML
+_INICIO_MARCA = '\x02'
+_FIN_MARCA = '\x03'
+
+_tablas_fts = {}
+
+
+def fts_disponible(tabla):
+    """
+    Indica si existe la tabla FTS5 (SQLite compilado con FTS5 y migración aplicada).
+    El resultado positivo se recuerda por proceso.
+    """
+    if _tablas_fts.get(tabla):
+        return True
+    if connection.vendor != 'sqlite':
+        return False
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [tabla]
+        )
+        existe = cursor.fetchone() is not None
+    if existe:
+        _tablas_fts[tabla] = True
+    return existe
+
+
+def terminos_busqueda(texto, maximo=8):
+    """Palabras de la búsqueda del usuario (sin operadores ni comillas)"""
+    return re.findall(r'\w+', texto or '')[:maximo]
+
+
+def expresion_fts(terminos):
+    """
+    Consulta MATCH segura: cada término entre comillas y por prefijo, todos requeridos.
+    Así la entrada del usuario nunca se interpreta como sintaxis FTS5.
+    """
+    return ' '.join(f'"{termino}"*' for termino in terminos)
+
+
+def buscar_fts(tabla, terminos, pesos, limite, filtro_sql='', parametros=()):
+    """
+    Busca en una tabla FTS5 ordenando por bm25 (menor = más relevante).
+
+    Args:
+        pesos: peso bm25 de cada columna, en el orden de la tabla
+        filtro_sql: condición adicional sobre la tabla FTS (ej: 'AND proyecto_id = %s')
+    Returns: list de (rowid, rank)
+    """
+    columnas_peso = ', '.join(str(float(peso)) for peso in pesos)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT rowid, bm25({tabla}, {columnas_peso}) AS rank FROM {tabla} '
+            f'WHERE {tabla} MATCH %s {filtro_sql} ORDER BY rank LIMIT %s',
+            [expresion_fts(terminos), *parametros, limite]
+        )
+        return cursor.fetchall()
+
+
+def expresion_fts_proyecto(terminos, proyecto_id):
+    """
+    Consulta MATCH restringida a un proyecto: el proyecto_id es un token de su propia
+    columna indexada y los términos sólo se buscan en el resto de columnas.
+    """
+    return f'proyecto_id : "{int(proyecto_id)}" AND - proyecto_id : ({expresion_fts(terminos)})'
+
+
+def buscar_fts_proyecto(tabla, terminos, proyecto_id, columnas, antes_de_id=None, limite=20):
+    """
+    Busca en una tabla FTS5 con columna proyecto_id, de la más reciente a la más antigua.
+    El proyecto se filtra dentro del MATCH (migración 0013), así que no se recorren
+    las coincidencias de los demás proyectos.
+    El orden por rowid es estable mientras llegan filas nuevas (bm25 no lo es),
+    así que sirve de cursor: la página siguiente son los ids < antes_de_id.
+
+    Args:
+        columnas: list de (índice de columna, tokens de fragmento o None para el texto completo)
+    Returns: list de tuplas (rowid, fragmento resaltado por columna...)
+    """
+    fragmentos = ', '.join(
+        f"highlight({tabla}, {indice}, '{_INICIO_MARCA}', '{_FIN_MARCA}')" if tokens is None
+        else f"snippet({tabla}, {indice}, '{_INICIO_MARCA}', '{_FIN_MARCA}', '…', {int(tokens)})"
+        for indice, tokens in columnas
+    )
+    filtro, parametros = '', [expresion_fts_proyecto(terminos, proyecto_id)]
+    if antes_de_id:
+        filtro = 'AND rowid < %s'
+        parametros.append(antes_de_id)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT rowid, {fragmentos} FROM {tabla} '
+            f'WHERE {tabla} MATCH %s {filtro} '
+            f'ORDER BY rowid DESC LIMIT %s',
+            [*parametros, limite]
+        )
+        return cursor.fetchall()
+
+
+def resaltar_html(fragmento):
+    """Escapa el texto del usuario y convierte las marcas de FTS5 en <mark>"""
+    return escape(fragmento or '').replace(_INICIO_MARCA, '<mark>').replace(_FIN_MARCA, '</mark>')
+
+
+def resaltar_like(texto, terminos):
+    """Resaltado equivalente para el fallback sin FTS5"""
+    html = escape(texto or '')
+    if not terminos:
+        return html
+    patron = re.compile('|'.join(re.escape(termino) for termino in terminos), re.IGNORECASE)
+    return patron.sub(lambda m: f'<mark>{m.group(0)}</mark>', html)
+
+
+def _en_bloques(ids, tamano=500):
+    ids = list(ids)
+    for inicio in range(0, len(ids), tamano):
+        yield ids[inicio:inicio + tamano]
+
+
+def indexar(tabla, ids):
+    """Reescribe las filas FTS de esos ids (dentro de la transacción en curso)"""
+    if not fts_disponible(tabla):
+        return
+    with connection.cursor() as cursor:
+        for bloque in _en_bloques(ids):
+            marcas = ', '.join(['%s'] * len(bloque))
+            cursor.execute(f'DELETE FROM {tabla} WHERE rowid IN ({marcas})', bloque)
+            cursor.execute(f'{_FILAS_FTS[tabla]} WHERE e.id IN ({marcas})', bloque)
+
+
+def desindexar(tabla, ids):
+    if not fts_disponible(tabla):
+        return
+    with connection.cursor() as cursor:
+        for bloque in _en_bloques(ids):
+            marcas = ', '.join(['%s'] * len(bloque))
+            cursor.execute(f'DELETE FROM {tabla} WHERE rowid IN ({marcas})', bloque)
+
+
+def reconstruir_indice(tabla):
+    """
+    Regenera un índice completo (tras cargas con bulk_create/update(), que no emiten signals).
+    Returns: int, filas indexadas; None si no hay FTS5
+    """
+    if not fts_disponible(tabla):
+        return None
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {tabla}')
+        cursor.execute(_FILAS_FTS[tabla])
+        return cursor.rowcount
@@ -0,0 +1,145 @@
+import threading
+
+# Pesos y valores A/M/B por defecto: única definición, la usan el cálculo
+# por encuesta, el cálculo por lotes y la validación de perfiles
+PESOS_K = {
+    'analisis_teoricos': 0.20,
+    'experiencia': 0.15,
+    'autores_nacionales': 0.10,
+    'autores_extranjeros': 0.15,
+    'conocimiento_extranjero': 0.20,
+    'intuicion': 0.10,
+    'conocimiento_materia': 0.10
+}
+
+# Convertir letras a valores numéricos
+VALOR_INFLUENCIA = {
+    'A': 3.0,  # Alto
+    'M': 2.0,  # Medio
+    'B': 1.0   # Bajo
+}
+
+# Columnas de influencia en el orden en que se suman
+CAMPOS_INFLUENCIA_K = [
+    ('influencia_analisis_teoricos', 'analisis_teoricos'),
+    ('influencia_experiencia', 'experiencia'),
+    ('influencia_autores_nacionales', 'autores_nacionales'),
+    ('influencia_autores_extranjeros', 'autores_extranjeros'),
+    ('influencia_conocimiento_extranjero', 'conocimiento_extranjero'),
+    ('influencia_intuicion', 'intuicion'),
+]
+
+CAMPOS_COEFICIENTE_K = [campo for campo, _ in CAMPOS_INFLUENCIA_K] + ['conocimiento_materia']
+
+
+def validar_perfil_k(pesos, valores_influencia):
+    """
+    Verifica que un perfil tenga todos los pesos y valores A/M/B.
+    Returns: tuple (valido: bool, error: str)
+    """
+    if not isinstance(pesos, dict) or set(pesos) != set(PESOS_K):
+        return False, f'Los pesos deben incluir exactamente: {", ".join(PESOS_K)}'
+    if not isinstance(valores_influencia, dict) or set(valores_influencia) != set(VALOR_INFLUENCIA):
+        return False, 'Los valores de influencia deben incluir A, M y B'
+
+    for valor in [*pesos.values(), *valores_influencia.values()]:
+        if isinstance(valor, bool) or not isinstance(valor, (int, float)) or valor < 0:
+            return False, 'Los pesos y valores deben ser números no negativos'
+    if not max(valores_influencia.values()):
+        return False, 'Algún valor de influencia debe ser mayor que 0'
+
+    return True, None
+
+
+class CalculadoraK:
+    """
+    Calculadora de K compilada a partir de un perfil de pesos.
+
+    Todo lo que no depende de la encuesta (pares campo/peso, mapa A/M/B,
+    escala) se resuelve una vez al construirla. Con el perfil por defecto
+    produce exactamente los mismos valores que la fórmula original.
+    """
+
+    def __init__(self, pesos=None, valores_influencia=None, perfil_id=None, version=0):
+        pesos = pesos or PESOS_K
+        valores = valores_influencia or VALOR_INFLUENCIA
+        self.perfil_id = perfil_id
+        self.version = version
+        self._influencias = tuple((campo, pesos[clave]) for campo, clave in CAMPOS_INFLUENCIA_K)
+        self._peso_materia = pesos['conocimiento_materia']
+        self._valores = dict(valores)
+        # Letras desconocidas cuentan como Medio; se normaliza contra el valor máximo
+        self._valor_defecto = valores['M']
+        self._maximo = max(valores.values())
+
+    def __call__(self, encuesta):
+        """Calcula K de una encuesta y registra el perfil que lo produjo"""
+        try:
+            total = 0
+            for campo, peso in self._influencias:
+                total += self._valores.get(getattr(encuesta, campo), self._valor_defecto) * peso
+
+            # Conocimiento de materia (0-10)
+            total += (encuesta.conocimiento_materia / 10) * self._peso_materia
+
+            # Normalizar a 0-100
+            encuesta.coeficiente_k = round(total * 100 / self._maximo, 2)
+
+        except (TypeError, ValueError):
+            encuesta.coeficiente_k = 0.00
+
+        encuesta.perfil_k_id = self.perfil_id
+        return encuesta
+
+    def calcular_lote(self, columnas):
+        """
+        Calcula K para muchas encuestas en una sola pasada por columnas.
+        Suma en el mismo orden y redondea con round() de Python para producir
+        exactamente los mismos valores que el cálculo por encuesta.
+
+        Args:
+            columnas: dict campo -> secuencia de valores (ver CAMPOS_COEFICIENTE_K)
+        Returns: list de coeficientes K (float) en el orden de las filas
+        """
+        materia = columnas['conocimiento_materia']
+        totales = [0] * len(materia)
+        for campo, peso in self._influencias:
+            totales = [
+                t + self._valores.get(letra, self._valor_defecto) * peso
+                for t, letra in zip(totales, columnas[campo])
+            ]
+
+        # Sin conocimiento_materia el cálculo por encuesta devuelve 0
+        return [
+            round((total + (conocimiento / 10) * self._peso_materia) * 100 / self._maximo, 2)
+            if conocimiento is not None else 0.00
+            for total, conocimiento in zip(totales, materia)
+        ]
+
+
+class RegistroCalculadorasK:
+    """
+    Calculadoras compiladas por perfil, en memoria del proceso.
+    Los perfiles son inmutables (cambiar pesos crea una versión nueva),
+    así que una calculadora compilada nunca queda obsoleta.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calculadoras = {}
+
+    def obtener(self, perfil_id, version, pesos, valores_influencia):
+        calculadora = self._calculadoras.get(perfil_id)
+        if calculadora is None:
+            calculadora = CalculadoraK(pesos, valores_influencia, perfil_id=perfil_id, version=version)
+            with self._lock:
+                calculadora = self._calculadoras.setdefault(perfil_id, calculadora)
+        return calculadora
+
+    def limpiar(self):
+        with self._lock:
+            self._calculadoras.clear()
+
+
+calculadora_k_por_defecto = CalculadoraK()
+calculadoras_k = RegistroCalculadorasK()
@@ -0,0 +1,60 @@
+import hashlib
+from functools import wraps
+
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from .models import VersionRecurso
+
+
+def etag_version(*partes):
+    """ETag fuerte a partir de la versión y de lo que cambie el contenido (ruta, query string)"""
+    return quote_etag(hashlib.md5('|'.join(str(parte) for parte in partes).encode()).hexdigest()[:20])
+
+
+def no_modificado(request, etag, fecha=None):
+    """
+    Returns: HttpResponseNotModified si el cliente ya tiene esta versión
+    (If-None-Match / If-Modified-Since), si no None
+    """
+    return get_conditional_response(
+        request, etag=etag, last_modified=int(fecha.timestamp()) if fecha else None
+    )
+
+
+def marcar_version(response, etag, fecha=None):
+    """Cabeceras de validación: el navegador guarda la respuesta pero revalida siempre"""
+    response['ETag'] = etag
+    if fecha:
+        response['Last-Modified'] = http_date(fecha.timestamp())
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def respuesta_condicional(ambito, clave='proyecto_id'):
+    """
+    GET condicional con la versión del recurso en VersionRecurso: si el ETag del
+    cliente coincide se responde 304 con una sola consulta, sin ejecutar la vista
+    (ni sus comprobaciones ni su serialización). El ETag incluye la ruta completa,
+    así que cubre parámetros como el cursor o el experto de la URL.
+    """
+    def decorador(vista):
+        @wraps(vista)
+        def envoltura(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return vista(request, *args, **kwargs)
+            
+            version, fecha = VersionRecurso.objects.obtener(ambito, kwargs[clave])
+            # La vista puede reutilizarla en vez de volver a consultarla
+            request.version_recurso = version
+            etag = etag_version(ambito, kwargs[clave], version, request.get_full_path())
+            respuesta = no_modificado(request, etag, fecha)
+            if respuesta is not None:
+                return respuesta
+            
+            response = vista(request, *args, **kwargs)
+            if response.status_code == 200:
+                marcar_version(response, etag, fecha)
+            return response
+        return envoltura
+    return decorador
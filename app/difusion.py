@@ -0,0 +1,54 @@
+import asyncio
+import threading
+from collections import defaultdict
+
+
+class DifusorChat:
+    """
+    Difusión en proceso de mensajes nuevos del chat por proyecto.
+
+    Cada conexión SSE se suscribe con una cola asyncio ligada a su event loop.
+    Los escritores (vistas síncronas) publican el id del mensaje y se notifica
+    a los suscriptores de forma thread-safe.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._suscriptores = defaultdict(set)
+
+    def suscribir(self, proyecto_id):
+        """Registra una nueva cola para el proyecto. Debe llamarse dentro de un event loop."""
+        cola = asyncio.Queue()
+        entrada = (asyncio.get_running_loop(), cola)
+        with self._lock:
+            self._suscriptores[proyecto_id].add(entrada)
+        return entrada
+
+    def cancelar(self, proyecto_id, entrada):
+        """Elimina la suscripción al cerrarse la conexión"""
+        with self._lock:
+            suscriptores = self._suscriptores.get(proyecto_id)
+            if suscriptores is None:
+                return
+            suscriptores.discard(entrada)
+            if not suscriptores:
+                del self._suscriptores[proyecto_id]
+
+    def publicar(self, proyecto_id, mensaje_id):
+        """Notifica a todos los suscriptores del proyecto que hay un mensaje nuevo"""
+        with self._lock:
+            suscriptores = list(self._suscriptores.get(proyecto_id, ()))
+
+        for loop, cola in suscriptores:
+            try:
+                loop.call_soon_threadsafe(cola.put_nowait, mensaje_id)
+            except RuntimeError:
+                # El loop ya fue cerrado; la suscripción se limpia al terminar el stream
+                pass
+
+    def total_suscriptores(self, proyecto_id):
+        with self._lock:
+            return len(self._suscriptores.get(proyecto_id, ()))
+
+
+difusor_chat = DifusorChat()
@@ -0,0 +1,208 @@
+import json
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from ...models import (
+    Experto, Proyecto, EncuestaSatisfaccion, ListaChequeo, ItemTormentaIdeas, MensajeChat, VotoItem,
+    ConteoVotosItem
+)
+from ...sinteticos import generar_datos
+from ...sqlite import base_temporal
+
+
+def parametros_escala(expertos):
+    """Tamaño del conjunto de datos para una escala (número de expertos)"""
+    return {
+        'expertos': expertos,
+        'proyectos': max(2, expertos // 50),
+        'expertos_por_proyecto': min(20, expertos),
+        'mensajes': expertos * 20,
+        'items_por_proyecto': 40,
+        'votantes_por_item': 5,
+    }
+
+
+def casos_benchmark(client, proyecto, moderador, experto):
+    """
+    Vistas GET y métodos de lectura de app/models.py a medir.
+    Returns: list de (nombre, callable)
+    """
+    def vista(nombre, *args):
+        url = reverse(f'app:{nombre}', args=args)
+
+        def ejecutar():
+            response = client.get(url)
+            if response.status_code != 200:
+                raise CommandError(f'{url} respondió {response.status_code}')
+        return f'vista:{nombre}', ejecutar
+
+    return [
+        vista('inicio_investigador'),
+        vista('expertos_totales', proyecto.id),
+        vista('pagina_expertos', proyecto.id),
+        vista('expertos_finales', proyecto.id),
+        vista('detalle_experto', experto.id),
+        vista('dashboard_experto', experto.id),
+        vista('obtener_mensajes_ajax', proyecto.id, experto.id),
+        vista('votar_items', proyecto.id, experto.id),
+        vista('chat_moderador', proyecto.id, moderador.id),
+        ('Proyecto.objects.con_estadisticas', lambda: list(Proyecto.objects.con_estadisticas())),
+        ('Experto.objects.pagina_catalogo', lambda: Experto.objects.pagina_catalogo(proyecto, 'coeficiente')),
+        ('Experto.objects.buscar', lambda: Experto.objects.buscar('ana red', proyecto)),
+        ('Experto.calcular_dashboard_data', lambda: experto.calcular_dashboard_data()),
+        ('EncuestaSatisfaccion.objects.get_dashboard_encuestas',
+         lambda: EncuestaSatisfaccion.objects.get_dashboard_encuestas(experto)),
+        ('EncuestaSatisfaccion.objects.recalcular_coeficientes_k',
+         lambda: EncuestaSatisfaccion.objects.recalcular_coeficientes_k(proyecto.id, aplicar=False, todas=True)),
+        ('ListaChequeo.objects.get_dashboard_chats', lambda: ListaChequeo.objects.get_dashboard_chats(experto)),
+        ('MensajeChat.objects.obtener_recientes', lambda: list(MensajeChat.objects.obtener_recientes(proyecto.id))),
+        ('MensajeChat.objects.buscar', lambda: MensajeChat.objects.buscar(proyecto.id, 'riesgo')),
+        ('ItemTormentaIdeas.objects.buscar', lambda: ItemTormentaIdeas.objects.buscar(proyecto.id, 'costo')),
+        ('ItemTormentaIdeas.objects.get_items_votacion_context',
+         lambda: [list(valor) if hasattr(valor, 'iterator') else valor
+                  for valor in ItemTormentaIdeas.objects.get_items_votacion_context(proyecto, experto).values()]),
+        ('VotoItem.objects.get_resultados_por_item', lambda: VotoItem.objects.get_resultados_por_item(proyecto.id)),
+        ('ConteoVotosItem.objects.calcular_desde_votos',
+         lambda: ConteoVotosItem.objects.calcular_desde_votos(proyecto.id)),
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        'Mide vistas y métodos de los managers a varias escalas de datos sintéticos '
+        '(generados en una base SQLite temporal, no en la configurada) y guarda los resultados en JSON'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--escalas', default='200,2000,20000',
+            help='Número de expertos de cada escala, separados por comas'
+        )
+        parser.add_argument('--repeticiones', type=int, default=5)
+        parser.add_argument('--salida', help='Archivo JSON donde guardar los resultados')
+        parser.add_argument('--comparar', help='JSON de una ejecución anterior con el que comparar')
+        parser.add_argument(
+            '--umbral', type=float, default=1.25,
+            help='Cociente de medianas a partir del cual se reporta una regresión'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            escalas = [int(escala) for escala in options['escalas'].split(',')]
+        except ValueError:
+            raise CommandError('--escalas debe ser una lista de enteros separados por comas')
+
+        resultados = {
+            'commit': self.commit_actual(),
+            'fecha': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'repeticiones': options['repeticiones'],
+            'escalas': {},
+        }
+        with base_temporal():
+            for escala in escalas:
+                self.stdout.write(self.style.MIGRATE_HEADING(f'Escala {escala} expertos'))
+                resultados['escalas'][str(escala)] = self.medir_escala(escala, options['repeticiones'])
+
+        if options['salida']:
+            with open(options['salida'], 'w', encoding='utf-8') as archivo:
+                json.dump(resultados, archivo, ensure_ascii=False, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Resultados guardados en {options['salida']}"))
+
+        if options['comparar']:
+            with open(options['comparar'], encoding='utf-8') as archivo:
+                self.comparar(json.load(archivo), resultados, options['umbral'])
+
+    def commit_actual(self):
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    def medir_escala(self, escala, repeticiones):
+        parametros = parametros_escala(escala)
+        with transaction.atomic():
+            inicio = time.perf_counter()
+            filas = generar_datos(**parametros)
+            generacion = time.perf_counter() - inicio
+
+            # Un proyecto generado con moderador y algún otro seleccionado
+            proyecto = Proyecto.objects.filter(
+                lista_chequeo_expertos__es_moderador=True
+            ).order_by('-id').first()
+            miembros = ListaChequeo.objects.filter(proyecto=proyecto, estado='seleccionado')
+            moderador = miembros.get(es_moderador=True).experto
+            experto = (miembros.exclude(es_moderador=True).first() or miembros.first()).experto
+
+            casos = {}
+            with override_settings(ALLOWED_HOSTS=['testserver']):
+                for nombre, ejecutar in casos_benchmark(Client(), proyecto, moderador, experto):
+                    casos[nombre] = self.medir_caso(ejecutar, repeticiones)
+                    self.stdout.write(
+                        f"  {nombre:55} {casos[nombre]['mediana_ms']:9.2f} ms  "
+                        f"{casos[nombre]['consultas']:3} consultas"
+                    )
+
+            # Cada escala parte de la base temporal vacía
+            transaction.set_rollback(True)
+
+        return {
+            'parametros': parametros,
+            'filas': filas,
+            'generacion_s': round(generacion, 2),
+            'casos': casos,
+        }
+
+    def medir_caso(self, ejecutar, repeticiones):
+        """Mide en frío respecto a la cache (se limpia antes de cada ejecución)"""
+        tiempos = []
+        consultas = 0
+        for _ in range(max(1, repeticiones)):
+            cache.clear()
+            with CaptureQueriesContext(connection) as capturadas:
+                inicio = time.perf_counter()
+                ejecutar()
+                tiempos.append((time.perf_counter() - inicio) * 1000)
+            consultas = len(capturadas)
+        return {
+            'mediana_ms': round(statistics.median(tiempos), 3),
+            'min_ms': round(min(tiempos), 3),
+            'max_ms': round(max(tiempos), 3),
+            'consultas': consultas,
+        }
+
+    def comparar(self, anterior, actual, umbral):
+        """Reporta los casos cuya mediana creció más que el umbral respecto a la ejecución anterior"""
+        self.stdout.write(self.style.MIGRATE_HEADING(f"Comparación con {anterior.get('commit') or 'anterior'}"))
+        regresiones = 0
+        for escala, datos in actual['escalas'].items():
+            casos_anteriores = anterior.get('escalas', {}).get(escala, {}).get('casos', {})
+            for nombre, caso in datos['casos'].items():
+                previo = casos_anteriores.get(nombre)
+                if not previo or not previo['mediana_ms']:
+                    continue
+                cociente = caso['mediana_ms'] / previo['mediana_ms']
+                linea = (
+                    f"  [{escala}] {nombre}: {previo['mediana_ms']:.2f} -> {caso['mediana_ms']:.2f} ms "
+                    f"(x{cociente:.2f}), consultas {previo['consultas']} -> {caso['consultas']}"
+                )
+                if cociente > umbral or caso['consultas'] > previo['consultas']:
+                    regresiones += 1
+                    self.stdout.write(self.style.WARNING(linea))
+                else:
+                    self.stdout.write(linea)
+
+        if regresiones:
+            self.stdout.write(self.style.WARNING(f'{regresiones} posibles regresiones.'))
+        else:
+            self.stdout.write(self.style.SUCCESS('Sin regresiones.'))
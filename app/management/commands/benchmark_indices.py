@@ -0,0 +1,116 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from ...models import EncuestaSatisfaccion, ListaChequeo, ItemTormentaIdeas, MensajeChat, VotoItem
+from ...sinteticos import generar_datos
+from ...sqlite import base_temporal
+
+# Índices de la migración 0007 que se comparan contra la base (FKs y unique_together)
+INDICES_CONSULTAS = [
+    'mensaje_proyecto_id_idx',
+    'lista_moderador_idx',
+    'lista_experto_estado_idx',
+    'item_proyecto_estado_idx',
+    'encuesta_experto_estado_idx',
+    'voto_proyecto_experto_idx',
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Genera datos sintéticos en una base SQLite temporal (no toca la configurada) y compara '
+        'los planes (EXPLAIN) y tiempos de las consultas frecuentes con y sin los índices compuestos'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--mensajes', type=int, default=1_000_000, help='Mensajes de chat a generar')
+        parser.add_argument('--expertos', type=int, default=500, help='Expertos a generar')
+        parser.add_argument('--repeticiones', type=int, default=20, help='Ejecuciones por consulta')
+
+    def handle(self, *args, **options):
+        with base_temporal(), transaction.atomic():
+            parametros = self.generar_datos(options['mensajes'], options['expertos'])
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+
+            con_indices = self.medir(parametros, options['repeticiones'])
+            with connection.cursor() as cursor:
+                for nombre in INDICES_CONSULTAS:
+                    cursor.execute(f'DROP INDEX IF EXISTS {nombre}')
+                cursor.execute('ANALYZE')
+            sin_indices = self.medir(parametros, options['repeticiones'])
+
+            # La base temporal se descarta al salir: revertir evita confirmar el lote
+            transaction.set_rollback(True)
+
+        for nombre in con_indices:
+            self.stdout.write(self.style.MIGRATE_HEADING(nombre))
+            for etiqueta, resultados in [('con índices', con_indices), ('sin índices', sin_indices)]:
+                ms, plan = resultados[nombre]
+                self.stdout.write(f'  {etiqueta}: {ms:8.3f} ms  {plan}')
+
+    def generar_datos(self, total_mensajes, total_expertos):
+        """
+        Carga el conjunto sintético (ver app/sinteticos.py) con un proyecto cada 20.000 mensajes.
+        Returns: dict con los ids que usan las consultas medidas
+        """
+        proyectos = max(1, total_mensajes // 20_000)
+        generar_datos(
+            expertos=total_expertos, proyectos=proyectos, expertos_por_proyecto=10,
+            mensajes=total_mensajes, items_por_proyecto=max(1, total_mensajes // 20 // proyectos),
+            votantes_por_item=1, reconstruir_derivados=False
+        )
+
+        lista = ListaChequeo.objects.filter(es_moderador=True).order_by('-proyecto_id').first()
+        proyecto_id = lista.proyecto_id
+        miembro = ListaChequeo.objects.filter(
+            proyecto_id=proyecto_id, estado='seleccionado'
+        ).exclude(es_moderador=True).first() or lista
+        ultimo_mensaje = MensajeChat.objects.filter(proyecto_id=proyecto_id).order_by('-id').values_list(
+            'id', flat=True
+        ).first() or 0
+        return {
+            'proyecto_id': proyecto_id,
+            'experto_id': miembro.experto_id,
+            # Un cliente de polling unos cuantos mensajes por detrás
+            'desde_id': max(0, ultimo_mensaje - 100 * proyectos),
+        }
+
+    def consultas(self, proyecto_id, experto_id, desde_id):
+        """Las formas de consulta que cubren los índices, tal como las construyen los managers"""
+        return {
+            'mensajes_polling': MensajeChat.objects.filter(
+                proyecto_id=proyecto_id, id__gt=desde_id
+            ).order_by('id')[:50],
+            'moderador_proyecto': ListaChequeo.objects.filter(
+                proyecto_id=proyecto_id, es_moderador=True
+            ).order_by(),
+            'chats_experto': ListaChequeo.objects.filter(
+                experto_id=experto_id, estado='seleccionado'
+            ).order_by('-fecha_decision'),
+            'items_votacion': ItemTormentaIdeas.objects.filter(
+                proyecto_id=proyecto_id, estado='seleccionado'
+            ).order_by('-fecha_creacion')[:50],
+            'encuestas_completadas': EncuestaSatisfaccion.objects.filter(
+                experto_id=experto_id, estado='completada'
+            ).order_by('-fecha_respuesta'),
+            'votos_experto': VotoItem.objects.filter(
+                proyecto_id=proyecto_id, experto_id=experto_id
+            ).order_by(),
+        }
+
+    def medir(self, parametros, repeticiones):
+        """Returns: dict consulta -> (mediana en ms, plan de EXPLAIN QUERY PLAN en una línea)"""
+        resultados = {}
+        for nombre, queryset in self.consultas(**parametros).items():
+            plan = '; '.join(linea.split(maxsplit=3)[-1] for linea in queryset.explain().splitlines())
+            tiempos = []
+            for _ in range(max(1, repeticiones)):
+                inicio = time.perf_counter()
+                list(queryset.all())
+                tiempos.append((time.perf_counter() - inicio) * 1000)
+            resultados[nombre] = (statistics.median(tiempos), plan)
+        return resultados
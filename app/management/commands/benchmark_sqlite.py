@@ -0,0 +1,141 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from ...sqlite import aplicar_pragmas
+
+# Réplica mínima de las tablas que tocan el chat (escrituras) y el polling (lecturas)
+ESQUEMA = [
+    'CREATE TABLE lista (proyecto_id INTEGER, experto_id INTEGER, estado TEXT, '
+    'PRIMARY KEY (proyecto_id, experto_id))',
+    'CREATE TABLE mensaje (id INTEGER PRIMARY KEY, proyecto_id INTEGER, experto_id INTEGER, '
+    'contenido TEXT, fecha_envio TEXT)',
+    'CREATE INDEX mensaje_proyecto_id ON mensaje (proyecto_id, id)',
+]
+
+PROYECTOS = 20
+EXPERTOS_POR_PROYECTO = 10
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara el rendimiento de escritores y lectores concurrentes de SQLite con la '
+        'configuración por defecto y con la de settings (SQLITE_PRAGMAS, transaction_mode, timeout)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--segundos', type=float, default=5, help='Duración de cada medición')
+        parser.add_argument('--escritores', type=int, default=4, help='Hilos que envían mensajes')
+        parser.add_argument('--lectores', type=int, default=8, help='Hilos que hacen polling')
+
+    def handle(self, *args, **options):
+        opciones = settings.DATABASES['default'].get('OPTIONS', {})
+        configuraciones = [
+            ('por defecto', {}, 'DEFERRED', 5),
+            ('ajustada', getattr(settings, 'SQLITE_PRAGMAS', {}),
+             opciones.get('transaction_mode', 'DEFERRED'), opciones.get('timeout', 5)),
+        ]
+
+        for nombre, pragmas, modo, timeout in configuraciones:
+            with tempfile.TemporaryDirectory() as directorio:
+                ruta = os.path.join(directorio, 'benchmark.sqlite3')
+                resultado = self.medir(
+                    ruta, pragmas, modo, timeout,
+                    options['segundos'], options['escritores'], options['lectores']
+                )
+
+            segundos = options['segundos']
+            self.stdout.write(self.style.MIGRATE_HEADING(f'{nombre} ({modo}, timeout {timeout}s, {pragmas or "sin PRAGMA"})'))
+            self.stdout.write(
+                f"  escrituras: {resultado['escrituras'] / segundos:10.1f}/s  "
+                f"lecturas: {resultado['lecturas'] / segundos:10.1f}/s  "
+                f"'database is locked': {resultado['bloqueos']}"
+            )
+
+    def conectar(self, ruta, pragmas, timeout):
+        conexion = sqlite3.connect(ruta, timeout=timeout, isolation_level=None, check_same_thread=False)
+        aplicar_pragmas(conexion.cursor(), pragmas)
+        return conexion
+
+    def medir(self, ruta, pragmas, modo, timeout, segundos, escritores, lectores):
+        """Returns: dict con escrituras, lecturas y bloqueos totales"""
+        conexion = self.conectar(ruta, pragmas, timeout)
+        for sentencia in ESQUEMA:
+            conexion.execute(sentencia)
+        conexion.executemany(
+            "INSERT INTO lista VALUES (?, ?, 'seleccionado')",
+            [(p, e) for p in range(PROYECTOS) for e in range(EXPERTOS_POR_PROYECTO)]
+        )
+        conexion.close()
+
+        totales = {'escrituras': 0, 'lecturas': 0, 'bloqueos': 0}
+        lock = threading.Lock()
+        fin = time.monotonic() + segundos
+
+        def escritor(numero):
+            conexion = self.conectar(ruta, pragmas, timeout)
+            escrituras = bloqueos = 0
+            i = 0
+            while time.monotonic() < fin:
+                proyecto_id, experto_id = (numero + i) % PROYECTOS, i % EXPERTOS_POR_PROYECTO
+                i += 1
+                # Igual que crear_mensaje_validado: verifica la membresía y luego inserta
+                try:
+                    conexion.execute(f'BEGIN {modo}')
+                    conexion.execute(
+                        'SELECT estado FROM lista WHERE proyecto_id = ? AND experto_id = ?',
+                        [proyecto_id, experto_id]
+                    ).fetchone()
+                    conexion.execute(
+                        "INSERT INTO mensaje (proyecto_id, experto_id, contenido, fecha_envio) "
+                        "VALUES (?, ?, 'Mensaje de prueba', datetime('now'))",
+                        [proyecto_id, experto_id]
+                    )
+                    conexion.execute('COMMIT')
+                    escrituras += 1
+                except sqlite3.OperationalError as e:
+                    if 'locked' not in str(e):
+                        raise
+                    bloqueos += 1
+                    if conexion.in_transaction:
+                        conexion.execute('ROLLBACK')
+            conexion.close()
+            with lock:
+                totales['escrituras'] += escrituras
+                totales['bloqueos'] += bloqueos
+
+        def lector(numero):
+            conexion = self.conectar(ruta, pragmas, timeout)
+            lecturas = bloqueos = 0
+            desde_id = 0
+            while time.monotonic() < fin:
+                try:
+                    filas = conexion.execute(
+                        'SELECT id, contenido FROM mensaje WHERE proyecto_id = ? AND id > ? '
+                        'ORDER BY id LIMIT 50',
+                        [numero % PROYECTOS, desde_id]
+                    ).fetchall()
+                    if filas:
+                        desde_id = filas[-1][0]
+                    lecturas += 1
+                except sqlite3.OperationalError as e:
+                    if 'locked' not in str(e):
+                        raise
+                    bloqueos += 1
+            conexion.close()
+            with lock:
+                totales['lecturas'] += lecturas
+                totales['bloqueos'] += bloqueos
+
+        hilos = [threading.Thread(target=escritor, args=(n,)) for n in range(escritores)]
+        hilos += [threading.Thread(target=lector, args=(n,)) for n in range(lectores)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        return totales
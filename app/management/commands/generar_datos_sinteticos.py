@@ -0,0 +1,53 @@
+import time
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from ...models import Experto
+from ...sinteticos import generar_datos
+
+
+class Command(BaseCommand):
+    help = (
+        'Genera un conjunto de datos sintético y reproducible (expertos, proyectos, encuestas, '
+        'selecciones, mensajes, items y votos) en una base vacía'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--expertos', type=int, default=1000)
+        parser.add_argument('--proyectos', type=int, default=50)
+        parser.add_argument('--expertos-por-proyecto', type=int, default=20)
+        parser.add_argument('--mensajes', type=int, default=100_000, help='Mensajes de chat en total')
+        parser.add_argument('--items-por-proyecto', type=int, default=40)
+        parser.add_argument('--votantes-por-item', type=int, default=5, help='Votos aproximados por item')
+        parser.add_argument('--semilla', type=int, default=1)
+        parser.add_argument(
+            '--vaciar', action='store_true',
+            help='Vaciar la base (flush) antes de generar si ya tiene expertos'
+        )
+
+    def handle(self, *args, **options):
+        if Experto.objects.exists():
+            if not options['vaciar']:
+                raise CommandError('La base ya tiene expertos; usa --vaciar para generar sobre una base vacía.')
+            call_command('flush', interactive=False, verbosity=0)
+
+        inicio = time.perf_counter()
+        # Una sola transacción: en SQLite es mucho más rápido que confirmar cada lote
+        with transaction.atomic():
+            totales = generar_datos(
+                expertos=options['expertos'],
+                proyectos=options['proyectos'],
+                expertos_por_proyecto=options['expertos_por_proyecto'],
+                mensajes=options['mensajes'],
+                items_por_proyecto=options['items_por_proyecto'],
+                votantes_por_item=options['votantes_por_item'],
+                semilla=options['semilla'],
+            )
+
+        for tabla, total in totales.items():
+            self.stdout.write(f'{tabla}: {total}')
+        self.stdout.write(self.style.SUCCESS(
+            f'{sum(totales.values())} filas generadas en {time.perf_counter() - inicio:.1f} s.'
+        ))
@@ -0,0 +1,383 @@
+import asyncio
+import json
+import math
+import random
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from http.cookiejar import CookieJar
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncClient
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from ...models import Experto, Proyecto, ListaChequeo, EstadisticasExperto
+from ...sinteticos import CATEGORIAS, NOMBRES, APELLIDOS, PALABRAS
+from ...sqlite import base_temporal
+
+# Orden en el que se reportan los endpoints (el de una sesión real)
+ENDPOINTS = [
+    'obtener_mensajes_ajax', 'enviar_mensaje_ajax', 'api_items_moderador',
+    'api_cerrar_tormenta', 'api_guardar_voto', 'api_guardar_votos_lote',
+]
+
+
+def percentil(ordenados, p):
+    """Percentil por rango más cercano sobre una lista ya ordenada"""
+    if not ordenados:
+        return 0.0
+    return ordenados[min(len(ordenados) - 1, max(0, math.ceil(p / 100 * len(ordenados)) - 1))]
+
+
+class Metricas:
+    """Latencias, errores y ventana de tiempo de cada endpoint"""
+
+    def __init__(self):
+        self.latencias = defaultdict(list)
+        self.errores = defaultdict(int)
+        self.ultimo_error = {}
+        self.primera = {}
+        self.ultima = {}
+
+    async def medir(self, endpoint, peticion):
+        """
+        Espera la petición y registra su latencia. Cuenta como error cualquier
+        respuesta >= 400, success=False o excepción de red.
+        Returns: dict con la respuesta JSON (vacío si hubo error)
+        """
+        inicio = time.perf_counter()
+        try:
+            estado, datos = await peticion
+        except Exception as e:
+            estado, datos = 0, {'error': f'{type(e).__name__}: {e}'}
+        fin = time.perf_counter()
+
+        self.latencias[endpoint].append(fin - inicio)
+        self.primera.setdefault(endpoint, inicio)
+        self.ultima[endpoint] = fin
+        if estado >= 400 or estado == 0 or datos.get('success') is False:
+            self.errores[endpoint] += 1
+            self.ultimo_error[endpoint] = f"{estado} {datos.get('error', '')}".strip()
+            return {}
+        return datos
+
+    def resumen(self):
+        """Returns: dict endpoint -> peticiones, rps, tasa de error y p50/p95/p99 en ms"""
+        resumen = {}
+        for endpoint in sorted(self.latencias, key=lambda e: ENDPOINTS.index(e) if e in ENDPOINTS else 99):
+            ordenadas = sorted(self.latencias[endpoint])
+            ventana = self.ultima[endpoint] - self.primera[endpoint]
+            resumen[endpoint] = {
+                'peticiones': len(ordenadas),
+                'rps': round(len(ordenadas) / ventana, 1) if ventana > 0 else None,
+                'errores': self.errores[endpoint],
+                'tasa_error': round(self.errores[endpoint] / len(ordenadas), 4),
+                'p50_ms': round(percentil(ordenadas, 50) * 1000, 2),
+                'p95_ms': round(percentil(ordenadas, 95) * 1000, 2),
+                'p99_ms': round(percentil(ordenadas, 99) * 1000, 2),
+                'ultimo_error': self.ultimo_error.get(endpoint),
+            }
+        return resumen
+
+
+def _json(contenido):
+    try:
+        return json.loads(contenido or b'{}')
+    except ValueError:
+        return {}
+
+
+class ClienteASGI:
+    """Cliente en proceso contra la aplicación ASGI (mismo stack de middleware que uvicorn)"""
+
+    def __init__(self):
+        self.cliente = AsyncClient()
+
+    async def preparar(self, url_chat):
+        pass
+
+    async def get(self, url):
+        response = await self.cliente.get(url)
+        return response.status_code, _json(response.content)
+
+    async def post(self, url, datos):
+        response = await self.cliente.post(url, json.dumps(datos), content_type='application/json')
+        return response.status_code, _json(response.content)
+
+
+class ClienteHTTP:
+    """
+    Cliente HTTP contra un servidor en marcha (runserver, uvicorn...). urllib es
+    bloqueante, así que cada petición va a un hilo del pool compartido.
+    """
+
+    def __init__(self, url_base, hilos):
+        self.url_base = url_base.rstrip('/')
+        self.hilos = hilos
+        self.cookies = CookieJar()
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(self.cookies))
+        self.csrf = ''
+
+    def _peticion(self, url, datos=None):
+        cabeceras = {'Accept': 'application/json'}
+        cuerpo = None
+        if datos is not None:
+            cuerpo = json.dumps(datos).encode()
+            cabeceras.update({'Content-Type': 'application/json', 'X-CSRFToken': self.csrf})
+        peticion = urllib.request.Request(self.url_base + url, data=cuerpo, headers=cabeceras)
+        try:
+            with self.opener.open(peticion, timeout=30) as respuesta:
+                return respuesta.status, respuesta.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read()
+
+    async def _en_hilo(self, url, datos=None):
+        estado, contenido = await asyncio.get_running_loop().run_in_executor(
+            self.hilos, self._peticion, url, datos
+        )
+        return estado, _json(contenido)
+
+    async def preparar(self, url_chat):
+        """La página del chat deja la cookie csrftoken que exigen los POST"""
+        await asyncio.get_running_loop().run_in_executor(self.hilos, self._peticion, url_chat)
+        self.csrf = next((cookie.value for cookie in self.cookies if cookie.name == 'csrftoken'), '')
+
+    async def get(self, url):
+        return await self._en_hilo(url)
+
+    async def post(self, url, datos):
+        return await self._en_hilo(url, datos)
+
+
+def preparar_proyecto(total_expertos, semilla):
+    """
+    Crea un proyecto con la tormenta activa y total_expertos seleccionados;
+    el primero es el moderador. Returns: tuple (proyecto, lista de expertos)
+    """
+    aleatorio = random.Random(semilla)
+    prefijo = f'carga{(User.objects.order_by("-id").values_list("id", flat=True).first() or 0) + 1}'
+    usuarios = User.objects.bulk_create([
+        User(
+            username=f'{prefijo}_{i}', password='!',
+            first_name=aleatorio.choice(NOMBRES), last_name=aleatorio.choice(APELLIDOS)
+        )
+        for i in range(total_expertos)
+    ])
+    expertos = Experto.objects.bulk_create([
+        Experto(
+            usuario=usuario, grado_cientifico=Experto.GRADO_CIENTIFICO_CHOICES[0][0],
+            categoria=aleatorio.choice(CATEGORIAS), coeficiente_experticidad=round(aleatorio.uniform(20, 100), 2),
+        )
+        for usuario in usuarios
+    ])
+    proyecto = Proyecto.objects.create(
+        nombre=f'Prueba de carga {prefijo}', empresa_cliente='Prueba de carga',
+        categoria=expertos[0].categoria, investigador=expertos[0], estado_tormenta='activa',
+    )
+    ListaChequeo.objects.bulk_create([
+        ListaChequeo(proyecto=proyecto, experto=experto, estado='seleccionado', es_moderador=i == 0)
+        for i, experto in enumerate(expertos)
+    ])
+    # bulk_create no emite post_save: filas de estadísticas para que los votos sumen sobre ellas
+    EstadisticasExperto.objects.recalcular([experto.id for experto in expertos])
+    return proyecto, expertos
+
+
+def eliminar_proyecto(proyecto, expertos):
+    """Borra el proyecto (mensajes, items y votos en cascada) y los usuarios creados"""
+    proyecto.delete()
+    User.objects.filter(experto__in=expertos).delete()
+
+
+async def simular_sesion(crear_cliente, proyecto, expertos, opciones, metricas):
+    """
+    Una tormenta de ideas completa: todos los expertos hacen polling del chat y
+    escriben de vez en cuando mientras el moderador crea items; al acabar el
+    tiempo el moderador cierra la tormenta y todos votan todos los items.
+    Returns: dict con la duración de cada fase en segundos
+    """
+    moderador = expertos[0]
+    aleatorio = random.Random(opciones['semilla'])
+    intervalo = opciones['intervalo']
+    items = []
+
+    clientes = {experto.id: crear_cliente() for experto in expertos}
+    await asyncio.gather(*(
+        clientes[experto.id].preparar(reverse('app:chat_proyecto', args=[proyecto.id, experto.id]))
+        for experto in expertos
+    ))
+
+    inicio = time.perf_counter()
+    fin_tormenta = inicio + opciones['segundos']
+
+    async def participar(experto, semilla):
+        aleatorio_experto = random.Random(semilla)
+        cliente = clientes[experto.id]
+        url_mensajes = reverse('app:obtener_mensajes_ajax', args=[proyecto.id, experto.id])
+        url_enviar = reverse('app:enviar_mensaje_ajax', args=[proyecto.id, experto.id])
+        ultimo_id = 0
+        # Los navegadores no abren el chat todos en el mismo instante
+        await asyncio.sleep(aleatorio_experto.uniform(0, intervalo))
+        while time.perf_counter() < fin_tormenta:
+            datos = await metricas.medir(
+                'obtener_mensajes_ajax', cliente.get(f'{url_mensajes}?ultimo_id={ultimo_id}')
+            )
+            if datos.get('mensajes'):
+                ultimo_id = max(mensaje['id'] for mensaje in datos['mensajes'])
+            if aleatorio_experto.random() < opciones['prob_mensaje']:
+                await metricas.medir('enviar_mensaje_ajax', cliente.post(url_enviar, {
+                    'contenido': ' '.join(aleatorio_experto.choices(PALABRAS, k=aleatorio_experto.randint(3, 20)))
+                }))
+            await asyncio.sleep(intervalo * aleatorio_experto.uniform(0.8, 1.2))
+
+    async def moderar():
+        cliente = clientes[moderador.id]
+        url_items = reverse('app:api_items_moderador', args=[proyecto.id])
+        while time.perf_counter() < fin_tormenta:
+            await asyncio.sleep(opciones['intervalo_items'])
+            datos = await metricas.medir('api_items_moderador', cliente.post(url_items, {
+                'moderador_id': moderador.id,
+                'experto_id': aleatorio.choice(expertos).id,
+                'titulo': ' '.join(aleatorio.choices(PALABRAS, k=4)).capitalize(),
+            }))
+            if datos.get('item'):
+                items.append(datos['item']['id'])
+
+    await asyncio.gather(moderar(), *(participar(experto, i) for i, experto in enumerate(expertos)))
+    tormenta = time.perf_counter() - inicio
+
+    await metricas.medir('api_cerrar_tormenta', clientes[moderador.id].post(
+        reverse('app:api_cerrar_tormenta', args=[proyecto.id]), {'moderador_id': moderador.id}
+    ))
+
+    async def votar(experto, semilla):
+        aleatorio_experto = random.Random(semilla)
+        cliente = clientes[experto.id]
+        votos = [
+            {'item_id': item_id, 'de_acuerdo': aleatorio_experto.random() < 0.7,
+             'evaluacion': aleatorio_experto.randint(1, 5)}
+            for item_id in items
+        ]
+        if opciones['votar_en_lote']:
+            if votos:
+                await metricas.medir('api_guardar_votos_lote', cliente.post(
+                    reverse('app:api_guardar_votos_lote', args=[proyecto.id]),
+                    {'experto_id': experto.id, 'votos': votos}
+                ))
+            return
+        for voto in votos:
+            await metricas.medir('api_guardar_voto', cliente.post(
+                reverse('app:api_guardar_voto', args=[proyecto.id, voto['item_id']]),
+                {'experto_id': experto.id, 'de_acuerdo': voto['de_acuerdo'], 'evaluacion': voto['evaluacion']}
+            ))
+
+    inicio_votacion = time.perf_counter()
+    await asyncio.gather(*(votar(experto, i) for i, experto in enumerate(expertos)))
+
+    return {
+        'tormenta_s': round(tormenta, 2),
+        'votacion_s': round(time.perf_counter() - inicio_votacion, 2),
+        'items': len(items),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        'Prueba de carga de una tormenta de ideas: expertos concurrentes haciendo polling y '
+        'escribiendo en el chat, el moderador creando items, cierre y votación. Por defecto '
+        'contra la aplicación ASGI en el propio proceso, sobre una base SQLite temporal. Con --url '
+        'contra un servidor en marcha: los expertos y el proyecto de la prueba se crean en la base '
+        'de datos configurada (la que debe usar ese servidor) y se borran al terminar. '
+        'Reporta rps, p50/p95/p99 y tasa de error por endpoint'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--expertos', default='10,50,100',
+            help='Expertos concurrentes de cada ronda, separados por comas'
+        )
+        parser.add_argument('--segundos', type=float, default=30, help='Duración de la tormenta de ideas')
+        parser.add_argument(
+            '--intervalo', type=float, default=3,
+            help='Segundos entre polls de cada experto (el de chat_proyecto.js)'
+        )
+        parser.add_argument(
+            '--prob-mensaje', type=float, default=0.1,
+            help='Probabilidad de que un experto escriba un mensaje tras cada poll'
+        )
+        parser.add_argument('--intervalo-items', type=float, default=2, help='Segundos entre items del moderador')
+        parser.add_argument(
+            '--votar-en-lote', action='store_true',
+            help='Votar con api_guardar_votos_lote en lugar de un POST por item'
+        )
+        parser.add_argument(
+            '--url',
+            help='URL base de un servidor en marcha, p. ej. http://127.0.0.1:8000 '
+                 '(escribe en la base de datos configurada)'
+        )
+        parser.add_argument('--semilla', type=int, default=1)
+        parser.add_argument('--salida', help='Archivo JSON donde guardar los resultados')
+        parser.add_argument(
+            '--conservar', action='store_true',
+            help='Con --url, no borrar de la base configurada el proyecto y los expertos de la prueba'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            rondas = [int(total) for total in options['expertos'].split(',')]
+        except ValueError:
+            raise CommandError('--expertos debe ser una lista de enteros separados por comas')
+        if min(rondas) < 2:
+            raise CommandError('Cada ronda necesita al menos 2 expertos (moderador y un participante)')
+
+        resultados = {'objetivo': options['url'] or 'asgi', 'rondas': {}}
+        # En el propio proceso no hace falta tocar la base configurada
+        with nullcontext() if options['url'] else base_temporal():
+            for total in rondas:
+                self.stdout.write(self.style.MIGRATE_HEADING(f'{total} expertos concurrentes'))
+                resultados['rondas'][str(total)] = self.ejecutar_ronda(total, options)
+
+        if options['salida']:
+            with open(options['salida'], 'w', encoding='utf-8') as archivo:
+                json.dump(resultados, archivo, ensure_ascii=False, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Resultados guardados en {options['salida']}"))
+
+    def ejecutar_ronda(self, total, options):
+        proyecto, expertos = preparar_proyecto(total, options['semilla'])
+        metricas = Metricas()
+        try:
+            if options['url']:
+                with ThreadPoolExecutor(max_workers=total + 1) as hilos:
+                    fases = asyncio.run(simular_sesion(
+                        lambda: ClienteHTTP(options['url'], hilos), proyecto, expertos, options, metricas
+                    ))
+            else:
+                with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+                    fases = asyncio.run(simular_sesion(ClienteASGI, proyecto, expertos, options, metricas))
+        finally:
+            if not options['conservar']:
+                eliminar_proyecto(proyecto, expertos)
+
+        endpoints = metricas.resumen()
+        self.stdout.write(
+            f"  tormenta {fases['tormenta_s']} s, votación {fases['votacion_s']} s, {fases['items']} items"
+        )
+        self.stdout.write(
+            f"  {'endpoint':25} {'peticiones':>10} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errores':>8}"
+        )
+        for endpoint, datos in endpoints.items():
+            linea = (
+                f"  {endpoint:25} {datos['peticiones']:10} {datos['rps'] or 0:8.1f} {datos['p50_ms']:9.2f} "
+                f"{datos['p95_ms']:9.2f} {datos['p99_ms']:9.2f} {datos['tasa_error']:8.1%}"
+            )
+            if datos['errores']:
+                self.stdout.write(self.style.WARNING(f"{linea}  ({datos['ultimo_error']})"))
+            else:
+                self.stdout.write(linea)
+        return {'fases': fases, 'endpoints': endpoints}
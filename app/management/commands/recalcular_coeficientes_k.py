@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+
+from ...models import EncuestaSatisfaccion
+
+
+class Command(BaseCommand):
+    help = (
+        'Recalcula por lotes el coeficiente K de las encuestas completadas puntuadas con '
+        'una versión de pesos obsoleta y reporta las diferencias'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--proyecto', type=int, help='Limitar a un proyecto')
+        parser.add_argument(
+            '--todas', action='store_true',
+            help='Recalcular también las encuestas ya puntuadas con la versión activa'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Sólo reportar diferencias, sin guardar los coeficientes'
+        )
+
+    def handle(self, *args, **options):
+        diferencias = EncuestaSatisfaccion.objects.recalcular_coeficientes_k(
+            proyecto_id=options['proyecto'],
+            aplicar=not options['dry_run'],
+            todas=options['todas']
+        )
+
+        for diferencia in diferencias:
+            self.stdout.write(
+                f"Encuesta {diferencia['encuesta_id']} "
+                f"(proyecto {diferencia['proyecto_id']}, experto {diferencia['experto_id']}): "
+                f"K {diferencia['actual']} -> {diferencia['nuevo']} "
+                f"(perfil v{diferencia['version_actual']} -> v{diferencia['version_nueva']})"
+            )
+
+        if not diferencias:
+            self.stdout.write(self.style.SUCCESS('Coeficientes K sin diferencias.'))
+        elif options['dry_run']:
+            self.stdout.write(self.style.WARNING(f'{len(diferencias)} encuestas con diferencias.'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'{len(diferencias)} encuestas actualizadas.'))
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from ...models import ConteoVotosItem
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye desde VotoItem los conteos materializados por item y reporta las diferencias'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--proyecto', type=int, help='Limitar a un proyecto')
+        parser.add_argument(
+            '--verificar', action='store_true',
+            help='Sólo reportar diferencias, sin reescribir los conteos'
+        )
+
+    def handle(self, *args, **options):
+        diferencias = ConteoVotosItem.objects.reconstruir(
+            proyecto_id=options['proyecto'],
+            aplicar=not options['verificar']
+        )
+
+        for diferencia in diferencias:
+            self.stdout.write(
+                f"Item {diferencia['item_id']}: "
+                f"esperado={diferencia['esperado']} actual={diferencia['actual']}"
+            )
+
+        if not diferencias:
+            self.stdout.write(self.style.SUCCESS('Conteos sin diferencias.'))
+        elif options['verificar']:
+            self.stdout.write(self.style.WARNING(f'{len(diferencias)} items con diferencias.'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'{len(diferencias)} items corregidos.'))
@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from ...models import EstadisticasExperto
+
+
+class Command(BaseCommand):
+    help = (
+        'Recalcula desde encuestas, items, votos y listas de chequeo los contadores '
+        'desnormalizados del detalle de cada experto'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--experto', type=int, action='append', help='Limitar a uno o más expertos')
+
+    def handle(self, *args, **options):
+        inicio = time.perf_counter()
+        filas = EstadisticasExperto.objects.recalcular(options['experto'])
+        self.stdout.write(self.style.SUCCESS(
+            f'{filas} expertos recalculados en {time.perf_counter() - inicio:.2f} s.'
+        ))
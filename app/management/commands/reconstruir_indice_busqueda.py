@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from ...busqueda import TABLA_FTS_EXPERTOS, TABLA_FTS_MENSAJES, TABLA_FTS_ITEMS, reconstruir_indice
+
+
+class Command(BaseCommand):
+    help = 'Regenera los índices FTS5 de búsqueda (expertos, mensajes del chat e items)'
+
+    def handle(self, *args, **options):
+        for tabla in [TABLA_FTS_EXPERTOS, TABLA_FTS_MENSAJES, TABLA_FTS_ITEMS]:
+            total = reconstruir_indice(tabla)
+
+            if total is None:
+                self.stdout.write(self.style.WARNING(f'{tabla}: FTS5 no disponible, la búsqueda usa LIKE.'))
+            else:
+                self.stdout.write(self.style.SUCCESS(f'{tabla}: {total} filas indexadas.'))
@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from ...models import RecomendacionExperto
+
+
+class Command(BaseCommand):
+    help = (
+        'Actualiza el índice de expertos recomendados por categoría con las decisiones, '
+        'items y votos nuevos desde la última reconstrucción'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--completo', action='store_true',
+            help='Recalcular todo el índice (tras borrados o cambios de categoría de proyectos)'
+        )
+
+    def handle(self, *args, **options):
+        inicio = time.perf_counter()
+        resultado = RecomendacionExperto.objects.reconstruir(completo=options['completo'])
+        duracion = time.perf_counter() - inicio
+
+        modo = 'completa' if resultado['completo'] else 'incremental'
+        self.stdout.write(self.style.SUCCESS(
+            f"Reconstrucción {modo}: {resultado['expertos']} expertos, "
+            f"{resultado['filas']} filas en {duracion:.2f} s."
+        ))
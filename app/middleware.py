@@ -0,0 +1,77 @@
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.http.request import HttpRequest
+
+from .perfilado import PresupuestoConsultasExcedido, iniciar_perfil, logger, perfil_actual, terminar_perfil
+from .routers import fijar_lecturas_en_primaria, restaurar_lecturas
+
+METODOS_SEGUROS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+
+class LecturasPrimariaMiddleware:
+    """
+    Read-your-writes para LecturaEscrituraRouter: los requests que escriben leen de
+    la primaria, y tras un POST la cookie COOKIE mantiene al mismo navegador en la
+    primaria durante LECTURA_FIJAR_SEGUNDOS (lo que tardaría en ponerse al día una réplica).
+    """
+    COOKIE = 'lecturas_primaria'
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest):
+        escribe = request.method not in METODOS_SEGUROS
+        token = fijar_lecturas_en_primaria(escribe or self.COOKIE in request.COOKIES)
+        try:
+            response = self.get_response(request)
+        finally:
+            restaurar_lecturas(token)
+
+        if escribe:
+            response.set_cookie(
+                self.COOKIE, '1',
+                max_age=getattr(settings, 'LECTURA_FIJAR_SEGUNDOS', 5),
+                httponly=True, samesite='Lax'
+            )
+        return response
+
+
+class PerfiladoMiddleware:
+    """
+    Mide consultas SQL (número y tiempo, en todas las conexiones), render de plantillas
+    y tiempo total de cada request, y los expone en la cabecera Server-Timing.
+    Verifica el presupuesto de consultas declarado con @presupuesto_consultas.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest):
+        inicio = time.perf_counter()
+        perfil, token = iniciar_perfil()
+        try:
+            with ExitStack() as conexiones:
+                for alias in connections:
+                    conexiones.enter_context(connections[alias].execute_wrapper(perfil))
+                response = self.get_response(request)
+        finally:
+            terminar_perfil(token)
+
+        if getattr(settings, 'PERFILADO_SERVER_TIMING', True):
+            response['Server-Timing'] = perfil.server_timing(time.perf_counter() - inicio)
+
+        excedido = perfil.presupuesto_excedido()
+        if excedido:
+            logger.warning('Presupuesto de consultas excedido en %s: %s', request.path, excedido)
+            if getattr(settings, 'PRESUPUESTO_CONSULTAS_ESTRICTO', False):
+                raise PresupuestoConsultasExcedido(excedido)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        perfil = perfil_actual()
+        if perfil is not None:
+            perfil.vista = f'{view_func.__module__}.{view_func.__name__}'
+            perfil.presupuesto = getattr(view_func, 'presupuesto_consultas', None)
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Coalesce
+
+
+def poblar_conteos(apps, schema_editor):
+    """Materializa los conteos de los votos ya existentes"""
+    VotoItem = apps.get_model('app', 'VotoItem')
+    ConteoVotosItem = apps.get_model('app', 'ConteoVotosItem')
+
+    filas = VotoItem.objects.values('item_id', 'proyecto_id').annotate(
+        total_votos=Count('id'),
+        votos_de_acuerdo=Count('id', filter=Q(de_acuerdo=True)),
+        total_evaluaciones=Count('evaluacion'),
+        suma_evaluacion=Coalesce(Sum('evaluacion'), 0),
+        suma_cuadrados=Coalesce(Sum(F('evaluacion') * F('evaluacion')), 0),
+        **{
+            f'votos_nivel_{nivel}': Count('id', filter=Q(evaluacion=nivel))
+            for nivel in range(1, 6)
+        }
+    ).order_by()
+
+    ConteoVotosItem.objects.bulk_create(
+        [ConteoVotosItem(**fila) for fila in filas], batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConteoVotosItem',
+            fields=[
+                ('item', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='conteo_votos', serialize=False, to='app.itemtormentaideas')),
+                ('total_votos', models.PositiveIntegerField(default=0)),
+                ('votos_de_acuerdo', models.PositiveIntegerField(default=0)),
+                ('total_evaluaciones', models.PositiveIntegerField(default=0)),
+                ('suma_evaluacion', models.PositiveIntegerField(default=0)),
+                ('suma_cuadrados', models.PositiveIntegerField(default=0)),
+                ('votos_nivel_1', models.PositiveIntegerField(default=0)),
+                ('votos_nivel_2', models.PositiveIntegerField(default=0)),
+                ('votos_nivel_3', models.PositiveIntegerField(default=0)),
+                ('votos_nivel_4', models.PositiveIntegerField(default=0)),
+                ('votos_nivel_5', models.PositiveIntegerField(default=0)),
+                ('proyecto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='conteos_votos', to='app.proyecto')),
+            ],
+            options={
+                'verbose_name': 'Conteo de Votos de Item',
+                'verbose_name_plural': 'Conteos de Votos de Items',
+            },
+        ),
+        migrations.RunPython(poblar_conteos, migrations.RunPython.noop),
+    ]
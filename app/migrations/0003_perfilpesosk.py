@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0002_conteovotositem'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PerfilPesosK',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveIntegerField()),
+                ('nombre', models.CharField(blank=True, help_text='Metodología de experticidad', max_length=100)),
+                ('pesos', models.JSONField()),
+                ('valores_influencia', models.JSONField(help_text='Valor numérico de A, M y B')),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True)),
+                ('proyecto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='perfiles_k', to='app.proyecto')),
+            ],
+            options={
+                'verbose_name': 'Perfil de Pesos K',
+                'verbose_name_plural': 'Perfiles de Pesos K',
+                'ordering': ['proyecto', '-version'],
+                'unique_together': {('proyecto', 'version')},
+            },
+        ),
+        migrations.AddField(
+            model_name='encuestasatisfaccion',
+            name='perfil_k',
+            field=models.ForeignKey(blank=True, help_text='Versión de pesos con la que se calculó coeficiente_k (vacío = por defecto)', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='encuestas', to='app.perfilpesosk'),
+        ),
+    ]
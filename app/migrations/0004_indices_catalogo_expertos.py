@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:48
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0003_perfilpesosk'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='experto',
+            index=models.Index(fields=['categoria', '-coeficiente_experticidad', 'id'], name='experto_cat_coef_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='experto',
+            index=models.Index(fields=['categoria', 'grado_cientifico', 'id'], name='experto_cat_grado_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='experto',
+            index=models.Index(fields=['categoria', '-anos_experiencia', 'id'], name='experto_cat_exp_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='experto',
+            index=models.Index(fields=['-coeficiente_experticidad', 'id'], name='experto_coef_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='experto',
+            index=models.Index(fields=['grado_cientifico', 'id'], name='experto_grado_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='experto',
+            index=models.Index(fields=['-anos_experiencia', 'id'], name='experto_exp_idx'),
+        ),
+        # Orden por nombre: las columnas viven en auth_user
+        migrations.RunSQL(
+            'CREATE INDEX IF NOT EXISTS auth_user_nombre_idx ON auth_user (first_name, last_name, id)',
+            'DROP INDEX IF EXISTS auth_user_nombre_idx',
+        ),
+    ]
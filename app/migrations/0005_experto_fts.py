@@ -0,0 +1,49 @@
+from django.db import migrations
+from django.db.utils import OperationalError
+
+# Búsqueda de texto completo sobre expertos (SQLite FTS5), rowid = app_experto.id.
+# La mantienen los signals de app/signals.py; sin FTS5 la búsqueda usa LIKE.
+
+CREAR_TABLA = '''
+    CREATE VIRTUAL TABLE app_experto_fts USING fts5(
+        nombre, cargo_actual, departamento, categoria, grado_cientifico,
+        tokenize = 'unicode61 remove_diacritics 2'
+    )
+'''
+
+POBLAR = '''
+    INSERT INTO app_experto_fts(rowid, nombre, cargo_actual, departamento, categoria, grado_cientifico)
+    SELECT e.id, u.first_name || ' ' || u.last_name,
+           e.cargo_actual, e.departamento, e.categoria, e.grado_cientifico
+    FROM app_experto e JOIN auth_user u ON u.id = e.usuario_id
+'''
+
+
+def crear_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        try:
+            cursor.execute(CREAR_TABLA)
+        except OperationalError:
+            # SQLite sin FTS5: la búsqueda usará LIKE
+            return
+        cursor.execute(POBLAR)
+
+
+def eliminar_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute('DROP TABLE IF EXISTS app_experto_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0004_indices_catalogo_expertos'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_fts, eliminar_fts),
+    ]
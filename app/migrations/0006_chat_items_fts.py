@@ -0,0 +1,65 @@
+from django.db import migrations
+from django.db.utils import OperationalError
+
+# Búsqueda de texto completo en el historial del chat y en los items (SQLite FTS5).
+# rowid = id del modelo; proyecto_id no se indexa, sólo filtra.
+# La mantienen los signals de app/signals.py; sin FTS5 la búsqueda usa LIKE.
+
+TABLAS = {
+    'app_mensajechat_fts': (
+        '''
+        CREATE VIRTUAL TABLE app_mensajechat_fts USING fts5(
+            contenido, proyecto_id UNINDEXED,
+            tokenize = 'unicode61 remove_diacritics 2'
+        )
+        ''',
+        '''
+        INSERT INTO app_mensajechat_fts(rowid, contenido, proyecto_id)
+        SELECT id, contenido, proyecto_id FROM app_mensajechat
+        ''',
+    ),
+    'app_itemtormentaideas_fts': (
+        '''
+        CREATE VIRTUAL TABLE app_itemtormentaideas_fts USING fts5(
+            titulo, descripcion, proyecto_id UNINDEXED,
+            tokenize = 'unicode61 remove_diacritics 2'
+        )
+        ''',
+        '''
+        INSERT INTO app_itemtormentaideas_fts(rowid, titulo, descripcion, proyecto_id)
+        SELECT id, titulo, descripcion, proyecto_id FROM app_itemtormentaideas
+        ''',
+    ),
+}
+
+
+def crear_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for crear, poblar in TABLAS.values():
+            try:
+                cursor.execute(crear)
+            except OperationalError:
+                # SQLite sin FTS5: la búsqueda usará LIKE
+                return
+            cursor.execute(poblar)
+
+
+def eliminar_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for tabla in TABLAS:
+            cursor.execute(f'DROP TABLE IF EXISTS {tabla}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0005_experto_fts'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_fts, eliminar_fts),
+    ]
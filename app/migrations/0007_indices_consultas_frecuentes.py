@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:55
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0006_chat_items_fts'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='encuestasatisfaccion',
+            index=models.Index(fields=['experto', 'estado', '-fecha_respuesta'], name='encuesta_experto_estado_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='itemtormentaideas',
+            index=models.Index(fields=['proyecto', 'estado', '-fecha_creacion'], name='item_proyecto_estado_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='listachequeo',
+            index=models.Index(condition=models.Q(('es_moderador', True)), fields=['proyecto'], name='lista_moderador_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='listachequeo',
+            index=models.Index(fields=['experto', 'estado', '-fecha_decision'], name='lista_experto_estado_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mensajechat',
+            index=models.Index(fields=['proyecto', 'id'], name='mensaje_proyecto_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='votoitem',
+            index=models.Index(fields=['proyecto', 'experto'], name='voto_proyecto_experto_idx'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0007_indices_consultas_frecuentes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MarcaIndiceRecomendaciones',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ultima_lista_id', models.PositiveIntegerField(default=0)),
+                ('ultimo_item_id', models.PositiveIntegerField(default=0)),
+                ('ultimo_voto_id', models.PositiveIntegerField(default=0)),
+                ('fecha_construccion', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='RecomendacionExperto',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('categoria', models.CharField(max_length=255)),
+                ('encuestas_completadas', models.PositiveIntegerField(default=0)),
+                ('suma_k', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('selecciones', models.PositiveIntegerField(default=0)),
+                ('items_propuestos', models.PositiveIntegerField(default=0)),
+                ('votos_recibidos', models.PositiveIntegerField(default=0)),
+                ('votos_de_acuerdo', models.PositiveIntegerField(default=0)),
+                ('puntuacion', models.FloatField(default=0)),
+                ('experto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recomendaciones', to='app.experto')),
+            ],
+            options={
+                'verbose_name': 'Recomendación de Experto',
+                'verbose_name_plural': 'Recomendaciones de Expertos',
+                'indexes': [models.Index(fields=['categoria', '-puntuacion'], name='recomendacion_categoria_idx')],
+                'unique_together': {('categoria', 'experto')},
+            },
+        ),
+    ]
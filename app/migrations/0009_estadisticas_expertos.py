@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:26
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0008_indice_recomendaciones'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EstadisticasExperto',
+            fields=[
+                ('experto', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='estadisticas', serialize=False, to='app.experto')),
+                ('total_encuestas', models.PositiveIntegerField(default=0)),
+                ('encuestas_completadas', models.PositiveIntegerField(default=0)),
+                ('total_items', models.PositiveIntegerField(default=0)),
+                ('items_activos', models.PositiveIntegerField(default=0)),
+                ('votos_emitidos', models.PositiveIntegerField(default=0)),
+                ('proyectos_seleccionado', models.PositiveIntegerField(default=0)),
+                ('k_promedio', models.DecimalField(blank=True, decimal_places=2, max_digits=5, null=True)),
+                ('version', models.PositiveIntegerField(default=0)),
+                ('fecha_actualizacion', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Estadísticas de Experto',
+                'verbose_name_plural': 'Estadísticas de Expertos',
+            },
+        ),
+    ]
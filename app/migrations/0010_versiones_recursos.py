@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:32
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0009_estadisticas_expertos'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VersionRecurso',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ambito', models.CharField(max_length=30)),
+                ('clave', models.PositiveIntegerField()),
+                ('version', models.PositiveIntegerField(default=0)),
+                ('fecha_actualizacion', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Versión de Recurso',
+                'verbose_name_plural': 'Versiones de Recursos',
+                'unique_together': {('ambito', 'clave')},
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0010_versiones_recursos'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='encuestasatisfaccion',
+            name='fecha_actualizacion',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='encuestasatisfaccion',
+            index=models.Index(fields=['fecha_actualizacion'], name='encuesta_actualizacion_idx'),
+        ),
+    ]
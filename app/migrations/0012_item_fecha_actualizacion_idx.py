@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0011_encuesta_fecha_actualizacion'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='itemtormentaideas',
+            index=models.Index(fields=['fecha_actualizacion'], name='item_actualizacion_idx'),
+        ),
+    ]
@@ -0,0 +1,59 @@
+from django.db import migrations
+
+# proyecto_id pasa a ser columna indexada de las tablas FTS5 del chat y los items:
+# la búsqueda filtra el proyecto dentro del MATCH (intersección de listas de
+# documentos) en vez de leer las coincidencias de todos los proyectos y
+# descartarlas fila a fila por una columna UNINDEXED.
+
+TABLAS = {
+    'app_mensajechat_fts': (
+        'contenido, proyecto_id{}',
+        '''
+        INSERT INTO app_mensajechat_fts(rowid, contenido, proyecto_id)
+        SELECT id, contenido, proyecto_id FROM app_mensajechat
+        ''',
+    ),
+    'app_itemtormentaideas_fts': (
+        'titulo, descripcion, proyecto_id{}',
+        '''
+        INSERT INTO app_itemtormentaideas_fts(rowid, titulo, descripcion, proyecto_id)
+        SELECT id, titulo, descripcion, proyecto_id FROM app_itemtormentaideas
+        ''',
+    ),
+}
+
+
+def recrear_fts(schema_editor, modificador):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for tabla, (columnas, poblar) in TABLAS.items():
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [tabla])
+            if cursor.fetchone() is None:
+                # SQLite sin FTS5: la búsqueda usa LIKE
+                continue
+            cursor.execute(f'DROP TABLE {tabla}')
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE {tabla} USING fts5({columnas.format(modificador)}, "
+                f"tokenize = 'unicode61 remove_diacritics 2')"
+            )
+            cursor.execute(poblar)
+
+
+def indexar_proyecto(apps, schema_editor):
+    recrear_fts(schema_editor, '')
+
+
+def desindexar_proyecto(apps, schema_editor):
+    recrear_fts(schema_editor, ' UNINDEXED')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0012_item_fecha_actualizacion_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(indexar_proyecto, desindexar_proyecto),
+    ]
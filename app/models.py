@@ -1,12 +1,99 @@
-from django.db import models
+import base64
+import binascii
+import json
+import operator
+import time
+from decimal import Decimal
+from functools import reduce
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections, models, router, transaction
+from django.db.models.functions import Coalesce
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
+from .difusion import difusor_chat
+from .buffer_chat import buffer_chat
+from .busqueda import (
+    TABLA_FTS_EXPERTOS, TABLA_FTS_MENSAJES, TABLA_FTS_ITEMS, buscar_fts, buscar_fts_proyecto,
+    fts_disponible, resaltar_html, resaltar_like, terminos_busqueda
+)
+from .coeficiente_k import (
+    CAMPOS_COEFICIENTE_K, VALOR_INFLUENCIA, calculadora_k_por_defecto, calculadoras_k, validar_perfil_k
+)
+from .preseleccion import preseleccionar
+from .recomendaciones import puntuar
+
+def codificar_cursor(valores):
+    """Cursor opaco para paginación por keyset"""
+    return base64.urlsafe_b64encode(json.dumps(valores).encode()).decode()
+
+def decodificar_cursor(cursor):
+    """Raises: ValueError si el cursor está mal formado"""
+    try:
+        valores = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, UnicodeError, json.JSONDecodeError) as e:
+        raise ValueError('Cursor inválido') from e
+    if not isinstance(valores, list):
+        raise ValueError('Cursor inválido')
+    return valores
+
+def buscar_en_proyecto(queryset, tabla, proyecto_id, texto, columnas, campos_like, cursor=None, limite=20):
+    """
+    Búsqueda paginada por cursor dentro de un proyecto, de lo más reciente a lo más antiguo.
+    Usa la tabla FTS5 y, si no existe, un LIKE por término sobre ``campos_like``.
+    
+    Args:
+        columnas: list de (campo, índice FTS, tokens de fragmento o None = texto completo)
+    Returns: tuple (list de (objeto, {campo: html resaltado}), siguiente_cursor)
+    Raises: ValueError si el cursor no es válido
+    """
+    terminos = terminos_busqueda(texto)
+    if not terminos:
+        return [], None
+    
+    antes_de_id = None
+    if cursor:
+        valores = decodificar_cursor(cursor)
+        if len(valores) != 1 or not isinstance(valores[0], int):
+            raise ValueError('Cursor inválido')
+        antes_de_id = valores[0]
+    
+    if fts_disponible(tabla):
+        filas = buscar_fts_proyecto(
+            tabla, terminos, int(proyecto_id),
+            [(indice, tokens) for _, indice, tokens in columnas],
+            antes_de_id, limite + 1
+        )
+        resaltados = {
+            fila[0]: {campo: resaltar_html(fragmento) for (campo, _, _), fragmento in zip(columnas, fila[1:])}
+            for fila in filas
+        }
+        objetos = queryset.in_bulk(list(resaltados)[:limite])
+        pagina = [(objetos[i], resaltados[i]) for i in list(resaltados)[:limite] if i in objetos]
+        hay_mas = len(filas) > limite
+    else:
+        resultados = queryset.filter(proyecto_id=proyecto_id)
+        if antes_de_id:
+            resultados = resultados.filter(id__lt=antes_de_id)
+        for termino in terminos:
+            resultados = resultados.filter(reduce(operator.or_, [
+                models.Q(**{f'{campo}__icontains': termino}) for campo in campos_like
+            ]))
+        objetos = list(resultados.order_by('-id')[:limite + 1])
+        hay_mas = len(objetos) > limite
+        pagina = [
+            (objeto, {campo: resaltar_like(getattr(objeto, campo), terminos) for campo, _, _ in columnas})
+            for objeto in objetos[:limite]
+        ]
+    
+    siguiente = codificar_cursor([pagina[-1][0].id]) if hay_mas and pagina else None
+    return pagina, siguiente
 
 class ProyectoManager(models.Manager):
     def con_estadisticas(self):
         """Devuelve proyectos con estadísticas de expertos seleccionados"""
-        return self.get_queryset().select_related('investigador').annotate(
+        return self.get_queryset().select_related('investigador__usuario').annotate(
             total_expertos_seleccionados=models.Count(
                 'lista_chequeo_expertos',
                 filter=models.Q(lista_chequeo_expertos__estado='seleccionado')
@@ -14,6 +101,29 @@ class ProyectoManager(models.Manager):
         )
 
 class ExpertoManager(models.Manager):
+    DASHBOARD_CACHE_KEY = 'dashboard_experto:{}'
+    
+    @staticmethod
+    def get_dashboard_cache():
+        """Backend de cache configurable (DASHBOARD_CACHE_ALIAS)"""
+        return caches[getattr(settings, 'DASHBOARD_CACHE_ALIAS', 'default')]
+    
+    def invalidar_dashboards(self, experto_ids):
+        """Invalida el dashboard cacheado de los expertos al confirmar la transacción"""
+        keys = [self.DASHBOARD_CACHE_KEY.format(experto_id) for experto_id in set(experto_ids)]
+        if keys:
+            transaction.on_commit(lambda: self.get_dashboard_cache().delete_many(keys))
+    
+    def invalidar_dashboards_proyecto(self, proyecto_id):
+        """Invalida los dashboards de todos los expertos relacionados con un proyecto"""
+        seleccionados = ListaChequeo.objects.filter(
+            proyecto_id=proyecto_id
+        ).order_by().values_list('experto_id', flat=True)
+        encuestados = EncuestaSatisfaccion.objects.filter(
+            proyecto_id=proyecto_id
+        ).order_by().values_list('experto_id', flat=True)
+        self.invalidar_dashboards(seleccionados.union(encuestados))
+    
     def ordenados_por(self, criterio='id'):
         """Ordena expertos según diferentes criterios"""
         queryset = self.get_queryset().select_related('usuario')
@@ -27,31 +137,135 @@ class ExpertoManager(models.Manager):
         
         return queryset.order_by(*orden_map.get(criterio, ('id',)))
     
+    # Claves de orden del catálogo: (campo, descendente). El id desempata y hace la clave única.
+    ORDEN_CATALOGO = {
+        'id': [],
+        'nombre': [('usuario__first_name', False), ('usuario__last_name', False)],
+        'coeficiente': [('coeficiente_experticidad', True)],
+        'grado': [('grado_cientifico', False)],
+        'experiencia': [('anos_experiencia', True)],
+    }
+    
+    @classmethod
+    def claves_orden(cls, orden):
+        return cls.ORDEN_CATALOGO.get(orden, []) + [('id', False)]
+    
     def con_estado_encuesta(self, proyecto, orden='id'):
         """
-        Devuelve expertos con estado_encuesta y ordenamiento aplicado
+        Devuelve expertos con estado_encuesta y ordenamiento aplicado.
+        Una fila por experto: el estado sale de una subconsulta sobre (proyecto, experto).
         """
-        from django.db.models import Case, When, CharField
+        estado = EncuestaSatisfaccion.objects.filter(
+            proyecto=proyecto, experto=models.OuterRef('pk')
+        ).order_by().values('estado')[:1]
         
         queryset = self.get_queryset().select_related('usuario').annotate(
-            estado_encuesta=Case(
-                When(
-                    encuestas_experticidad__proyecto=proyecto,
-                    then='encuestas_experticidad__estado'
-                ),
-                default=None,
-                output_field=CharField()
-            )
+            estado_encuesta=models.Subquery(estado)
         )
+        return queryset.order_by(*[
+            f'-{campo}' if descendente else campo
+            for campo, descendente in self.claves_orden(orden)
+        ])
+    
+    @staticmethod
+    def _condicion_seek(claves, valores):
+        """
+        Filtro "después de la fila (valores)" para paginación por keyset.
+        En SQLite los NULL van primero en orden ascendente y al final en descendente.
+        """
+        condiciones = []
+        iguales = models.Q()
+        for (campo, descendente), valor in zip(claves, valores):
+            if valor is None:
+                # Nada va después de NULL en orden descendente
+                despues = None if descendente else models.Q(**{f'{campo}__isnull': False})
+                igual = models.Q(**{f'{campo}__isnull': True})
+            else:
+                if descendente:
+                    despues = models.Q(**{f'{campo}__lt': valor}) | models.Q(**{f'{campo}__isnull': True})
+                else:
+                    despues = models.Q(**{f'{campo}__gt': valor})
+                igual = models.Q(**{campo: valor})
+            if despues is not None:
+                condiciones.append(iguales & despues)
+            iguales &= igual
         
-        # Aplicar ordenamiento
-        orden_map = {
-            'nombre': ['usuario__first_name', 'usuario__last_name'],
-            'coeficiente': ['-coeficiente_experticidad'],
-            'grado': ['grado_cientifico'],
-            'experiencia': ['-anos_experiencia'],
-        }
-        return queryset.order_by(*orden_map.get(orden, ['id']))
+        return reduce(operator.or_, condiciones)
+    
+    @staticmethod
+    def _valor_clave(experto, campo):
+        valor = experto
+        for atributo in campo.split('__'):
+            valor = getattr(valor, atributo)
+        return str(valor) if isinstance(valor, Decimal) else valor
+    
+    def pagina_catalogo(self, proyecto, orden='id', cursor=None, limite=50):
+        """
+        Página del catálogo de expertos con paginación por keyset (seek):
+        el costo no depende de cuántas páginas se hayan recorrido.
+        
+        Args:
+            cursor: token devuelto por la página anterior (None = primera página)
+        Returns: tuple (expertos: list, siguiente_cursor: str|None)
+        Raises: ValueError si el cursor no es válido para el orden pedido
+        """
+        claves = self.claves_orden(orden)
+        expertos = self.con_estado_encuesta(proyecto, orden)
+        if proyecto.categoria:
+            expertos = expertos.filter(categoria=proyecto.categoria)
+        
+        if cursor:
+            valores = decodificar_cursor(cursor)
+            if len(valores) != len(claves):
+                raise ValueError('Cursor no corresponde al orden solicitado')
+            expertos = expertos.filter(self._condicion_seek(claves, valores))
+        
+        pagina = list(expertos[:limite + 1])
+        siguiente = None
+        if len(pagina) > limite:
+            pagina = pagina[:limite]
+            siguiente = codificar_cursor([self._valor_clave(pagina[-1], campo) for campo, _ in claves])
+        return pagina, siguiente
+
+    # Peso bm25 por columna de app_experto_fts: el nombre pesa más que el resto
+    PESOS_BUSQUEDA = (10.0, 3.0, 2.0, 1.0, 1.0)
+    CAMPOS_BUSQUEDA = [
+        'usuario__first_name', 'usuario__last_name',
+        'cargo_actual', 'departamento', 'categoria', 'grado_cientifico',
+    ]
+
+    def buscar(self, texto, proyecto, limite=50, solo_categoria=False):
+        """
+        Búsqueda de texto libre en nombre, cargo, departamento, categoría y grado.
+        Usa el índice FTS5 (ordenado por relevancia) y, si no existe, un LIKE por término.
+        Returns: list de expertos con estado_encuesta del proyecto
+        """
+        terminos = terminos_busqueda(texto)
+        if not terminos:
+            return []
+
+        expertos = self.con_estado_encuesta(proyecto)
+        if solo_categoria and proyecto.categoria:
+            expertos = expertos.filter(categoria=proyecto.categoria)
+
+        if not fts_disponible(TABLA_FTS_EXPERTOS):
+            for termino in terminos:
+                expertos = expertos.filter(reduce(operator.or_, [
+                    models.Q(**{f'{campo}__icontains': termino}) for campo in self.CAMPOS_BUSQUEDA
+                ]))
+            return list(expertos[:limite])
+
+        filtro, parametros = '', []
+        if solo_categoria and proyecto.categoria:
+            # Filtrar dentro de la consulta FTS para que el límite aplique a la categoría
+            filtro = 'AND rowid IN (SELECT id FROM app_experto WHERE categoria = %s)'
+            parametros = [proyecto.categoria]
+
+        ranking = buscar_fts(
+            TABLA_FTS_EXPERTOS, terminos, self.PESOS_BUSQUEDA, limite, filtro, parametros
+        )
+        posiciones = {experto_id: posicion for posicion, (experto_id, _) in enumerate(ranking)}
+        return sorted(expertos.filter(id__in=posiciones), key=lambda e: posiciones[e.id])
 
 class EncuestaSatisfaccionManager(models.Manager):
     def por_proyecto(self, proyecto):
@@ -79,29 +293,213 @@ class EncuestaSatisfaccionManager(models.Manager):
             from django.http import Http404
             raise Http404("Encuesta no encontrada o no tienes permiso para acceder a ella.")
     
-    def get_dashboard_encuestas(self, experto, proyectos_cerrados):
+    def preseleccionar(self, proyecto_id, total, k_minimo=0, max_por_departamento=None, diversificar=True):
+        """
+        Mejores `total` expertos del proyecto por K con restricciones (ver
+        app/preseleccion.py). Las encuestas se leen en streaming, sin ORDER BY:
+        el top-k se resuelve con heaps acotados, no ordenando todo.
+        Returns: dict con seleccion (list de dicts con nombre), evaluadas y cobertura
+        """
+        filas = self.filter(
+            proyecto_id=proyecto_id, estado='completada', coeficiente_k__gte=k_minimo
+        ).order_by().values_list(
+            'id', 'experto_id', 'coeficiente_k', 'experto__departamento', 'grado_cientifico'
+        ).iterator(chunk_size=2000)
+        seleccion, evaluadas = preseleccionar(
+            filas, total, k_minimo=k_minimo, max_por_departamento=max_por_departamento,
+            diversificar=diversificar
+        )
+        
+        nombres = {
+            experto_id: f'{nombre} {apellido}'.strip()
+            for experto_id, nombre, apellido in Experto.objects.filter(
+                id__in=[elegido['experto_id'] for elegido in seleccion]
+            ).values_list('id', 'usuario__first_name', 'usuario__last_name')
+        }
+        grados = dict(Experto.GRADO_CIENTIFICO_CHOICES)
+        for elegido in seleccion:
+            elegido['nombre'] = nombres.get(elegido['experto_id'], '')
+            elegido['grado_cientifico_display'] = grados.get(elegido['grado_cientifico'], elegido['grado_cientifico'])
+        
+        return {
+            'seleccion': seleccion,
+            'evaluadas': evaluadas,
+            'departamentos': len({elegido['departamento'] for elegido in seleccion}),
+            'grados': len({elegido['grado_cientifico'] for elegido in seleccion}),
+        }
+    
+    def enviar_lote(self, proyecto, experto_ids=None):
+        """
+        Envía encuestas a varios expertos con un solo bulk_create.
+        Sin experto_ids se envía a todos los expertos de la categoría del proyecto.
+        Returns: dict con listas creadas, existentes y no_encontrados
+        Raises: ValueError si no hay experto_ids y el proyecto no tiene categoría
+        """
+        from django.db import IntegrityError
+        
+        expertos = Experto.objects.all()
+        if experto_ids is not None:
+            experto_ids = {int(experto_id) for experto_id in experto_ids}
+            expertos = expertos.filter(id__in=experto_ids)
+        elif proyecto.categoria:
+            expertos = expertos.filter(categoria=proyecto.categoria)
+        else:
+            raise ValueError('El proyecto no tiene categoría')
+        
+        candidatos = list(expertos.order_by('id').values(
+            'id', 'cargo_actual', 'anos_experiencia', 'grado_cientifico'
+        ))
+        
+        for _ in range(2):
+            existentes = set(self.filter(
+                proyecto=proyecto, experto__in=expertos
+            ).order_by().values_list('experto_id', flat=True))
+            
+            nuevas = [
+                self.model(
+                    proyecto=proyecto,
+                    experto_id=c['id'],
+                    cargo_actual=c['cargo_actual'] or '',
+                    anos_experiencia=c['anos_experiencia'],
+                    grado_cientifico=c['grado_cientifico']
+                )
+                for c in candidatos if c['id'] not in existentes
+            ]
+            try:
+                # Sin ignore_conflicts: así `nuevas` es exactamente lo que se insertó
+                with transaction.atomic():
+                    self.bulk_create(nuevas, batch_size=500)
+                break
+            except IntegrityError:
+                # Otro request envió alguna de estas encuestas entre la lectura y la escritura
+                continue
+        else:
+            raise IntegrityError('Conflicto al enviar las encuestas, intenta de nuevo')
+        
+        creadas = [encuesta.experto_id for encuesta in nuevas]
+        # bulk_create no emite post_save
+        Experto.objects.invalidar_dashboards(creadas)
+        EstadisticasExperto.objects.recalcular(creadas)
+        if creadas:
+            VersionRecurso.objects.incrementar(VersionRecurso.AMBITO_ENCUESTAS, [proyecto.id])
+        
+        encontrados = {c['id'] for c in candidatos}
+        return {
+            'creadas': creadas,
+            'existentes': sorted(existentes),
+            'no_encontrados': sorted(experto_ids - encontrados) if experto_ids is not None else [],
+        }
+    
+    def recalcular_coeficientes_k(self, proyecto_id=None, aplicar=True, todas=False):
+        """
+        Recalcula por lotes K de las encuestas completadas con el perfil activo de su proyecto.
+        Por defecto sólo se recalculan las encuestas puntuadas con una versión obsoleta.
+
+        Args:
+            proyecto_id: limitar a un proyecto
+            aplicar: si es False sólo se reportan las diferencias
+            todas: recalcular también las encuestas ya puntuadas con la versión activa
+        Returns: list de dicts con encuesta_id, experto_id, proyecto_id, actual, nuevo
+            y las versiones de perfil (0 = por defecto)
+        """
+        encuestas = self.filter(estado='completada')
+        if proyecto_id:
+            encuestas = encuestas.filter(proyecto_id=proyecto_id)
+        
+        if not todas:
+            perfil_activo = PerfilPesosK.objects.filter(
+                proyecto=models.OuterRef('proyecto')
+            ).order_by('-version').values('id')[:1]
+            encuestas = encuestas.annotate(
+                perfil_activo_id=Coalesce(models.Subquery(perfil_activo), 0),
+                perfil_usado_id=Coalesce('perfil_k', 0),
+            ).filter(
+                models.Q(coeficiente_k__isnull=True)
+                | ~models.Q(perfil_usado_id=models.F('perfil_activo_id'))
+            )
+        
+        filas = list(encuestas.order_by('proyecto_id', 'id').values_list(
+            'id', 'experto_id', 'proyecto_id', 'coeficiente_k', 'perfil_k__version',
+            *CAMPOS_COEFICIENTE_K
+        ))
+        if not filas:
+            return []
+        
+        por_proyecto = {}
+        for fila in filas:
+            por_proyecto.setdefault(fila[2], []).append(fila)
+        perfiles = PerfilPesosK.objects.activos(por_proyecto)
+        
+        diferencias = []
+        for proyecto, filas_proyecto in por_proyecto.items():
+            perfil = perfiles.get(proyecto)
+            calculadora = perfil.get_calculadora() if perfil else calculadora_k_por_defecto
+            columnas = list(zip(*filas_proyecto))
+            coeficientes = calculadora.calcular_lote(dict(zip(CAMPOS_COEFICIENTE_K, columnas[5:])))
+            
+            for (encuesta_id, experto_id, _, actual, version, *_), nuevo in zip(filas_proyecto, coeficientes):
+                nuevo = Decimal(str(nuevo)).quantize(Decimal('0.01'))
+                if actual != nuevo or (version or 0) != calculadora.version:
+                    diferencias.append({
+                        'encuesta_id': encuesta_id,
+                        'experto_id': experto_id,
+                        'proyecto_id': proyecto,
+                        'actual': actual,
+                        'nuevo': nuevo,
+                        'version_actual': version or 0,
+                        'version_nueva': calculadora.version,
+                        'perfil_k_id': calculadora.perfil_id,
+                    })
+        
+        if aplicar and diferencias:
+            with transaction.atomic():
+                self.bulk_update(
+                    [
+                        self.model(id=d['encuesta_id'], coeficiente_k=d['nuevo'], perfil_k_id=d['perfil_k_id'])
+                        for d in diferencias
+                    ],
+                    ['coeficiente_k', 'perfil_k'],
+                    batch_size=500
+                )
+                # Común a todas las filas: un UPDATE en vez de otra columna en el bulk_update
+                self.filter(id__in=[d['encuesta_id'] for d in diferencias]).update(
+                    fecha_actualizacion=timezone.now()
+                )
+                # bulk_update no emite post_save
+                Experto.objects.invalidar_dashboards({d['experto_id'] for d in diferencias})
+                EstadisticasExperto.objects.recalcular({d['experto_id'] for d in diferencias})
+        
+        return diferencias
+    
+    def get_dashboard_encuestas(self, experto):
         """
         Obtiene encuestas organizadas para el dashboard.
+        Una encuesta pendiente está bloqueada si su proyecto ya tiene expertos seleccionados.
         Returns: dict con listas separadas y contadores
         """
         pendientes = self.filter(
             experto=experto, estado='pendiente'
-        ).select_related('proyecto')
+        ).select_related('proyecto__investigador__usuario').annotate(
+            seleccion_finalizada=models.Exists(
+                ListaChequeo.objects.filter(
+                    proyecto=models.OuterRef('proyecto'), estado='seleccionado'
+                )
+            )
+        )
         
         no_bloqueadas = []
         bloqueadas = []
         
         for encuesta in pendientes:
-            if encuesta.proyecto_id in proyectos_cerrados:
-                encuesta.bloqueada = True
+            encuesta.bloqueada = encuesta.seleccion_finalizada
+            if encuesta.bloqueada:
                 bloqueadas.append(encuesta)
             else:
-                encuesta.bloqueada = False
                 no_bloqueadas.append(encuesta)
         
-        completadas = self.filter(
+        completadas = list(self.filter(
             experto=experto, estado='completada'
-        ).select_related('proyecto').order_by('-fecha_respuesta')
+        ).select_related('proyecto').order_by('-fecha_respuesta'))
         
         return {
             'pendientes_no_bloqueadas': no_bloqueadas,
@@ -111,44 +509,156 @@ class EncuestaSatisfaccionManager(models.Manager):
         }
 
 class ListaChequeoManager(models.Manager):
-    def crear_desde_encuesta(self, encuesta, admin_user):
-        """Crea o actualiza registro desde encuesta completada"""
-        return self.update_or_create(
-            proyecto=encuesta.proyecto,
-            experto=encuesta.experto,
-            defaults={
-                'estado': 'seleccionado',
-                'administrador': admin_user,
-                'fecha_decision': timezone.now(),
-                'comentarios': f'Seleccionado. K={encuesta.coeficiente_k}',
-                'coeficiente_experticidad_en_decision': encuesta.coeficiente_k,
-                'es_moderador': False
-            }
-        )
+    CACHE_MEMBRESIAS_KEY = 'membresias_proyecto:{}'
     
-    def asignar_moderador(self, proyecto, experto, admin_user):
-        """Asigna un experto como moderador"""
-        return self.update_or_create(
-            proyecto=proyecto,
-            experto=experto,
-            defaults={
-                'estado': 'seleccionado',
-                'administrador': admin_user,
-                'fecha_decision': timezone.now(),
-                'comentarios': 'Moderador del proyecto',
-                'coeficiente_experticidad_en_decision': 0,
-                'es_moderador': True
+    @staticmethod
+    def get_membresias_cache():
+        """Backend de cache configurable (MEMBRESIAS_CACHE_ALIAS)"""
+        return caches[getattr(settings, 'MEMBRESIAS_CACHE_ALIAS', 'default')]
+    
+    def get_membresias(self, proyecto_id):
+        """
+        Mapa de membresía del proyecto cargado con una sola consulta.
+        Cacheado entre requests; se invalida con signals de ListaChequeo.
+        Con un backend por proceso (locmem) la invalidación sólo llega al proceso
+        que escribió: los demás ven el mapa anterior hasta MEMBRESIAS_CACHE_TIMEOUT.
+        Returns: dict {experto_id: (estado, es_moderador)}
+        """
+        cache_membresias = self.get_membresias_cache()
+        key = self.CACHE_MEMBRESIAS_KEY.format(proyecto_id)
+        membresias = cache_membresias.get(key)
+        if membresias is None:
+            membresias = {
+                experto_id: (estado, es_moderador)
+                for experto_id, estado, es_moderador in self.filter(
+                    proyecto_id=proyecto_id
+                ).order_by().values_list('experto_id', 'estado', 'es_moderador')
             }
-        )
+            cache_membresias.set(key, membresias, getattr(settings, 'MEMBRESIAS_CACHE_TIMEOUT', 30))
+        return membresias
+    
+    def invalidar_membresias(self, proyecto_id):
+        """Invalida ya (lecturas en esta transacción) y al confirmar (lecturas concurrentes)"""
+        cache_membresias = self.get_membresias_cache()
+        key = self.CACHE_MEMBRESIAS_KEY.format(proyecto_id)
+        cache_membresias.delete(key)
+        transaction.on_commit(lambda: cache_membresias.delete(key))
+    
+    def es_seleccionado(self, proyecto_id, experto):
+        """Verifica si el experto (objeto o id) está seleccionado en el proyecto"""
+        experto_id = getattr(experto, 'id', experto)
+        estado, _ = self.get_membresias(proyecto_id).get(int(experto_id), (None, False))
+        return estado == 'seleccionado'
+    
+    def es_moderador(self, proyecto_id, experto, solo_seleccionados=True):
+        """Verifica si el experto (objeto o id) es moderador del proyecto"""
+        experto_id = getattr(experto, 'id', experto)
+        estado, moderador = self.get_membresias(proyecto_id).get(int(experto_id), (None, False))
+        if solo_seleccionados:
+            return moderador and estado == 'seleccionado'
+        return moderador
+    
+    # Campos de la decisión que cambian de una fila a otra (van por bulk_update, que
+    # arma un CASE por campo y fila); el resto es común y va en un UPDATE por estado
+    CAMPOS_DECISION_POR_FILA = ['comentarios', 'coeficiente_experticidad_en_decision']
+    
+    def finalizar_seleccion(self, proyecto, encuestas, moderador, admin_user, rechazadas=()):
+        """
+        Selecciona a los expertos de las encuestas dadas (y marca como rechazados a
+        los de `rechazadas`) y asigna el moderador en bloque, dentro de la transacción
+        del llamador: una lectura de la lista del proyecto, un bulk_create de las filas
+        nuevas, un UPDATE por estado con los campos comunes y un bulk_update con los
+        propios de cada fila que cambia. El moderador anterior pierde el rol y el nuevo
+        lo recibe en el mismo lote; las filas cuya decisión no cambia no se reescriben.
+        bulk_* y update() no emiten signals: las caches se invalidan aquí.
+        Returns: dict con creados y actualizados
+        """
+        administrador_id = getattr(admin_user, 'id', None)
+        decisiones = {
+            encuesta.experto_id: ('rechazado', {
+                'comentarios': f'No preseleccionado. K={encuesta.coeficiente_k}',
+                'coeficiente_experticidad_en_decision': encuesta.coeficiente_k,
+                'es_moderador': False,
+            })
+            for encuesta in rechazadas
+        }
+        decisiones.update({
+            encuesta.experto_id: ('seleccionado', {
+                'comentarios': f'Seleccionado. K={encuesta.coeficiente_k}',
+                'coeficiente_experticidad_en_decision': encuesta.coeficiente_k,
+                'es_moderador': False,
+            })
+            for encuesta in encuestas
+        })
+        decisiones[moderador.id] = ('seleccionado', {
+            'comentarios': 'Moderador del proyecto',
+            'coeficiente_experticidad_en_decision': Decimal('0'),
+            'es_moderador': True,
+        })
+        
+        ahora = timezone.now()
+        existentes = {fila.experto_id: fila for fila in self.filter(proyecto=proyecto)}
+        nuevas, cambiadas = [], []
+        cambiadas_por_estado = {}
+        for experto_id, (estado, valores) in decisiones.items():
+            fila = existentes.get(experto_id)
+            if fila is None:
+                nuevas.append(self.model(
+                    proyecto=proyecto, experto_id=experto_id, estado=estado,
+                    administrador_id=administrador_id, fecha_decision=ahora, **valores
+                ))
+            elif (fila.estado != estado or fila.administrador_id != administrador_id
+                  or any(getattr(fila, campo) != valor for campo, valor in valores.items())):
+                for campo, valor in valores.items():
+                    setattr(fila, campo, valor)
+                cambiadas.append(fila)
+                cambiadas_por_estado.setdefault(estado, []).append(fila.pk)
+        
+        moderadores_anteriores = [
+            fila.pk for experto_id, fila in existentes.items()
+            if fila.es_moderador and experto_id not in decisiones
+        ]
+        
+        self.filter(pk__in=moderadores_anteriores).update(es_moderador=False)
+        self.bulk_create(nuevas)
+        for estado, pks in cambiadas_por_estado.items():
+            self.filter(pk__in=pks).update(
+                estado=estado, administrador_id=administrador_id, fecha_decision=ahora, es_moderador=False
+            )
+        self.bulk_update(cambiadas, self.CAMPOS_DECISION_POR_FILA)
+        fila_moderador = existentes.get(moderador.id)
+        if fila_moderador in cambiadas:
+            self.filter(pk=fila_moderador.pk).update(es_moderador=True)
+        
+        if nuevas or cambiadas or moderadores_anteriores:
+            self.invalidar_membresias(proyecto.id)
+            Experto.objects.invalidar_dashboards_proyecto(proyecto.id)
+            EstadisticasExperto.objects.recalcular(
+                [fila.experto_id for fila in nuevas] + [fila.experto_id for fila in cambiadas]
+            )
+            VersionRecurso.objects.incrementar(VersionRecurso.AMBITO_MENSAJES, [proyecto.id])
+        return {'creados': len(nuevas), 'actualizados': len(cambiadas) + len(moderadores_anteriores)}
     
     def get_dashboard_chats(self, experto):
         """
         Obtiene chats disponibles del experto con toda la metadata necesaria.
         Returns: dict con chats_activos, chats_cerrados, tormentas_activas_count
         """
-        chats = self.filter(
+        items_pendientes = ItemTormentaIdeas.objects.filter(
+            proyecto=models.OuterRef('proyecto'), estado='seleccionado'
+        ).exclude(
+            votos_recibidos__experto=experto
+        ).order_by().values('proyecto').annotate(
+            total=models.Count('id')
+        ).values('total')
+        
+        chats = list(self.filter(
             experto=experto, estado='seleccionado'
-        ).select_related('proyecto', 'proyecto__investigador').order_by('-fecha_decision')
+        ).select_related('proyecto', 'proyecto__investigador').annotate(
+            items_pendientes=Coalesce(
+                models.Subquery(items_pendientes, output_field=models.IntegerField()), 0
+            )
+        ).order_by('-fecha_decision'))
         
         # Separar en activos y cerrados
         chats_activos = [c for c in chats if c.proyecto.estado_tormenta == 'activa']
@@ -167,6 +677,21 @@ class ListaChequeoManager(models.Manager):
         }
 
 class MensajeChatManager(models.Manager):
+    def buscar(self, proyecto_id, texto, cursor=None, limite=20):
+        """
+        Busca en el historial del chat del proyecto (FTS5, fallback LIKE).
+        Returns: tuple (list de dicts serializados con contenido_resaltado, siguiente_cursor)
+        """
+        pagina, siguiente = buscar_en_proyecto(
+            self.select_related('experto__usuario'), TABLA_FTS_MENSAJES, proyecto_id, texto,
+            columnas=[('contenido', 0, None)], campos_like=['contenido'],
+            cursor=cursor, limite=limite
+        )
+        return [
+            {**mensaje.serializar_base(), 'contenido_resaltado': resaltado['contenido']}
+            for mensaje, resaltado in pagina
+        ], siguiente
+    
     def crear_mensaje_validado(self, proyecto_id, experto, contenido):
         """
         Crea un mensaje con validaciones de negocio.
@@ -181,11 +706,22 @@ class MensajeChatManager(models.Manager):
             return False, None, 'Máximo 1000 caracteres permitidos'
         
         try:
-            mensaje = self.create(
-                proyecto_id=proyecto_id,
-                experto=experto,
-                contenido=contenido_limpio
-            )
+            with transaction.atomic():
+                mensaje = self.create(
+                    proyecto_id=proyecto_id,
+                    experto=experto,
+                    contenido=contenido_limpio
+                )
+                # Versión que dejó este mensaje (la señal ya la incrementó en esta transacción)
+                version, _ = VersionRecurso.objects.obtener(VersionRecurso.AMBITO_MENSAJES, proyecto_id)
+            # Actualizar buffer y notificar a los streams SSE una vez confirmado el mensaje
+            serializado = mensaje.serializar_base()
+            
+            def publicar():
+                buffer_chat.agregar(int(proyecto_id), serializado, version)
+                difusor_chat.publicar(int(proyecto_id), mensaje.id)
+            
+            transaction.on_commit(publicar)
             return True, mensaje, None
         except Exception as e:
             return False, None, str(e)
@@ -195,13 +731,94 @@ class MensajeChatManager(models.Manager):
         Obtiene mensajes recientes para un proyecto.
         Returns: QuerySet de mensajes
         """
+        # El id crece con fecha_envio; ordenar por id lo resuelve el índice (proyecto, id)
         return self.filter(
             proyecto_id=proyecto_id,
             id__gt=desde_id
-        ).select_related('experto__usuario').order_by('fecha_envio')[:limite]
+        ).select_related('experto__usuario').order_by('id')[:limite]
+    
+    def obtener_recientes_serializados(self, proyecto_id, experto_id, desde_id=0, limite=50, version=None):
+        """
+        Obtiene mensajes nuevos ya serializados para el experto.
+        Responde desde el buffer en memoria si está en la versión de mensajes del
+        proyecto (VersionRecurso): las vistas con @respuesta_condicional ya la tienen
+        y la pasan en `version`, así que un hit no consulta la BD. Si el buffer va
+        atrasado (escrituras de otros procesos) se descarta y se recarga; los cursores
+        fríos van a la BD.
+        Returns: list de dicts
+        """
+        proyecto_id = int(proyecto_id)
+        if version is None:
+            version, _ = VersionRecurso.objects.obtener(VersionRecurso.AMBITO_MENSAJES, proyecto_id)
+        mensajes = buffer_chat.leer(proyecto_id, desde_id, limite, version)
+        
+        if mensajes is None:
+            if buffer_chat.iniciar_carga(proyecto_id):
+                try:
+                    ultimos = self.filter(proyecto_id=proyecto_id).select_related(
+                        'experto__usuario'
+                    ).order_by('-id')[:buffer_chat.tamano]
+                    buffer_chat.completar_carga(
+                        proyecto_id, [m.serializar_base() for m in reversed(ultimos)], version
+                    )
+                except Exception:
+                    buffer_chat.descartar(proyecto_id)
+                    raise
+            mensajes = [
+                m.serializar_base()
+                for m in self.obtener_recientes(proyecto_id, desde_id, limite)
+            ]
+        
+        return [
+            {**m, 'es_propio': m['experto_id'] == experto_id} for m in mensajes
+        ]
 
 class ItemTormentaIdeasManager(models.Manager):
-    def crear_desde_chat_moderador(self, proyecto_id, titulo, experto_id, moderador):
+    def buscar(self, proyecto_id, texto, cursor=None, limite=20):
+        """
+        Busca en título y descripción de los items del proyecto (FTS5, fallback LIKE).
+        Returns: tuple (list de dicts con titulo_resaltado y descripcion_resaltada, siguiente_cursor)
+        """
+        pagina, siguiente = buscar_en_proyecto(
+            self.select_related('experto__usuario'), TABLA_FTS_ITEMS, proyecto_id, texto,
+            columnas=[('titulo', 0, None), ('descripcion', 1, 24)],
+            campos_like=['titulo', 'descripcion'],
+            cursor=cursor, limite=limite
+        )
+        return [
+            {
+                'id': item.id,
+                'titulo': item.titulo,
+                'estado': item.estado,
+                'experto_id': item.experto_id,
+                **item.get_info_moderador(),
+                'titulo_resaltado': resaltado['titulo'],
+                'descripcion_resaltada': resaltado['descripcion'],
+            }
+            for item, resaltado in pagina
+        ], siguiente
+    
+    def crear_desde_mensaje(self, proyecto_id, mensaje_id, moderador, titulo=None):
+        """
+        Promueve un mensaje del chat a item, asignado a su autor.
+        Returns: tuple (success: bool, item: ItemTormentaIdeas|None, error: str)
+        """
+        try:
+            mensaje = MensajeChat.objects.get(id=mensaje_id, proyecto_id=proyecto_id)
+        except (MensajeChat.DoesNotExist, ValueError, TypeError):
+            return False, None, 'Mensaje no encontrado'
+        
+        titulo = (titulo or '').strip() or mensaje.contenido
+        if len(titulo) > 255:
+            titulo = titulo[:254].rstrip() + '…'
+        
+        return self.crear_desde_chat_moderador(
+            proyecto_id, titulo, mensaje.experto_id, moderador,
+            descripcion=mensaje.contenido
+        )
+    
+    def crear_desde_chat_moderador(self, proyecto_id, titulo, experto_id, moderador,
+                                   descripcion='Item seleccionado desde chat moderador'):
         """
         Crea item con validaciones de moderador.
         Returns: tuple (success: bool, item: ItemTormentaIdeas|None, error: str)
@@ -214,23 +831,16 @@ class ItemTormentaIdeasManager(models.Manager):
             return False, None, 'Debes asignar un experto'
         
         # Verificar moderador y experto
-        lista_mod = ListaChequeo.objects.filter(
-            proyecto_id=proyecto_id, experto=moderador, 
-            es_moderador=True, estado='seleccionado'
-        ).first()
-        
-        if not lista_mod:
+        if not ListaChequeo.objects.es_moderador(proyecto_id, moderador):
             return False, None, 'No eres moderador del proyecto'
         
-        if not ListaChequeo.objects.filter(
-            proyecto_id=proyecto_id, experto_id=experto_id, estado='seleccionado'
-        ).exists():
+        if not ListaChequeo.objects.es_seleccionado(proyecto_id, experto_id):
             return False, None, 'El experto no pertenece al proyecto'
         
         try:
             item = self.create(
                 titulo=titulo_limpio,
-                descripcion='Item seleccionado desde chat moderador',
+                descripcion=descripcion,
                 proyecto_id=proyecto_id,
                 experto_id=experto_id,
                 experto_propietario_id=experto_id,
@@ -242,10 +852,7 @@ class ItemTormentaIdeasManager(models.Manager):
     
     def eliminar_por_moderador(self, item_id, proyecto_id, moderador):
         """Elimina item verificando permisos. Returns: tuple (success: bool, error: str)"""
-        if not ListaChequeo.objects.filter(
-            proyecto_id=proyecto_id, experto=moderador,
-            es_moderador=True, estado='seleccionado'
-        ).exists():
+        if not ListaChequeo.objects.es_moderador(proyecto_id, moderador):
             return False, 'No eres moderador del proyecto'
         
         try:
@@ -266,23 +873,23 @@ class ItemTormentaIdeasManager(models.Manager):
         if not experto_id:
             return False, None, 'Debes asignar un experto'
         
-        if not ListaChequeo.objects.filter(
-            proyecto_id=proyecto_id, experto=moderador,
-            es_moderador=True, estado='seleccionado'
-        ).exists():
+        if not ListaChequeo.objects.es_moderador(proyecto_id, moderador):
             return False, None, 'No eres moderador del proyecto'
         
-        if not ListaChequeo.objects.filter(
-            proyecto_id=proyecto_id, experto_id=experto_id, estado='seleccionado'
-        ).exists():
+        if not ListaChequeo.objects.es_seleccionado(proyecto_id, experto_id):
             return False, None, 'El experto no pertenece al proyecto'
         
         try:
             item = self.get(id=item_id, proyecto_id=proyecto_id)
+            anteriores = {item.experto_id, item.experto_propietario_id} - {int(experto_id), None}
             item.titulo = titulo_limpio
             item.experto_id = experto_id
             item.experto_propietario_id = experto_id
             item.save()
+            if anteriores:
+                # Los signals sólo ven al nuevo experto; el anterior pierde el item
+                EstadisticasExperto.objects.recalcular(anteriores, crear=False)
+                VersionRecurso.objects.incrementar(VersionRecurso.AMBITO_RECOMENDACIONES, anteriores)
             return True, item, None
         except self.model.DoesNotExist:
             return False, None, 'Item no encontrado'
@@ -326,62 +933,716 @@ class ItemTormentaIdeasManager(models.Manager):
     def get_dashboard_votaciones_pendientes(self, experto, chats_cerrados):
         """
         Obtiene votaciones pendientes para el dashboard.
+        Usa el conteo items_pendientes anotado por get_dashboard_chats y carga
+        los moderadores de todos los proyectos en una sola consulta.
         Returns: list de dicts con proyecto, cantidad_items, moderador
         """
+        moderadores = {
+            lista.proyecto_id: lista.experto.usuario.get_full_name()
+            for lista in ListaChequeo.objects.filter(
+                proyecto_id__in=[chat.proyecto_id for chat in chats_cerrados],
+                es_moderador=True
+            ).select_related('experto__usuario').order_by()
+        } if chats_cerrados else {}
+        
         votaciones_pendientes = []
         
         for chat in chats_cerrados:
-            proyecto = chat.proyecto
+            chat.cantidad_items = chat.items_pendientes
+            chat.moderador = moderadores.get(chat.proyecto_id, 'N/A')
             
-            # Usar ORM eficiente en lugar de exists() + count()
-            items_sin_votar = proyecto.items_ideados.filter(
-                estado='seleccionado'
-            ).exclude(
-                votos_recibidos__experto=experto
-            )
-            
-            count = items_sin_votar.count()
-            if count > 0:
+            if chat.items_pendientes > 0:
                 votaciones_pendientes.append({
-                    'proyecto': proyecto,
-                    'cantidad_items': count,
-                    'moderador': proyecto.moderador.usuario.get_full_name() if proyecto.moderador else 'N/A'
+                    'proyecto': chat.proyecto,
+                    'cantidad_items': chat.items_pendientes,
+                    'moderador': chat.moderador
                 })
         
         return votaciones_pendientes
 
 class VotoItemManager(models.Manager):
+    CACHE_RESULTADOS_KEY = 'resultados_votacion:{}'
+    
+    @staticmethod
+    def get_resultados_cache():
+        """Backend de cache configurable (RESULTADOS_VOTACION_CACHE_ALIAS)"""
+        return caches[getattr(settings, 'RESULTADOS_VOTACION_CACHE_ALIAS', 'default')]
+    
+    def invalidar_resultados(self, proyecto_id):
+        """Invalida el cache de resultados al confirmar la transacción actual"""
+        cache_resultados = self.get_resultados_cache()
+        key = self.CACHE_RESULTADOS_KEY.format(proyecto_id)
+        transaction.on_commit(lambda: cache_resultados.delete(key))
+    
+    @staticmethod
+    def _leer_de_acuerdo(valor):
+        """
+        Solo acepta booleanos JSON: bool('false') sería True.
+        Raises: ValueError si el valor no es booleano
+        """
+        if valor is None:
+            return False
+        if not isinstance(valor, bool):
+            raise ValueError('de_acuerdo debe ser booleano')
+        return valor
+    
+    def descontar_borrados(self, votos):
+        """
+        Ajusta en bloque lo que depende de votos borrados: conteos por item, resultados
+        cacheados, dashboards y estadísticas de los votantes y el índice de recomendaciones
+        de los autores. Lo llaman los signals de borrado (sueltos y en cascada).
+        """
+        if not votos:
+            return
+        ConteoVotosItem.objects.descontar_votos(votos)
+        for proyecto_id in {voto.proyecto_id for voto in votos}:
+            self.invalidar_resultados(proyecto_id)
+        votantes = {voto.experto_id for voto in votos}
+        Experto.objects.invalidar_dashboards(votantes)
+        EstadisticasExperto.objects.recalcular(votantes, crear=False)
+        # El voto cuenta para el acuerdo del autor del item
+        VersionRecurso.objects.incrementar(
+            VersionRecurso.AMBITO_RECOMENDACIONES,
+            ItemTormentaIdeas.objects.filter(
+                id__in={voto.item_id for voto in votos}
+            ).order_by().values_list('experto_propietario_id', flat=True)
+        )
+    
     def crear_voto_validado(self, proyecto_id, experto_id, item_id, de_acuerdo, evaluacion):
         """
         Crea un voto con todas las validaciones de negocio.
         Returns: tuple (success: bool, voto: VotoItem|None, error: str)
         """
         # Verificar que el experto pertenece al proyecto
-        if not ListaChequeo.objects.filter(
-            proyecto_id=proyecto_id,
-            experto_id=experto_id,
-            estado='seleccionado'
-        ).exists():
+        if not ListaChequeo.objects.es_seleccionado(proyecto_id, experto_id):
             return False, None, 'No perteneces a este proyecto'
         
+        try:
+            de_acuerdo = self._leer_de_acuerdo(de_acuerdo)
+            evaluacion = int(evaluacion) if evaluacion else None
+        except (TypeError, ValueError):
+            return False, None, 'Datos inválidos'
+        if evaluacion is not None and evaluacion not in dict(VotoItem.NIVEL_EVALUACION_CHOICES):
+            return False, None, 'Evaluación fuera de rango'
+        
         # Verificar si ya votó
         if self.filter(experto_id=experto_id, item_id=item_id).exists():
             return False, None, 'Ya has votado este item'
         
         try:
-            voto = self.create(
-                experto_id=experto_id,
-                item_id=item_id,
-                proyecto_id=proyecto_id,
-                de_acuerdo=bool(de_acuerdo),
-                evaluacion=int(evaluacion) if evaluacion else None
-            )
+            with transaction.atomic():
+                voto = self.create(
+                    experto_id=experto_id,
+                    item_id=item_id,
+                    proyecto_id=proyecto_id,
+                    de_acuerdo=de_acuerdo,
+                    evaluacion=evaluacion
+                )
+                # Conteo materializado en la misma transacción que el voto
+                ConteoVotosItem.objects.registrar_votos([voto])
+            self.invalidar_resultados(proyecto_id)
             return True, voto, None
         except Exception as e:
             return False, None, str(e)
     
+    def crear_votos_validados(self, proyecto_id, experto_id, votos):
+        """
+        Crea varios votos en una sola transacción con bulk_create.
+        Valida la pertenencia al proyecto una vez y mantiene unique_together.
+        
+        Args:
+            votos: list de dicts {item_id, de_acuerdo, evaluacion}
+        
+        Returns: tuple (success: bool, resultados: list|None, error: str)
+            resultados: [{item_id, success, voto|error}] en el orden recibido
+        """
+        from django.db import IntegrityError
+        
+        if not ListaChequeo.objects.es_seleccionado(proyecto_id, experto_id):
+            return False, None, 'No perteneces a este proyecto'
+        
+        # Normalizar entrada
+        solicitados = []
+        for dato in votos:
+            try:
+                item_id = int(dato.get('item_id'))
+                evaluacion = dato.get('evaluacion')
+                evaluacion = int(evaluacion) if evaluacion else None
+                de_acuerdo = self._leer_de_acuerdo(dato.get('de_acuerdo'))
+            except (TypeError, ValueError, AttributeError):
+                item_id = dato.get('item_id') if isinstance(dato, dict) else None
+                solicitados.append((item_id, None, 'Datos inválidos'))
+                continue
+            if evaluacion is not None and evaluacion not in dict(VotoItem.NIVEL_EVALUACION_CHOICES):
+                solicitados.append((item_id, None, 'Evaluación fuera de rango'))
+                continue
+            solicitados.append((item_id, {
+                'de_acuerdo': de_acuerdo,
+                'evaluacion': evaluacion,
+            }, None))
+        
+        item_ids = {s[0] for s in solicitados if s[2] is None}
+        items_validos = set(ItemTormentaIdeas.objects.filter(
+            proyecto_id=proyecto_id, id__in=item_ids
+        ).order_by().values_list('id', flat=True))
+        
+        for _ in range(2):
+            ya_votados = set(self.filter(
+                experto_id=experto_id, item_id__in=item_ids
+            ).order_by().values_list('item_id', flat=True))
+            
+            resultados = []
+            nuevos = []
+            vistos = set()
+            for item_id, valores, error in solicitados:
+                if error is None:
+                    if item_id not in items_validos:
+                        error = 'Item no encontrado'
+                    elif item_id in ya_votados or item_id in vistos:
+                        error = 'Ya has votado este item'
+                if error:
+                    resultados.append({'item_id': item_id, 'success': False, 'error': error})
+                    continue
+                vistos.add(item_id)
+                voto = self.model(
+                    experto_id=experto_id, item_id=item_id,
+                    proyecto_id=proyecto_id, **valores
+                )
+                nuevos.append(voto)
+                resultados.append({'item_id': item_id, 'success': True, 'voto': voto})
+            
+            try:
+                with transaction.atomic():
+                    creados = self.bulk_create(nuevos)
+                    ConteoVotosItem.objects.registrar_votos(creados)
+                break
+            except IntegrityError:
+                # Otro request votó alguno de los items entre la lectura y la escritura
+                continue
+        else:
+            return False, None, 'Conflicto al registrar los votos, intenta de nuevo'
+        
+        if nuevos:
+            self.invalidar_resultados(proyecto_id)
+            # bulk_create no emite post_save
+            Experto.objects.invalidar_dashboards([experto_id])
+            EstadisticasExperto.objects.sumar_votos(experto_id, len(nuevos))
+        
+        for resultado in resultados:
+            if resultado['success']:
+                resultado['voto'] = resultado['voto'].serializar_para_respuesta()
+        return True, resultados, None
+    
+    def get_resultados_por_item(self, proyecto_id):
+        """
+        Resultados por item leídos del conteo materializado (O(1) por item).
+        Incluye con ceros los items seleccionados que aún no tienen votos.
+        Cacheado por proyecto; se invalida al registrar votos y al cambiar items.
+        Con un backend por proceso los demás workers sirven el resultado anterior
+        hasta RESULTADOS_VOTACION_CACHE_TIMEOUT.
+        Returns: dict con items y total_votos_cast
+        """
+        cache_resultados = self.get_resultados_cache()
+        key = self.CACHE_RESULTADOS_KEY.format(proyecto_id)
+        resultados = cache_resultados.get(key)
+        if resultados is not None:
+            return resultados
+        
+        # LEFT JOIN: los items sin fila de conteo salen con un conteo vacío
+        items_proyecto = ItemTormentaIdeas.objects.filter(
+            models.Q(estado='seleccionado') | models.Q(conteo_votos__total_votos__gt=0),
+            proyecto_id=proyecto_id
+        ).select_related('conteo_votos').only('id', 'titulo', 'conteo_votos').order_by()
+        
+        items = []
+        for item in items_proyecto:
+            try:
+                conteo = item.conteo_votos
+            except ConteoVotosItem.DoesNotExist:
+                conteo = ConteoVotosItem(item_id=item.id, proyecto_id=proyecto_id)
+            items.append({'id': item.id, 'titulo': item.titulo, **conteo.serializar_estadisticas()})
+        items.sort(key=lambda i: (-i['votos_positivos'], -(i['avg_evaluacion'] or 0), i['id']))
+        
+        resultados = {
+            'items': items,
+            'total_votos_cast': sum(i['total_votos'] for i in items),
+        }
+        cache_resultados.set(key, resultados, getattr(settings, 'RESULTADOS_VOTACION_CACHE_TIMEOUT', 30))
+        return resultados
+
+
+
+class ConteoVotosItemManager(models.Manager):
+    @staticmethod
+    def _incrementos(votos):
+        """Acumula los deltas de un conjunto de votos de un mismo item"""
+        deltas = {
+            'total_votos': 0, 'votos_de_acuerdo': 0, 'total_evaluaciones': 0,
+            'suma_evaluacion': 0, 'suma_cuadrados': 0,
+        }
+        for voto in votos:
+            deltas['total_votos'] += 1
+            deltas['votos_de_acuerdo'] += int(bool(voto.de_acuerdo))
+            if voto.evaluacion:
+                if voto.evaluacion not in dict(VotoItem.NIVEL_EVALUACION_CHOICES):
+                    raise ValueError(f'Evaluación fuera de rango: {voto.evaluacion}')
+                deltas['total_evaluaciones'] += 1
+                deltas['suma_evaluacion'] += voto.evaluacion
+                deltas['suma_cuadrados'] += voto.evaluacion ** 2
+                campo = f'votos_nivel_{voto.evaluacion}'
+                deltas[campo] = deltas.get(campo, 0) + 1
+        return deltas
+    
+    def registrar_votos(self, votos):
+        """
+        Suma votos recién creados al conteo de sus items.
+        Debe llamarse dentro de la transacción que crea los votos.
+        """
+        por_item = {}
+        for voto in votos:
+            por_item.setdefault((voto.item_id, voto.proyecto_id), []).append(voto)
+        if not por_item:
+            return
+        
+        # Asegurar la fila de cada item sin carreras (INSERT OR IGNORE)
+        self.bulk_create(
+            [self.model(item_id=item_id, proyecto_id=proyecto_id) for item_id, proyecto_id in por_item],
+            ignore_conflicts=True
+        )
+        
+        self._aplicar_incrementos(por_item, 1)
+    
+    def descontar_votos(self, votos):
+        """
+        Resta votos borrados del conteo de sus items.
+        Si el item también se borró, su fila ya no existe y el UPDATE no afecta nada.
+        """
+        por_item = {}
+        for voto in votos:
+            por_item.setdefault((voto.item_id, voto.proyecto_id), []).append(voto)
+        self._aplicar_incrementos(por_item, -1)
+    
+    def _aplicar_incrementos(self, por_item, signo):
+        """Un UPDATE por combinación distinta de incrementos (acotada por los niveles)"""
+        items_por_deltas = {}
+        for (item_id, _), votos_item in por_item.items():
+            deltas = tuple(sorted(self._incrementos(votos_item).items()))
+            items_por_deltas.setdefault(deltas, []).append(item_id)
+        
+        for deltas, item_ids in items_por_deltas.items():
+            self.filter(item_id__in=item_ids).update(
+                **{campo: models.F(campo) + signo * valor for campo, valor in deltas if valor}
+            )
+    
+    def calcular_desde_votos(self, proyecto_id=None):
+        """
+        Recalcula los conteos desde VotoItem con una consulta agrupada.
+        Returns: dict {item_id: dict de campos}
+        """
+        votos = VotoItem.objects.all()
+        if proyecto_id:
+            votos = votos.filter(proyecto_id=proyecto_id)
+        
+        filas = votos.values('item_id', 'proyecto_id').annotate(
+            total_votos=models.Count('id'),
+            votos_de_acuerdo=models.Count('id', filter=models.Q(de_acuerdo=True)),
+            total_evaluaciones=models.Count('evaluacion'),
+            suma_evaluacion=Coalesce(models.Sum('evaluacion'), 0),
+            suma_cuadrados=Coalesce(
+                models.Sum(models.F('evaluacion') * models.F('evaluacion')), 0
+            ),
+            **{
+                f'votos_nivel_{nivel}': models.Count('id', filter=models.Q(evaluacion=nivel))
+                for nivel in range(1, 6)
+            }
+        ).order_by()
+        
+        return {fila.pop('item_id'): fila for fila in filas}
+    
+    def reconstruir(self, proyecto_id=None, aplicar=True):
+        """
+        Compara los conteos materializados con VotoItem y opcionalmente los reescribe.
+        Returns: list de dicts {item_id, esperado, actual} con las diferencias
+        """
+        esperados = self.calcular_desde_votos(proyecto_id)
+        actuales = self.all()
+        if proyecto_id:
+            actuales = actuales.filter(proyecto_id=proyecto_id)
+        proyecto_ids = {c.proyecto_id for c in actuales} | {e['proyecto_id'] for e in esperados.values()}
+        actuales = {c.item_id: c.valores() for c in actuales}
+        
+        diferencias = []
+        for item_id in sorted(set(esperados) | set(actuales)):
+            esperado = esperados.get(item_id)
+            if esperado is not None:
+                esperado = {k: v for k, v in esperado.items() if k != 'proyecto_id'}
+            actual = actuales.get(item_id)
+            if actual is not None and not actual['total_votos']:
+                actual = None
+            if esperado != actual:
+                diferencias.append({'item_id': item_id, 'esperado': esperado, 'actual': actual})
+        
+        if aplicar:
+            with transaction.atomic():
+                actuales_qs = self.all()
+                if proyecto_id:
+                    actuales_qs = actuales_qs.filter(proyecto_id=proyecto_id)
+                actuales_qs.delete()
+                self.bulk_create(
+                    [self.model(item_id=item_id, **campos) for item_id, campos in esperados.items()],
+                    batch_size=500
+                )
+                # Los resultados cacheados se calcularon con los conteos anteriores
+                for proyecto_id_afectado in proyecto_ids:
+                    VotoItem.objects.invalidar_resultados(proyecto_id_afectado)
+        
+        return diferencias
+
+class PerfilPesosKManager(models.Manager):
+    CACHE_ACTIVO_KEY = 'perfil_k_activo:{}'
+    
+    @staticmethod
+    def get_perfil_cache():
+        """Backend de cache configurable (PERFIL_K_CACHE_ALIAS)"""
+        return caches[getattr(settings, 'PERFIL_K_CACHE_ALIAS', 'default')]
+    
+    def invalidar_activo(self, proyecto_id):
+        """Olvida el perfil activo cacheado, ahora y al confirmar la transacción"""
+        cache_perfiles = self.get_perfil_cache()
+        key = self.CACHE_ACTIVO_KEY.format(proyecto_id)
+        cache_perfiles.delete(key)
+        transaction.on_commit(lambda: cache_perfiles.delete(key))
+    
+    def activos(self, proyecto_ids):
+        """Returns: dict proyecto_id -> última versión de su perfil, en una consulta"""
+        perfiles = {}
+        for perfil in self.filter(proyecto_id__in=proyecto_ids).order_by('proyecto_id', '-version'):
+            perfiles.setdefault(perfil.proyecto_id, perfil)
+        return perfiles
+    
+    def get_calculadora(self, proyecto_id):
+        """
+        Calculadora compilada del perfil activo del proyecto.
+        Sin perfil propio se usa el perfil por defecto (versión 0).
+        Con un backend por proceso los demás workers siguen con el perfil anterior
+        hasta PERFIL_K_CACHE_TIMEOUT; esas K quedan con su perfil_k y
+        recalcular_coeficientes_k las vuelve a puntuar.
+        """
+        cache_perfiles = self.get_perfil_cache()
+        key = self.CACHE_ACTIVO_KEY.format(proyecto_id)
+        activo = cache_perfiles.get(key)
+        if activo is None:
+            perfil = self.activos([proyecto_id]).get(proyecto_id)
+            # 0 = sin perfil propio (None no se distingue de un miss)
+            activo = perfil.datos_calculadora() if perfil else 0
+            cache_perfiles.set(key, activo, getattr(settings, 'PERFIL_K_CACHE_TIMEOUT', 30))
+        
+        if not activo:
+            return calculadora_k_por_defecto
+        return calculadoras_k.obtener(*activo)
+    
+    def crear_version(self, proyecto, pesos, valores_influencia=None, nombre=''):
+        """
+        Crea una nueva versión del perfil de pesos del proyecto.
+        Las versiones anteriores se conservan para saber con qué pesos se calculó cada K.
+        Returns: tuple (success: bool, perfil: PerfilPesosK|None, error: str)
+        """
+        valores_influencia = valores_influencia or dict(VALOR_INFLUENCIA)
+        valido, error = validar_perfil_k(pesos, valores_influencia)
+        if not valido:
+            return False, None, error
+        
+        with transaction.atomic():
+            ultima = self.filter(proyecto=proyecto).aggregate(
+                ultima=models.Max('version')
+            )['ultima'] or 0
+            perfil = self.create(
+                proyecto=proyecto,
+                version=ultima + 1,
+                nombre=nombre,
+                pesos=pesos,
+                valores_influencia=valores_influencia
+            )
+            self.invalidar_activo(proyecto.id)
+        
+        return True, perfil, None
+
+class RecomendacionExpertoManager(models.Manager):
+    # Expertos por consulta IN al recalcular (límite de variables de SQLite)
+    TAMANO_LOTE = 900
+    
+    def para_proyecto(self, proyecto, limite=10):
+        """
+        Candidatos de la categoría del proyecto, mejor puntuados primero, sin los que ya
+        tienen encuesta en él. Una consulta sobre recomendacion_categoria_idx.
+        Returns: list de RecomendacionExperto con experto y usuario cargados
+        """
+        if not proyecto.categoria:
+            return []
+        return list(self.filter(categoria=proyecto.categoria).exclude(
+            experto__encuestas_experticidad__proyecto=proyecto
+        ).select_related('experto__usuario').order_by('-puntuacion', 'experto_id')[:limite])
+    
+    def expertos_afectados(self, marca):
+        """
+        Expertos con cambios desde la última reconstrucción: encuestas respondidas o
+        con K recalculada, decisiones de la lista de chequeo (nuevas o re-decididas),
+        items propuestos o modificados, votos a sus items, y borrados o items reasignados
+        a otro experto (que se anotan en VersionRecurso).
+        Returns: set de experto_id
+        """
+        afectados = set(EncuestaSatisfaccion.objects.filter(
+            fecha_actualizacion__gte=marca.fecha_construccion
+        ).order_by().values_list('experto_id', flat=True))
+        afectados.update(VersionRecurso.objects.filter(
+            ambito=VersionRecurso.AMBITO_RECOMENDACIONES, fecha_actualizacion__gte=marca.fecha_construccion
+        ).order_by().values_list('clave', flat=True))
+        afectados.update(ListaChequeo.objects.filter(
+            models.Q(id__gt=marca.ultima_lista_id)
+            | models.Q(fecha_decision__gte=marca.fecha_construccion)
+        ).order_by().values_list('experto_id', flat=True))
+        afectados.update(ItemTormentaIdeas.objects.filter(
+            models.Q(id__gt=marca.ultimo_item_id)
+            | models.Q(fecha_actualizacion__gte=marca.fecha_construccion),
+            experto_propietario__isnull=False
+        ).order_by().values_list('experto_propietario_id', flat=True))
+        afectados.update(VotoItem.objects.filter(
+            id__gt=marca.ultimo_voto_id, item__experto_propietario__isnull=False
+        ).order_by().values_list('item__experto_propietario_id', flat=True))
+        return afectados
+    
+    def calcular(self, experto_ids=None):
+        """
+        Historial por (categoría del proyecto, experto) con una consulta agregada por fuente.
+        Returns: dict (categoria, experto_id) -> dict de contadores
+        """
+        filtros = {'fuente': {}, 'propietario': {}}
+        if experto_ids is not None:
+            filtros = {'fuente': {'experto_id__in': experto_ids},
+                       'propietario': {'item__experto_propietario_id__in': experto_ids}}
+        
+        historial = {}
+        
+        def acumular(filas, categoria, experto, **campos):
+            for fila in filas:
+                if not fila[categoria]:
+                    continue
+                contadores = historial.setdefault((fila[categoria], fila[experto]), {
+                    'encuestas_completadas': 0, 'suma_k': Decimal('0'), 'selecciones': 0,
+                    'items_propuestos': 0, 'votos_recibidos': 0, 'votos_de_acuerdo': 0,
+                })
+                for campo, origen in campos.items():
+                    contadores[campo] = fila[origen] or contadores[campo]
+        
+        acumular(EncuestaSatisfaccion.objects.filter(
+            estado='completada', coeficiente_k__isnull=False, **filtros['fuente']
+        ).values('proyecto__categoria', 'experto_id').annotate(
+            total=models.Count('id'), suma=models.Sum('coeficiente_k')
+        ).order_by(), 'proyecto__categoria', 'experto_id', encuestas_completadas='total', suma_k='suma')
+        
+        acumular(ListaChequeo.objects.filter(
+            estado='seleccionado', **filtros['fuente']
+        ).values('proyecto__categoria', 'experto_id').annotate(
+            total=models.Count('id')
+        ).order_by(), 'proyecto__categoria', 'experto_id', selecciones='total')
+        
+        filtro_items = {'experto_propietario_id__in': experto_ids} if experto_ids is not None else {}
+        acumular(ItemTormentaIdeas.objects.filter(
+            experto_propietario__isnull=False, **filtro_items
+        ).values('proyecto__categoria', 'experto_propietario_id').annotate(
+            total=models.Count('id')
+        ).order_by(), 'proyecto__categoria', 'experto_propietario_id', items_propuestos='total')
+        
+        # Acuerdo de los votos con sus items, desde los conteos materializados
+        acumular(ConteoVotosItem.objects.filter(
+            item__experto_propietario__isnull=False, **filtros['propietario']
+        ).values('proyecto__categoria', 'item__experto_propietario_id').annotate(
+            total=models.Sum('total_votos'), acuerdo=models.Sum('votos_de_acuerdo')
+        ).order_by(), 'proyecto__categoria', 'item__experto_propietario_id',
+            votos_recibidos='total', votos_de_acuerdo='acuerdo')
+        
+        return historial
+    
+    def reconstruir(self, completo=False):
+        """
+        Actualiza el índice con lo nuevo desde la última reconstrucción: sólo se
+        recalculan (desde cero, no sumando deltas) los expertos afectados. Los
+        cambios de categoría de un proyecto necesitan completo=True.
+        Returns: dict con expertos recalculados y filas escritas
+        """
+        with transaction.atomic():
+            marca, _ = MarcaIndiceRecomendaciones.objects.get_or_create(id=1)
+            # Lo que llegue durante la reconstrucción entra en la siguiente
+            inicio = timezone.now()
+            topes = {
+                'ultima_lista_id': ListaChequeo.objects.aggregate(maximo=models.Max('id'))['maximo'] or 0,
+                'ultimo_item_id': ItemTormentaIdeas.objects.aggregate(maximo=models.Max('id'))['maximo'] or 0,
+                'ultimo_voto_id': VotoItem.objects.aggregate(maximo=models.Max('id'))['maximo'] or 0,
+            }
+            
+            if completo or marca.fecha_construccion is None:
+                self.all().delete()
+                lotes = [None]
+                afectados = None
+            else:
+                afectados = sorted(self.expertos_afectados(marca))
+                lotes = [
+                    afectados[i:i + self.TAMANO_LOTE] for i in range(0, len(afectados), self.TAMANO_LOTE)
+                ]
+            
+            filas = 0
+            for lote in lotes:
+                if lote is not None:
+                    self.filter(experto_id__in=lote).delete()
+                nuevas = [
+                    self.model(
+                        categoria=categoria, experto_id=experto_id, **contadores,
+                        puntuacion=puntuar(**contadores)
+                    )
+                    for (categoria, experto_id), contadores in self.calcular(lote).items()
+                ]
+                self.bulk_create(nuevas, batch_size=500)
+                filas += len(nuevas)
+            
+            for campo, valor in topes.items():
+                setattr(marca, campo, valor)
+            marca.fecha_construccion = inicio
+            marca.save()
+        
+        return {
+            'completo': afectados is None,
+            'expertos': len(afectados) if afectados is not None else self.values('experto_id').distinct().count(),
+            'filas': filas,
+        }
 
+class EstadisticasExpertoManager(models.Manager):
+    # Expertos por UPDATE (límite de variables de SQLite)
+    TAMANO_LOTE = 900
+    
+    def _sql_recalcular(self):
+        """
+        UPDATE con un agregado correlacionado por columna. Va en SQL directo porque lo
+        ejecutan los signals en cada escritura y armarlo con el ORM cuesta más que correrlo.
+        """
+        estadisticas = self.model._meta.db_table
+        encuestas = EncuestaSatisfaccion._meta.db_table
+        items = ItemTormentaIdeas._meta.db_table
+        activos = ', '.join(f"'{estado}'" for estado in ItemTormentaIdeas.ESTADOS_ACTIVOS)
+        
+        def contar(tabla, condicion=''):
+            return f'(SELECT COUNT(*) FROM {tabla} WHERE experto_id = {estadisticas}.experto_id {condicion})'
+        
+        return f'''
+            UPDATE {estadisticas} SET
+                total_encuestas = {contar(encuestas)},
+                encuestas_completadas = {contar(encuestas, "AND estado = 'completada'")},
+                k_promedio = (
+                    SELECT ROUND(AVG(coeficiente_k), 2) FROM {encuestas}
+                    WHERE experto_id = {estadisticas}.experto_id AND estado = 'completada'
+                      AND coeficiente_k IS NOT NULL
+                ),
+                total_items = {contar(items)},
+                items_activos = {contar(items, f"AND estado IN ({activos})")},
+                votos_emitidos = {contar(VotoItem._meta.db_table)},
+                proyectos_seleccionado = {contar(ListaChequeo._meta.db_table, "AND estado = 'seleccionado'")},
+                version = version + 1,
+                fecha_actualizacion = %s
+        '''
+    
+    def _ejecutar_recalculo(self, experto_ids=None):
+        """Returns: int filas actualizadas"""
+        conexion = connections[router.db_for_write(self.model)]
+        sql = self._sql_recalcular()
+        parametros = [conexion.ops.adapt_datetimefield_value(timezone.now())]
+        if experto_ids is not None:
+            sql += f' WHERE experto_id IN ({", ".join(["%s"] * len(experto_ids))})'
+            parametros += list(experto_ids)
+        with conexion.cursor() as cursor:
+            cursor.execute(sql, parametros)
+            return cursor.rowcount
+    
+    def recalcular(self, experto_ids=None, crear=True):
+        """
+        Recalcula desde las tablas de origen los contadores de los expertos (todos si
+        experto_ids es None). Lo llaman los signals y los caminos con bulk_create/update,
+        que no los emiten. crear=False no crea las filas que falten (borrados: el
+        experto puede estar borrándose en cascada).
+        Returns: int filas recalculadas
+        """
+        if experto_ids is None:
+            with transaction.atomic():
+                self.bulk_create(
+                    [self.model(experto_id=experto_id) for experto_id in Experto.objects.values_list('id', flat=True)],
+                    ignore_conflicts=True, batch_size=500
+                )
+                return self._ejecutar_recalculo()
+        
+        experto_ids = sorted({experto_id for experto_id in experto_ids if experto_id})
+        actualizadas = 0
+        for i in range(0, len(experto_ids), self.TAMANO_LOTE):
+            lote = experto_ids[i:i + self.TAMANO_LOTE]
+            filas = self._ejecutar_recalculo(lote)
+            if crear and filas < len(lote):
+                # Expertos sin fila todavía (creados con bulk_create)
+                self.bulk_create([self.model(experto_id=experto_id) for experto_id in lote], ignore_conflicts=True)
+                filas = self._ejecutar_recalculo(lote)
+            actualizadas += filas
+        return actualizadas
+    
+    def sumar_votos(self, experto_id, cantidad):
+        """Votos emitidos por delta (camino caliente de la votación): un UPDATE sin subconsultas"""
+        filas = self.filter(experto_id=experto_id).update(
+            votos_emitidos=models.F('votos_emitidos') + cantidad,
+            version=models.F('version') + 1,
+            fecha_actualizacion=timezone.now()
+        )
+        if not filas:
+            self.recalcular([experto_id], crear=cantidad > 0)
+    
+    def tocar(self, experto_ids):
+        """Nueva versión sin recalcular (cambió el perfil del experto o su usuario)"""
+        self.filter(experto_id__in=experto_ids).update(
+            version=models.F('version') + 1, fecha_actualizacion=timezone.now()
+        )
+    
+    def para_detalle(self, experto_id):
+        """
+        Fila de estadísticas con experto y usuario en una lectura por clave primaria.
+        Raises: Experto.DoesNotExist
+        """
+        consulta = self.select_related('experto__usuario')
+        try:
+            return consulta.get(experto_id=experto_id)
+        except self.model.DoesNotExist:
+            if not Experto.objects.filter(id=experto_id).exists():
+                raise Experto.DoesNotExist
+            self.recalcular([experto_id])
+            return consulta.get(experto_id=experto_id)
 
+class VersionRecursoManager(models.Manager):
+    def obtener(self, ambito, clave):
+        """
+        Versión actual de un recurso (un SELECT por el índice único).
+        Returns: tuple (version, fecha_actualizacion|None); (0, None) si nunca cambió
+        """
+        fila = self.filter(ambito=ambito, clave=clave).values_list('version', 'fecha_actualizacion').first()
+        return fila or (0, None)
+    
+    def incrementar(self, ambito, claves):
+        """Nueva versión de los recursos (un UPDATE; un INSERT sólo la primera vez)"""
+        claves = sorted({int(clave) for clave in claves if clave})
+        if not claves:
+            return
+        ahora = timezone.now()
+        filas = self.filter(ambito=ambito, clave__in=claves).update(
+            version=models.F('version') + 1, fecha_actualizacion=ahora
+        )
+        if filas < len(claves):
+            existentes = set(self.filter(ambito=ambito, clave__in=claves).values_list('clave', flat=True))
+            self.bulk_create([
+                self.model(ambito=ambito, clave=clave, version=1, fecha_actualizacion=ahora)
+                for clave in claves if clave not in existentes
+            ], ignore_conflicts=True)
 
 class Proyecto(models.Model):
     ESTADO_TORMENTA = [
@@ -413,6 +1674,10 @@ class Proyecto(models.Model):
     
     objects = ProyectoManager()
     
+    def get_calculadora_k(self):
+        """Calculadora de K compilada con el perfil de pesos activo del proyecto"""
+        return PerfilPesosK.objects.get_calculadora(self.id)
+    
     @property
     def moderador(self):
         """Devuelve el experto moderador del proyecto"""
@@ -427,15 +1692,27 @@ class Proyecto(models.Model):
     @property
     def moderador_id(self):
         """Devuelve el ID del moderador o None"""
-        return self.lista_chequeo_expertos.filter(
-            es_moderador=True
-        ).values_list('experto_id', flat=True).first()
+        return next(
+            (
+                experto_id
+                for experto_id, (_, es_moderador) in self.get_membresias().items()
+                if es_moderador
+            ),
+            None
+        )
+    
+    def get_membresias(self):
+        """Mapa {experto_id: (estado, es_moderador)} cacheado del proyecto"""
+        return ListaChequeo.objects.get_membresias(self.id)
+    
+    def total_seleccionados(self):
+        return sum(
+            1 for estado, _ in self.get_membresias().values() if estado == 'seleccionado'
+        )
     
     def proceso_seleccion_finalizado(self):
         """Verifica si el proceso de selección está completo"""
-        return self.lista_chequeo_expertos.filter(
-            estado='seleccionado'
-        ).exists()
+        return self.total_seleccionados() > 0
     
     def get_encuestas_stats(self):
         """Devuelve estadísticas agregadas de encuestas"""
@@ -460,31 +1737,24 @@ class Proyecto(models.Model):
             estado='seleccionado'
         ).select_related('experto__usuario')
     
-    def remover_moderador_actual(self):
-        """Remueve el moderador actual del proyecto"""
-        self.lista_chequeo_expertos.filter(
-            es_moderador=True
-        ).update(es_moderador=False)
-    
     def finalizar_seleccion_expertos(self, moderador_id, admin_user):
         """
         Finaliza el proceso de selección:
         - Valida encuestas completadas
-        - Remueve moderador anterior
-        - Crea/actualiza expertos desde encuestas
-        - Asigna nuevo moderador
+        - Crea/actualiza expertos desde encuestas y asigna el nuevo moderador
+          (quitando el anterior) en bloque, ver ListaChequeoManager.finalizar_seleccion
         
-        Returns: dict con resultado
+        Returns: dict con resultado, filas creadas/actualizadas y duracion_ms
         """
-        from django.db import transaction
+        inicio = time.perf_counter()
         
         # Validar encuestas completadas
-        encuestas_completadas = EncuestaSatisfaccion.objects.filter(
+        encuestas_completadas = list(EncuestaSatisfaccion.objects.filter(
             proyecto=self,
             estado='completada'
-        ).select_related('experto')
+        ).only('experto_id', 'coeficiente_k'))
         
-        if not encuestas_completadas.exists():
+        if not encuestas_completadas:
             return {
                 'success': False,
                 'error': 'No hay encuestas completadas.'
@@ -492,21 +1762,17 @@ class Proyecto(models.Model):
         
         try:
             with transaction.atomic():
-                # 1. Remover moderador anterior
-                self.remover_moderador_actual()
-                
-                # 2. Crear/actualizar registros para cada encuesta
-                for encuesta in encuestas_completadas:
-                    ListaChequeo.objects.crear_desde_encuesta(encuesta, admin_user)
-                
-                # 3. Asignar moderador
                 experto_mod = Experto.objects.get(id=moderador_id)
-                ListaChequeo.objects.asignar_moderador(self, experto_mod, admin_user)
+                filas = ListaChequeo.objects.finalizar_seleccion(
+                    self, encuestas_completadas, experto_mod, admin_user
+                )
             
             return {
                 'success': True,
-                'message': f'Proceso finalizado con {encuestas_completadas.count()} expertos.',
-                'count': encuestas_completadas.count()
+                'message': f'Proceso finalizado con {len(encuestas_completadas)} expertos.',
+                'count': len(encuestas_completadas),
+                **filas,
+                'duracion_ms': round((time.perf_counter() - inicio) * 1000, 1)
             }
             
         except Experto.DoesNotExist:
@@ -520,6 +1786,54 @@ class Proyecto(models.Model):
                 'error': str(e)
             }
     
+    def aplicar_preseleccion(self, parametros, admin_user, moderador_id=None):
+        """
+        Aplica la preselección automática (EncuestaSatisfaccionManager.preseleccionar)
+        a la lista de chequeo: los elegidos quedan seleccionados y el resto de encuestas
+        completadas, rechazadas. Sin moderador_id modera el primero de la preselección.
+        
+        Returns: dict con resultado, la preselección aplicada, filas y duracion_ms
+        """
+        inicio = time.perf_counter()
+        preseleccion = EncuestaSatisfaccion.objects.preseleccionar(self.id, **parametros)
+        if not preseleccion['seleccion']:
+            return {
+                'success': False,
+                'error': 'Ningún experto cumple las restricciones.'
+            }
+        
+        elegidas = {elegido['encuesta_id'] for elegido in preseleccion['seleccion']}
+        encuestas_completadas = list(EncuestaSatisfaccion.objects.filter(
+            proyecto=self,
+            estado='completada'
+        ).only('experto_id', 'coeficiente_k'))
+        
+        try:
+            with transaction.atomic():
+                experto_mod = Experto.objects.get(id=moderador_id or preseleccion['seleccion'][0]['experto_id'])
+                filas = ListaChequeo.objects.finalizar_seleccion(
+                    self,
+                    [encuesta for encuesta in encuestas_completadas if encuesta.id in elegidas],
+                    experto_mod,
+                    admin_user,
+                    rechazadas=[encuesta for encuesta in encuestas_completadas if encuesta.id not in elegidas]
+                )
+            
+            return {
+                'success': True,
+                'message': f'Preselección aplicada con {len(elegidas)} expertos.',
+                **preseleccion,
+                **filas,
+                'moderador_id': experto_mod.id,
+                'duracion_ms': round((time.perf_counter() - inicio) * 1000, 1)
+            }
+            
+        except Experto.DoesNotExist:
+            return {
+                'success': False,
+                'error': 'El moderador seleccionado no existe.'
+            }
+    
     def experto_puede_chatear(self, experto):
         """
         Verifica si un experto tiene acceso al chat.
@@ -528,20 +1842,14 @@ class Proyecto(models.Model):
         if self.estado_tormenta == 'cerrada':
             return False, 'La tormenta de ideas para este proyecto está cerrada.'
         
-        if not self.lista_chequeo_expertos.filter(
-            experto=experto,
-            estado='seleccionado'
-        ).exists():
+        if not ListaChequeo.objects.es_seleccionado(self.id, experto):
             return False, 'No tienes acceso al chat de este proyecto.'
         
         return True, None
     
     def es_moderador(self, experto):
         """Verifica si el experto es moderador del proyecto"""
-        return self.lista_chequeo_expertos.filter(
-            experto=experto,
-            es_moderador=True
-        ).exists()
+        return ListaChequeo.objects.es_moderador(self.id, experto, solo_seleccionados=False)
     
     def get_contexto_chat(self, experto):
         """
@@ -559,7 +1867,7 @@ class Proyecto(models.Model):
             'puede_acceder': True,
             'es_moderador': es_mod,
             'mensajes': self.mensajes_chat.select_related('experto__usuario').order_by('fecha_envio')[:50],
-            'total_expertos': self.lista_chequeo_expertos.filter(estado='seleccionado').count(),
+            'total_expertos': self.total_seleccionados(),
             'items_seleccionados': []
         }
         
@@ -577,9 +1885,7 @@ class Proyecto(models.Model):
         if self.estado_tormenta == 'cerrada':
             return False, 'La tormenta de ideas para este proyecto está cerrada.'
         
-        if not ListaChequeo.objects.filter(
-            proyecto=self, experto=experto, es_moderador=True, estado='seleccionado'
-        ).exists():
+        if not ListaChequeo.objects.es_moderador(self.id, experto):
             return False, 'Acceso exclusivo para moderador.'
         
         return True, None
@@ -609,9 +1915,7 @@ class Proyecto(models.Model):
                 estado='seleccionado'
             ).select_related('experto__usuario').order_by('-fecha_creacion'),
             'expertos_proyecto': self.get_expertos_seleccionados_list(),
-            'total_expertos': self.lista_chequeo_expertos.filter(
-                estado='seleccionado'
-            ).count()
+            'total_expertos': self.total_seleccionados()
         }
     
     def get_expertos_seleccionados_list(self):
@@ -623,9 +1927,7 @@ class Proyecto(models.Model):
     
     def verificar_acceso_experto(self, experto):
         """Verifica si el experto tiene acceso. Returns: tuple (valido: bool, error: str|None)"""
-        if not self.lista_chequeo_expertos.filter(
-            experto=experto, estado='seleccionado'
-        ).exists():
+        if not ListaChequeo.objects.es_seleccionado(self.id, experto):
             return False, 'No perteneces a este proyecto.'
         return True, None
     
@@ -651,19 +1953,28 @@ class Experto(models.Model):
     
     objects = ExpertoManager()
     
-    def get_estadisticas(self):
-        """Devuelve estadísticas completas del experto"""
-        from django.db.models import Q
-        
-        encuestas = self.encuestas_experticidad.all()
-        aportes = self.items_generados.all()
-        
+    class Meta:
+        # Un índice por orden del catálogo (ExpertoManager.ORDEN_CATALOGO), con y sin categoría
+        indexes = [
+            models.Index(fields=['categoria', '-coeficiente_experticidad', 'id'], name='experto_cat_coef_idx'),
+            models.Index(fields=['categoria', 'grado_cientifico', 'id'], name='experto_cat_grado_idx'),
+            models.Index(fields=['categoria', '-anos_experiencia', 'id'], name='experto_cat_exp_idx'),
+            models.Index(fields=['-coeficiente_experticidad', 'id'], name='experto_coef_idx'),
+            models.Index(fields=['grado_cientifico', 'id'], name='experto_grado_idx'),
+            models.Index(fields=['-anos_experiencia', 'id'], name='experto_exp_idx'),
+        ]
+    
+    def serializar_para_catalogo(self):
+        """Fila del catálogo de expertos (requiere estado_encuesta anotado)"""
         return {
-            'total_encuestas': encuestas.count(),
-            'total_aportes': aportes.count(),
-            'proyectos_activos': aportes.filter(
-                Q(estado='pendiente') | Q(estado='seleccionado')
-            ).count(),
+            'id': self.id,
+            'nombre': self.usuario.get_full_name(),
+            'coeficiente': str(self.coeficiente_experticidad) if self.coeficiente_experticidad is not None else None,
+            'indice': float(self.indice_experticidad) if self.indice_experticidad is not None else None,
+            'cargo': self.cargo_actual,
+            'grado': self.get_grado_cientifico_display(),
+            'anos_experiencia': self.anos_experiencia,
+            'estado_encuesta': getattr(self, 'estado_encuesta', None),
         }
     
     def enviar_encuesta(self, proyecto):
@@ -686,25 +1997,28 @@ class Experto(models.Model):
     def get_dashboard_data(self):
         """
         Método central que obtiene TODA la data del dashboard.
+        Cacheado por experto; los signals de app/signals.py lo invalidan.
         Returns: dict completo para la vista
         """
-        from .models import ListaChequeo, EncuestaSatisfaccion, VotoItem
-        
-        # 1. Proyectos cerrados (para lógica de bloqueo)
-        proyectos_cerrados = set(
-            ListaChequeo.objects.filter(estado='seleccionado')
-            .values_list('proyecto_id', flat=True)
-        )
+        dashboard_cache = Experto.objects.get_dashboard_cache()
+        key = Experto.objects.DASHBOARD_CACHE_KEY.format(self.id)
         
-        # 2. Chats y sus contadores
+        data = dashboard_cache.get(key)
+        if data is None:
+            data = self.calcular_dashboard_data()
+            dashboard_cache.set(key, data, getattr(settings, 'DASHBOARD_CACHE_TIMEOUT', 300))
+        return data
+    
+    def calcular_dashboard_data(self):
+        """Calcula la data del dashboard sin pasar por el cache"""
+        # Número de consultas constante, independiente de la cantidad de proyectos
+        # 1. Chats con items pendientes de votar anotados
         chats_data = ListaChequeo.objects.get_dashboard_chats(self)
         
-        # 3. Encuestas organizadas
-        encuestas_data = EncuestaSatisfaccion.objects.get_dashboard_encuestas(
-            self, proyectos_cerrados
-        )
+        # 2. Encuestas organizadas (bloqueo anotado por proyecto)
+        encuestas_data = EncuestaSatisfaccion.objects.get_dashboard_encuestas(self)
         
-        # 4. Votaciones pendientes
+        # 3. Votaciones pendientes (moderadores en una consulta)
         votaciones_pendientes = ItemTormentaIdeas.objects.get_dashboard_votaciones_pendientes(
             self, chats_data['cerrados']
         )
@@ -803,9 +2117,24 @@ class EncuestaSatisfaccion(models.Model):
         blank=True,
         help_text="Coeficiente de experticidad calculado"
     )
+    perfil_k = models.ForeignKey(
+        'PerfilPesosK',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='encuestas',
+        help_text="Versión de pesos con la que se calculó coeficiente_k (vacío = por defecto)"
+    )
+    # Última respuesta o recálculo de K (lo usa la reconstrucción incremental de recomendaciones)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
 
     class Meta:
         unique_together = ['proyecto', 'experto']
+        indexes = [
+            # Dashboard del experto: encuestas por estado, las más recientes primero
+            models.Index(fields=['experto', 'estado', '-fecha_respuesta'], name='encuesta_experto_estado_idx'),
+            models.Index(fields=['fecha_actualizacion'], name='encuesta_actualizacion_idx'),
+        ]
         verbose_name = "Encuesta de Experticidad"
         verbose_name_plural = "Encuestas de Experticidad"
     
@@ -836,7 +2165,7 @@ class EncuestaSatisfaccion(models.Model):
         
         Args:
             data: Diccionario con los datos del formulario (request.POST)
-            calculadora_k: Callable para calcular el coeficiente K (ej: calcular_coeficiente_k)
+            calculadora_k: Callable para calcular el coeficiente K (ej: proyecto.get_calculadora_k())
         
         Returns:
             tuple (exito: bool, error: str)
@@ -923,6 +2252,14 @@ class ListaChequeo(models.Model):
 
     class Meta:
         unique_together = ['proyecto', 'experto']
+        indexes = [
+            # Sólo hay un moderador por proyecto: índice parcial (se ignora donde no hay soporte)
+            models.Index(
+                fields=['proyecto'], condition=models.Q(es_moderador=True), name='lista_moderador_idx'
+            ),
+            # Chats del experto (get_dashboard_chats)
+            models.Index(fields=['experto', 'estado', '-fecha_decision'], name='lista_experto_estado_idx'),
+        ]
         verbose_name = "Lista de Chequeo de Experto"
         verbose_name_plural = "Listas de Chequeo de Expertos"
         ordering = ['proyecto', '-coeficiente_experticidad_en_decision']
@@ -937,6 +2274,8 @@ class ItemTormentaIdeas(models.Model):
         ('rechazado', 'Rechazado'),
         ('archivado', 'Archivado'),
     ]
+    # Items que cuentan como aportes activos del experto
+    ESTADOS_ACTIVOS = ['pendiente', 'seleccionado']
     
     titulo = models.CharField(max_length=255)
     descripcion = models.TextField()
@@ -977,6 +2316,12 @@ class ItemTormentaIdeas(models.Model):
         verbose_name = "Item de Tormenta de Ideas"
         verbose_name_plural = "Items de Tormenta de Ideas"
         ordering = ['-fecha_creacion']
+        indexes = [
+            # Items por votar/votados del proyecto
+            models.Index(fields=['proyecto', 'estado', '-fecha_creacion'], name='item_proyecto_estado_idx'),
+            # Reconstrucción incremental de recomendaciones
+            models.Index(fields=['fecha_actualizacion'], name='item_actualizacion_idx'),
+        ]
     
     def get_info_moderador(self):
         """Retorna info para el moderador."""
@@ -1038,16 +2383,22 @@ class MensajeChat(models.Model):
     
     objects = MensajeChatManager()
     
-    def serializar_para_json(self, experto_id_actual):
-        """
-        Convierte el mensaje a formato JSON para API.
-        """
+    def serializar_base(self):
+        """Serialización independiente del experto que lee (cacheable)."""
         return {
             'id': self.id,
             'contenido': self.contenido,
             'fecha_envio': self.fecha_envio.strftime('%d/%m/%Y %H:%M'),
             'experto_nombre': self.experto.usuario.get_full_name(),
             'experto_id': self.experto.id,
+        }
+    
+    def serializar_para_json(self, experto_id_actual):
+        """
+        Convierte el mensaje a formato JSON para API.
+        """
+        return {
+            **self.serializar_base(),
             'es_propio': self.experto.id == experto_id_actual
         }
     
@@ -1055,6 +2406,10 @@ class MensajeChat(models.Model):
         verbose_name = "Mensaje de Chat"
         verbose_name_plural = "Mensajes de Chat"
         ordering = ['fecha_envio']
+        indexes = [
+            # Polling por cursor (id > desde_id) y búsqueda por recencia
+            models.Index(fields=['proyecto', 'id'], name='mensaje_proyecto_id_idx'),
+        ]
 
     def __str__(self):
         return f"{self.experto.usuario.get_full_name()} - {self.proyecto.nombre} ({self.fecha_envio.date()})"
@@ -1098,6 +2453,10 @@ class VotoItem(models.Model):
     
     class Meta:
         unique_together = ['experto', 'item']
+        indexes = [
+            # Votos de un experto en un proyecto
+            models.Index(fields=['proyecto', 'experto'], name='voto_proyecto_experto_idx'),
+        ]
         verbose_name = "Voto de Item"
         verbose_name_plural = "Votos de Items"
         ordering = ['-fecha_voto']
@@ -1106,11 +2465,279 @@ class VotoItem(models.Model):
         """Serializa el voto para respuesta JSON."""
         return {
             'id': self.id,
-            'item_id': self.item.id,
+            'item_id': self.item_id,
             'de_acuerdo': self.de_acuerdo,
             'evaluacion': self.evaluacion,
             'fecha_voto': self.fecha_voto.strftime('%d/%m/%Y %H:%M')
         }
 
     def __str__(self):
-        return f"Voto de {self.experto} sobre {self.item.titulo[:30]}"
\ No newline at end of file
+        return f"Voto de {self.experto} sobre {self.item.titulo[:30]}"
+
+class ConteoVotosItem(models.Model):
+    """
+    Conteo denormalizado de votos por item, mantenido en la misma transacción
+    que cada voto. Media, varianza y aceptación se calculan en O(1).
+    """
+    item = models.OneToOneField(
+        ItemTormentaIdeas,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='conteo_votos'
+    )
+    proyecto = models.ForeignKey(
+        Proyecto,
+        on_delete=models.CASCADE,
+        related_name='conteos_votos'
+    )
+    total_votos = models.PositiveIntegerField(default=0)
+    votos_de_acuerdo = models.PositiveIntegerField(default=0)
+    total_evaluaciones = models.PositiveIntegerField(default=0)
+    suma_evaluacion = models.PositiveIntegerField(default=0)
+    suma_cuadrados = models.PositiveIntegerField(default=0)
+    votos_nivel_1 = models.PositiveIntegerField(default=0)
+    votos_nivel_2 = models.PositiveIntegerField(default=0)
+    votos_nivel_3 = models.PositiveIntegerField(default=0)
+    votos_nivel_4 = models.PositiveIntegerField(default=0)
+    votos_nivel_5 = models.PositiveIntegerField(default=0)
+    
+    objects = ConteoVotosItemManager()
+    
+    class Meta:
+        verbose_name = "Conteo de Votos de Item"
+        verbose_name_plural = "Conteos de Votos de Items"
+    
+    CAMPOS_CONTEO = [
+        'total_votos', 'votos_de_acuerdo', 'total_evaluaciones',
+        'suma_evaluacion', 'suma_cuadrados',
+        'votos_nivel_1', 'votos_nivel_2', 'votos_nivel_3', 'votos_nivel_4', 'votos_nivel_5',
+    ]
+    
+    def valores(self):
+        return {campo: getattr(self, campo) for campo in self.CAMPOS_CONTEO}
+    
+    @property
+    def media_evaluacion(self):
+        if not self.total_evaluaciones:
+            return None
+        return self.suma_evaluacion / self.total_evaluaciones
+    
+    @property
+    def varianza_evaluacion(self):
+        """Varianza poblacional de la evaluación"""
+        media = self.media_evaluacion
+        if media is None:
+            return None
+        return max(self.suma_cuadrados / self.total_evaluaciones - media ** 2, 0.0)
+    
+    @property
+    def porcentaje_aceptacion(self):
+        if not self.total_votos:
+            return 0.0
+        return self.votos_de_acuerdo * 100 / self.total_votos
+    
+    @property
+    def histograma(self):
+        return {nivel: getattr(self, f'votos_nivel_{nivel}') for nivel in range(1, 6)}
+    
+    def serializar_estadisticas(self):
+        media = self.media_evaluacion
+        varianza = self.varianza_evaluacion
+        return {
+            'total_votos': self.total_votos,
+            'avg_evaluacion': round(media, 2) if media is not None else None,
+            'varianza_evaluacion': round(varianza, 2) if varianza is not None else None,
+            'votos_positivos': self.votos_de_acuerdo,
+            'porcentaje_aceptacion': round(self.porcentaje_aceptacion, 1),
+            'histograma': self.histograma,
+        }
+    
+    def __str__(self):
+        return f"Conteo {self.item_id}: {self.total_votos} votos"
+
+class PerfilPesosK(models.Model):
+    """
+    Versión inmutable de los pesos del coeficiente K de un proyecto.
+    Cambiar los pesos crea una versión nueva; la activa es la de mayor número.
+    """
+    proyecto = models.ForeignKey(
+        Proyecto,
+        on_delete=models.CASCADE,
+        related_name='perfiles_k'
+    )
+    version = models.PositiveIntegerField()
+    nombre = models.CharField(max_length=100, blank=True, help_text="Metodología de experticidad")
+    pesos = models.JSONField()
+    valores_influencia = models.JSONField(help_text="Valor numérico de A, M y B")
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    
+    objects = PerfilPesosKManager()
+    
+    class Meta:
+        unique_together = ['proyecto', 'version']
+        ordering = ['proyecto', '-version']
+        verbose_name = "Perfil de Pesos K"
+        verbose_name_plural = "Perfiles de Pesos K"
+    
+    def datos_calculadora(self):
+        """Argumentos para compilar (y cachear) la calculadora de este perfil"""
+        return (self.id, self.version, self.pesos, self.valores_influencia)
+    
+    def get_calculadora(self):
+        return calculadoras_k.obtener(*self.datos_calculadora())
+    
+    def serializar(self):
+        return {
+            'id': self.id,
+            'version': self.version,
+            'nombre': self.nombre,
+            'pesos': self.pesos,
+            'valores_influencia': self.valores_influencia,
+            'fecha_creacion': self.fecha_creacion.strftime('%d/%m/%Y %H:%M'),
+        }
+    
+    def __str__(self):
+        return f"Perfil K v{self.version} - {self.proyecto}"
+
+
+class RecomendacionExperto(models.Model):
+    """
+    Índice de candidatos por categoría de proyecto, precalculado a partir del
+    historial del experto en proyectos de esa categoría: K de sus encuestas,
+    veces seleccionado, items propuestos y acuerdo de los votos con sus items.
+    Se actualiza con RecomendacionExpertoManager.reconstruir (incremental).
+    """
+    categoria = models.CharField(max_length=255)
+    experto = models.ForeignKey(
+        Experto,
+        on_delete=models.CASCADE,
+        related_name='recomendaciones'
+    )
+    encuestas_completadas = models.PositiveIntegerField(default=0)
+    suma_k = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    selecciones = models.PositiveIntegerField(default=0)
+    items_propuestos = models.PositiveIntegerField(default=0)
+    votos_recibidos = models.PositiveIntegerField(default=0)
+    votos_de_acuerdo = models.PositiveIntegerField(default=0)
+    puntuacion = models.FloatField(default=0)
+    
+    objects = RecomendacionExpertoManager()
+    
+    class Meta:
+        unique_together = ['categoria', 'experto']
+        indexes = [
+            # Candidatos de una categoría, mejor puntuados primero
+            models.Index(fields=['categoria', '-puntuacion'], name='recomendacion_categoria_idx'),
+        ]
+        verbose_name = "Recomendación de Experto"
+        verbose_name_plural = "Recomendaciones de Expertos"
+    
+    @property
+    def k_promedio(self):
+        if not self.encuestas_completadas:
+            return None
+        return round(self.suma_k / self.encuestas_completadas, 2)
+    
+    @property
+    def porcentaje_acuerdo(self):
+        if not self.votos_recibidos:
+            return None
+        return round(self.votos_de_acuerdo * 100 / self.votos_recibidos, 1)
+    
+    def __str__(self):
+        return f"{self.experto} en {self.categoria}: {self.puntuacion:.3f}"
+
+class MarcaIndiceRecomendaciones(models.Model):
+    """Hasta dónde llegó la última reconstrucción del índice de recomendaciones (una sola fila)"""
+    ultima_lista_id = models.PositiveIntegerField(default=0)
+    ultimo_item_id = models.PositiveIntegerField(default=0)
+    ultimo_voto_id = models.PositiveIntegerField(default=0)
+    fecha_construccion = models.DateTimeField(null=True, blank=True)
+    
+    def __str__(self):
+        return f"Índice de recomendaciones ({self.fecha_construccion or 'sin construir'})"
+
+
+class EstadisticasExperto(models.Model):
+    """
+    Contadores desnormalizados por experto para el detalle del catálogo.
+    Los mantienen los signals (y las llamadas explícitas tras bulk_create/update);
+    `version` sube con cada cambio y se usa como ETag. El comando
+    reconstruir_estadisticas_expertos los recalcula desde cero.
+    """
+    experto = models.OneToOneField(
+        Experto,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='estadisticas'
+    )
+    total_encuestas = models.PositiveIntegerField(default=0)
+    encuestas_completadas = models.PositiveIntegerField(default=0)
+    total_items = models.PositiveIntegerField(default=0)
+    items_activos = models.PositiveIntegerField(default=0)
+    votos_emitidos = models.PositiveIntegerField(default=0)
+    proyectos_seleccionado = models.PositiveIntegerField(default=0)
+    k_promedio = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True)
+    version = models.PositiveIntegerField(default=0)
+    fecha_actualizacion = models.DateTimeField(default=timezone.now)
+    
+    objects = EstadisticasExpertoManager()
+    
+    class Meta:
+        verbose_name = "Estadísticas de Experto"
+        verbose_name_plural = "Estadísticas de Expertos"
+    
+    @property
+    def etag(self):
+        return f'"experto-{self.experto_id}-{self.version}"'
+    
+    def serializar_para_detalle(self):
+        """Detalle del experto (requiere experto y usuario cargados con para_detalle)"""
+        experto = self.experto
+        return {
+            'nombre': experto.usuario.get_full_name(),
+            'email': experto.usuario.email,
+            'grado': experto.get_grado_cientifico_display(),
+            'cargo': experto.cargo_actual or 'No especificado',
+            'departamento': experto.departamento or 'No especificado',
+            'experiencia': experto.anos_experiencia,
+            'coeficiente': str(experto.coeficiente_experticidad or 'N/A'),
+            'indice': str(experto.indice_experticidad or 'N/A'),
+            'total_encuestas': self.total_encuestas,
+            'encuestas_completadas': self.encuestas_completadas,
+            'total_aportes': self.total_items,
+            'proyectos_activos': self.items_activos,
+            'votos_emitidos': self.votos_emitidos,
+            'proyectos_seleccionado': self.proyectos_seleccionado,
+            'k_promedio': str(self.k_promedio) if self.k_promedio is not None else None,
+        }
+    
+    def __str__(self):
+        return f"Estadísticas de {self.experto_id} (v{self.version})"
+
+
+class VersionRecurso(models.Model):
+    """
+    Contador de versión por recurso (mensajes o encuestas de un proyecto, ...) para
+    las respuestas condicionales: los signals lo incrementan en cada escritura y las
+    vistas de polling lo usan como ETag sin ejecutar su consulta (ver condicional.py).
+    """
+    AMBITO_MENSAJES = 'mensajes'
+    AMBITO_ENCUESTAS = 'encuestas'
+    # Clave = experto_id; sólo se incrementa en borrados (ver expertos_afectados)
+    AMBITO_RECOMENDACIONES = 'recomendaciones'
+    
+    ambito = models.CharField(max_length=30)
+    clave = models.PositiveIntegerField()
+    version = models.PositiveIntegerField(default=0)
+    fecha_actualizacion = models.DateTimeField(default=timezone.now)
+    
+    objects = VersionRecursoManager()
+    
+    class Meta:
+        unique_together = ['ambito', 'clave']
+        verbose_name = "Versión de Recurso"
+        verbose_name_plural = "Versiones de Recursos"
+    
+    def __str__(self):
+        return f"{self.ambito}:{self.clave} v{self.version}"
@@ -0,0 +1,105 @@
+import contextvars
+import logging
+import time
+
+from django.template.backends.django import DjangoTemplates
+
+logger = logging.getLogger(__name__)
+
+_perfil_actual = contextvars.ContextVar('perfil_peticion', default=None)
+
+
+class PresupuestoConsultasExcedido(AssertionError):
+    """Una vista ejecutó más consultas que su presupuesto (con PRESUPUESTO_CONSULTAS_ESTRICTO)"""
+
+
+class PerfilPeticion:
+    """
+    Métricas de un request: consultas SQL y su duración (execute_wrapper de cada
+    conexión), tiempo de render de plantillas y presupuesto de la vista resuelta.
+    """
+
+    def __init__(self):
+        self.consultas = 0
+        self.tiempo_sql = 0.0
+        self.tiempo_plantillas = 0.0
+        self.vista = None
+        self.presupuesto = None
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.consultas += 1
+            self.tiempo_sql += time.perf_counter() - inicio
+
+    def server_timing(self, tiempo_total):
+        """Valor de la cabecera Server-Timing (duraciones en ms)"""
+        return (
+            f'sql;dur={self.tiempo_sql * 1000:.2f};desc="consultas={self.consultas}", '
+            f'plantillas;dur={self.tiempo_plantillas * 1000:.2f}, '
+            f'total;dur={tiempo_total * 1000:.2f}'
+        )
+
+    def presupuesto_excedido(self):
+        """Returns: str con el detalle si la vista superó su presupuesto, si no None"""
+        if self.presupuesto is None or self.consultas <= self.presupuesto:
+            return None
+        return f'{self.vista} ejecutó {self.consultas} consultas (presupuesto: {self.presupuesto})'
+
+
+def iniciar_perfil():
+    """Returns: tuple (perfil, token para terminar_perfil)"""
+    perfil = PerfilPeticion()
+    return perfil, _perfil_actual.set(perfil)
+
+
+def terminar_perfil(token):
+    _perfil_actual.reset(token)
+
+
+def perfil_actual():
+    return _perfil_actual.get()
+
+
+def presupuesto_consultas(maximo):
+    """
+    Declara cuántas consultas SQL puede ejecutar una vista, sin importar cuántas filas
+    muestre. PerfiladoMiddleware avisa en el log si se supera (y falla en los tests).
+    """
+    def decorador(vista):
+        vista.presupuesto_consultas = maximo
+        return vista
+    return decorador
+
+
+class PlantillaPerfilada:
+    """Plantilla del backend de Django que suma su tiempo de render al perfil del request"""
+
+    def __init__(self, plantilla):
+        self.plantilla = plantilla
+
+    def __getattr__(self, nombre):
+        return getattr(self.plantilla, nombre)
+
+    def render(self, context=None, request=None):
+        perfil = _perfil_actual.get()
+        if perfil is None:
+            return self.plantilla.render(context, request)
+
+        inicio = time.perf_counter()
+        try:
+            return self.plantilla.render(context, request)
+        finally:
+            perfil.tiempo_plantillas += time.perf_counter() - inicio
+
+
+class DjangoTemplatesPerfilados(DjangoTemplates):
+    """Backend DjangoTemplates que mide el render de cada plantilla (PlantillaPerfilada)"""
+
+    def from_string(self, template_code):
+        return PlantillaPerfilada(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return PlantillaPerfilada(super().get_template(template_name))
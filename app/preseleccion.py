@@ -0,0 +1,113 @@
+import heapq
+from collections import Counter, namedtuple
+from decimal import Decimal, InvalidOperation
+
+SIN_DEPARTAMENTO = 'Sin departamento'
+
+# Tope de la preselección: evita heaps enormes por un parámetro mal escrito
+MAXIMO_EXPERTOS = 500
+
+Candidato = namedtuple('Candidato', 'encuesta_id experto_id coeficiente_k departamento grado_cientifico')
+
+
+def leer_parametros(datos):
+    """
+    Valida los parámetros de la preselección (query string o JSON).
+    Returns: tuple (parametros: dict|None, error: str|None)
+    """
+    try:
+        total = int(datos.get('total', 0))
+        k_minimo = Decimal(str(datos.get('k_minimo') or 0))
+        maximo = datos.get('max_por_departamento')
+        max_por_departamento = int(maximo) if maximo not in (None, '') else None
+    except (TypeError, ValueError, InvalidOperation):
+        return None, 'Parámetros inválidos'
+
+    if not 1 <= total <= MAXIMO_EXPERTOS:
+        return None, f'El número de expertos debe estar entre 1 y {MAXIMO_EXPERTOS}'
+    if not 0 <= k_minimo <= 100:
+        return None, 'El K mínimo debe estar entre 0 y 100'
+    if max_por_departamento is not None and max_por_departamento < 1:
+        return None, 'El máximo por departamento debe ser al menos 1'
+
+    diversificar = datos.get('diversificar', True)
+    if isinstance(diversificar, str):
+        diversificar = diversificar.lower() not in ('0', 'false', 'no', '')
+
+    return {
+        'total': total,
+        'k_minimo': k_minimo,
+        'max_por_departamento': max_por_departamento,
+        'diversificar': bool(diversificar),
+    }, None
+
+
+def preseleccionar(filas, total, k_minimo=0, max_por_departamento=None, diversificar=True):
+    """
+    Elige los mejores `total` expertos por K en una sola pasada sobre las filas.
+
+    Por cada (departamento, grado) sólo se conservan los mejores
+    min(total, max_por_departamento) en un min-heap acotado: ninguna selección
+    que respete las restricciones usa a nadie fuera de ellos, así que la memoria
+    depende del número de combinaciones y no del de encuestas. Con esos
+    candidatos se elige en orden de K: primero, si diversificar, a quien cubra un
+    departamento o grado aún sin representar; después el resto de plazas, sin
+    pasar del máximo por departamento.
+
+    Args:
+        filas: iterable de tuplas (encuesta_id, experto_id, coeficiente_k, departamento, grado_cientifico)
+    Returns: tuple (seleccion: list de dicts en orden de elección, evaluadas: int)
+    """
+    limite = min(total, max_por_departamento or total)
+    heaps = {}
+    evaluadas = 0
+    for encuesta_id, experto_id, coeficiente_k, departamento, grado in filas:
+        if coeficiente_k is None or coeficiente_k < k_minimo:
+            continue
+        evaluadas += 1
+        departamento = departamento or SIN_DEPARTAMENTO
+        # A igual K gana la encuesta más antigua; el id desempata antes de llegar al Candidato
+        entrada = (coeficiente_k, -encuesta_id, Candidato(encuesta_id, experto_id, coeficiente_k, departamento, grado))
+        heap = heaps.setdefault((departamento, grado), [])
+        if len(heap) < limite:
+            heapq.heappush(heap, entrada)
+        elif entrada > heap[0]:
+            heapq.heapreplace(heap, entrada)
+
+    # Max-heap por K sobre los candidatos retenidos (a igual K, la encuesta más antigua primero)
+    candidatos = [
+        (-candidato.coeficiente_k, candidato.encuesta_id, candidato)
+        for heap in heaps.values() for _, _, candidato in heap
+    ]
+    heapq.heapify(candidatos)
+
+    seleccion = []
+    por_departamento = Counter()
+
+    def elegir(candidato, motivo):
+        por_departamento[candidato.departamento] += 1
+        seleccion.append({**candidato._asdict(), 'motivo': motivo})
+
+    if diversificar:
+        departamentos = {departamento for departamento, _ in heaps}
+        grados = {grado for _, grado in heaps}
+        diferidos = []
+        while candidatos and len(seleccion) < total and (departamentos or grados):
+            entrada = heapq.heappop(candidatos)
+            candidato = entrada[2]
+            nuevo = candidato.departamento in departamentos or candidato.grado_cientifico in grados
+            if nuevo and por_departamento[candidato.departamento] < limite:
+                elegir(candidato, 'diversidad')
+                departamentos.discard(candidato.departamento)
+                grados.discard(candidato.grado_cientifico)
+            else:
+                diferidos.append(entrada)
+        for entrada in diferidos:
+            heapq.heappush(candidatos, entrada)
+
+    while candidatos and len(seleccion) < total:
+        candidato = heapq.heappop(candidatos)[2]
+        if por_departamento[candidato.departamento] < limite:
+            elegir(candidato, 'k')
+
+    return seleccion, evaluadas
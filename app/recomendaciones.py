@@ -0,0 +1,36 @@
+import math
+
+# Peso de cada señal en la puntuación de un candidato (suman 1)
+PESOS_RECOMENDACION = {
+    'k_promedio': 0.45,
+    'tasa_seleccion': 0.25,
+    'acuerdo': 0.20,
+    'participacion': 0.10,
+}
+
+# El acuerdo se suaviza hacia ACUERDO_PREVIO como si hubiera VOTOS_PREVIOS votos más:
+# un experto con 2 votos a favor no supera a otro con 95 de 100
+ACUERDO_PREVIO = 0.5
+VOTOS_PREVIOS = 10
+
+# Items propuestos a partir de los cuales la participación cuenta completa
+ITEMS_REFERENCIA = 20
+
+
+def puntuar(encuestas_completadas, suma_k, selecciones, items_propuestos, votos_recibidos, votos_de_acuerdo):
+    """
+    Puntuación 0-1 de un experto dentro de una categoría a partir de su historial.
+    Returns: float
+    """
+    k_promedio = float(suma_k) / encuestas_completadas / 100 if encuestas_completadas else 0.0
+    tasa_seleccion = selecciones / max(encuestas_completadas, selecciones, 1)
+    acuerdo = (votos_de_acuerdo + ACUERDO_PREVIO * VOTOS_PREVIOS) / (votos_recibidos + VOTOS_PREVIOS)
+    participacion = min(1.0, math.log1p(items_propuestos) / math.log1p(ITEMS_REFERENCIA))
+
+    return round(
+        PESOS_RECOMENDACION['k_promedio'] * k_promedio
+        + PESOS_RECOMENDACION['tasa_seleccion'] * tasa_seleccion
+        + PESOS_RECOMENDACION['acuerdo'] * acuerdo
+        + PESOS_RECOMENDACION['participacion'] * participacion,
+        6
+    )
@@ -0,0 +1,69 @@
+import contextvars
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Alias de la conexión de sólo lectura (settings.DATABASES)
+ALIAS_LECTURA = 'lectura'
+
+
+class _AmbitoLecturas:
+    """Estado de un request, hilo o tarea: db_for_write lo marca sin salir de él"""
+    __slots__ = ('en_primaria',)
+
+    def __init__(self, en_primaria):
+        self.en_primaria = en_primaria
+
+
+# Ámbito actual; None fuera de LecturasPrimariaMiddleware/fijar_lecturas_en_primaria()
+_ambito_lecturas = contextvars.ContextVar('ambito_lecturas', default=None)
+
+
+def fijar_lecturas_en_primaria(fijar=True):
+    """
+    Abre un ámbito para el contexto actual (request, hilo o tarea); con fijar=True
+    sus lecturas van a la primaria, y también tras la primera escritura dentro de él.
+    Returns: token para cerrar el ámbito con restaurar_lecturas()
+    """
+    return _ambito_lecturas.set(_AmbitoLecturas(fijar))
+
+
+def restaurar_lecturas(token):
+    _ambito_lecturas.reset(token)
+
+
+def lecturas_en_primaria():
+    ambito = _ambito_lecturas.get()
+    return ambito is not None and ambito.en_primaria
+
+
+class LecturaEscrituraRouter:
+    """
+    Escrituras a la primaria ('default') y lecturas a ALIAS_LECTURA si está configurado.
+
+    Para que cada usuario vea lo que acaba de escribir (read-your-writes), lee de la
+    primaria dentro de transacciones, después de cualquier escritura en el mismo
+    ámbito y durante LECTURA_FIJAR_SEGUNDOS tras un POST (LecturasPrimariaMiddleware).
+    Fuera de un ámbito (comandos, hilos propios) una escritura no fija nada: ese
+    código lee en una transacción o abre su ámbito con fijar_lecturas_en_primaria().
+    """
+
+    def db_for_read(self, model, **hints):
+        if (ALIAS_LECTURA not in settings.DATABASES
+                or lecturas_en_primaria()
+                or connections[DEFAULT_DB_ALIAS].in_atomic_block):
+            return DEFAULT_DB_ALIAS
+        return ALIAS_LECTURA
+
+    def db_for_write(self, model, **hints):
+        ambito = _ambito_lecturas.get()
+        if ambito is not None:
+            ambito.en_primaria = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Ambos alias son la misma base de datos
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
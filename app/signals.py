@@ -1,2 +1,255 @@
-from django.db.models.signals import post_save
-from django.dispatch import receiver
\ No newline at end of file
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_save, post_delete, pre_delete
+from django.db.models import Q
+from django.dispatch import receiver
+from .sqlite import aplicar_pragmas
+from .busqueda import TABLA_FTS_EXPERTOS, TABLA_FTS_MENSAJES, TABLA_FTS_ITEMS, indexar, desindexar
+from .models import (
+    Experto, Proyecto, EncuestaSatisfaccion, ListaChequeo, ItemTormentaIdeas, VotoItem, MensajeChat,
+    EstadisticasExperto, VersionRecurso
+)
+
+
+# ==================== CACHE DEL DASHBOARD DE EXPERTOS ====================
+
+@receiver([post_save, post_delete], sender=EncuestaSatisfaccion)
+def invalidar_dashboard_encuesta(sender, instance, **kwargs):
+    """La encuesta sólo aparece en el dashboard de su experto"""
+    Experto.objects.invalidar_dashboards([instance.experto_id])
+
+
+@receiver([post_save, post_delete], sender=ListaChequeo)
+def invalidar_dashboard_lista_chequeo(sender, instance, **kwargs):
+    """
+    Una selección cambia los chats del experto, el bloqueo de encuestas
+    pendientes y el moderador que ven los demás expertos del proyecto.
+    """
+    Experto.objects.invalidar_dashboards([instance.experto_id])
+    Experto.objects.invalidar_dashboards_proyecto(instance.proyecto_id)
+
+
+@receiver([post_save, post_delete], sender=ItemTormentaIdeas)
+def invalidar_dashboard_item(sender, instance, **kwargs):
+    """Los items cambian las votaciones pendientes de los expertos del proyecto"""
+    Experto.objects.invalidar_dashboards(
+        experto_id
+        for experto_id, (estado, _) in ListaChequeo.objects.get_membresias(instance.proyecto_id).items()
+        if estado == 'seleccionado'
+    )
+
+
+@receiver([post_save, post_delete], sender=ItemTormentaIdeas)
+def invalidar_resultados_item(sender, instance, **kwargs):
+    """Los resultados listan los items seleccionados aunque no tengan votos"""
+    VotoItem.objects.invalidar_resultados(instance.proyecto_id)
+
+
+@receiver(post_save, sender=VotoItem)
+def invalidar_dashboard_voto(sender, instance, **kwargs):
+    Experto.objects.invalidar_dashboards([instance.experto_id])
+
+
+@receiver(post_save, sender=Proyecto)
+def invalidar_dashboard_proyecto(sender, instance, created, **kwargs):
+    """Cierre de tormenta, nombre, etc. se muestran en los dashboards del proyecto"""
+    if not created:
+        Experto.objects.invalidar_dashboards_proyecto(instance.id)
+
+
+# ==================== CACHE DE MEMBRESÍAS POR PROYECTO ====================
+
+@receiver([post_save, post_delete], sender=ListaChequeo)
+def invalidar_membresias(sender, instance, **kwargs):
+    ListaChequeo.objects.invalidar_membresias(instance.proyecto_id)
+
+
+# ==================== ESTADÍSTICAS DESNORMALIZADAS POR EXPERTO ====================
+
+@receiver(post_save, sender=Experto)
+def estadisticas_experto(sender, instance, created, **kwargs):
+    """Fila en cero para los nuevos; los cambios de perfil sólo cambian la versión (ETag)"""
+    if created:
+        EstadisticasExperto.objects.recalcular([instance.id])
+    else:
+        EstadisticasExperto.objects.tocar([instance.id])
+
+
+@receiver(post_save, sender=User)
+def estadisticas_usuario_experto(sender, instance, created, **kwargs):
+    """Nombre y email del detalle vienen de auth_user"""
+    if not created:
+        EstadisticasExperto.objects.tocar(Experto.objects.filter(usuario=instance).values('id'))
+
+
+@receiver(post_save, sender=EncuestaSatisfaccion)
+@receiver(post_save, sender=ListaChequeo)
+@receiver(post_save, sender=ItemTormentaIdeas)
+def recalcular_estadisticas(sender, instance, **kwargs):
+    EstadisticasExperto.objects.recalcular([instance.experto_id])
+
+
+@receiver(post_delete, sender=EncuestaSatisfaccion)
+@receiver(post_delete, sender=ListaChequeo)
+@receiver(post_delete, sender=ItemTormentaIdeas)
+def recalcular_estadisticas_borrado(sender, instance, **kwargs):
+    EstadisticasExperto.objects.recalcular([instance.experto_id], crear=False)
+
+
+@receiver(post_save, sender=VotoItem)
+def sumar_voto_estadisticas(sender, instance, created, **kwargs):
+    if created:
+        EstadisticasExperto.objects.sumar_votos(instance.experto_id, 1)
+
+
+# ==================== VERSIONES PARA RESPUESTAS CONDICIONALES ====================
+
+@receiver([post_save, post_delete], sender=MensajeChat)
+def version_mensajes(sender, instance, **kwargs):
+    VersionRecurso.objects.incrementar(VersionRecurso.AMBITO_MENSAJES, [instance.proyecto_id])
+
+
+@receiver([post_save, post_delete], sender=ListaChequeo)
+def version_mensajes_membresia(sender, instance, **kwargs):
+    """Quién puede leer el chat depende de la lista de chequeo"""
+    VersionRecurso.objects.incrementar(VersionRecurso.AMBITO_MENSAJES, [instance.proyecto_id])
+
+
+@receiver(post_save, sender=Proyecto)
+def version_mensajes_proyecto(sender, instance, created, **kwargs):
+    """Cerrar la tormenta corta el acceso al chat"""
+    if not created:
+        VersionRecurso.objects.incrementar(VersionRecurso.AMBITO_MENSAJES, [instance.id])
+
+
+@receiver([post_save, post_delete], sender=EncuestaSatisfaccion)
+def version_encuestas(sender, instance, **kwargs):
+    VersionRecurso.objects.incrementar(VersionRecurso.AMBITO_ENCUESTAS, [instance.proyecto_id])
+
+
+# ==================== ÍNDICE DE RECOMENDACIONES ====================
+# Las filas nuevas se detectan por id o fecha; los borrados se anotan aquí
+
+@receiver(post_delete, sender=EncuestaSatisfaccion)
+@receiver(post_delete, sender=ListaChequeo)
+def recomendacion_borrado_experto(sender, instance, **kwargs):
+    VersionRecurso.objects.incrementar(VersionRecurso.AMBITO_RECOMENDACIONES, [instance.experto_id])
+
+
+@receiver(post_delete, sender=ItemTormentaIdeas)
+def recomendacion_borrado_item(sender, instance, **kwargs):
+    VersionRecurso.objects.incrementar(VersionRecurso.AMBITO_RECOMENDACIONES, [instance.experto_propietario_id])
+
+
+# ==================== BORRADO DE VOTOS ====================
+# Cualquier receptor de borrado en VotoItem desactiva el fast-delete de Django: los
+# votos de una cascada se cargan igual, pero sus receptores no consultan nada y
+# el ajuste se hace una vez desde el objeto que originó el borrado.
+
+def _borrado_desde(origin, modelo):
+    """True si el borrado empezó en `modelo` (instancia o queryset) y no es una cascada"""
+    return isinstance(origin, modelo) or getattr(origin, 'model', None) is modelo
+
+
+def _anotar_votantes(instance, filtro):
+    """Votantes cuyos votos se borran en la cascada; se recalculan en post_delete"""
+    instance._votantes_en_cascada = set(VotoItem.objects.filter(filtro).order_by().values_list(
+        'experto_id', flat=True
+    ).distinct())
+
+
+@receiver(post_delete, sender=VotoItem)
+def voto_borrado(sender, instance, origin=None, **kwargs):
+    if _borrado_desde(origin, VotoItem):
+        VotoItem.objects.descontar_borrados([instance])
+
+
+@receiver(pre_delete, sender=ItemTormentaIdeas)
+def votos_item_borrado(sender, instance, origin=None, **kwargs):
+    """El conteo del item se borra con él; sólo quedan los votantes"""
+    if _borrado_desde(origin, ItemTormentaIdeas):
+        _anotar_votantes(instance, Q(item=instance))
+
+
+@receiver(pre_delete, sender=Proyecto)
+def votos_proyecto_borrado(sender, instance, **kwargs):
+    _anotar_votantes(instance, Q(proyecto=instance))
+
+
+@receiver(pre_delete, sender=Experto)
+def votos_experto_borrado(sender, instance, **kwargs):
+    """Sus votos a items ajenos cambian conteos; los items que ideó o propuso se borran con él"""
+    VotoItem.objects.descontar_borrados(list(VotoItem.objects.filter(experto=instance).only(
+        'experto_id', 'item_id', 'proyecto_id', 'de_acuerdo', 'evaluacion'
+    )))
+    _anotar_votantes(instance, Q(item__experto=instance) | Q(item__experto_propietario=instance))
+
+
+@receiver(post_delete, sender=ItemTormentaIdeas)
+@receiver(post_delete, sender=Proyecto)
+@receiver(post_delete, sender=Experto)
+def votantes_en_cascada(sender, instance, **kwargs):
+    votantes = getattr(instance, '_votantes_en_cascada', None)
+    if votantes:
+        Experto.objects.invalidar_dashboards(votantes)
+        EstadisticasExperto.objects.recalcular(votantes, crear=False)
+
+
+# ==================== ÍNDICES DE BÚSQUEDA (FTS5) ====================
+
+@receiver(post_save, sender=Experto)
+def indexar_experto(sender, instance, **kwargs):
+    indexar(TABLA_FTS_EXPERTOS, [instance.id])
+
+
+@receiver(post_delete, sender=Experto)
+def desindexar_experto(sender, instance, **kwargs):
+    desindexar(TABLA_FTS_EXPERTOS, [instance.id])
+
+
+@receiver(post_save, sender=User)
+def indexar_nombre_experto(sender, instance, created, **kwargs):
+    """El nombre indexado vive en auth_user"""
+    if not created:
+        indexar(TABLA_FTS_EXPERTOS, Experto.objects.filter(usuario=instance).values_list('id', flat=True))
+
+
+@receiver(post_save, sender=MensajeChat)
+def indexar_mensaje(sender, instance, **kwargs):
+    indexar(TABLA_FTS_MENSAJES, [instance.id])
+
+
+@receiver(post_delete, sender=MensajeChat)
+def desindexar_mensaje(sender, instance, **kwargs):
+    desindexar(TABLA_FTS_MENSAJES, [instance.id])
+
+
+@receiver(post_save, sender=ItemTormentaIdeas)
+def indexar_item(sender, instance, **kwargs):
+    indexar(TABLA_FTS_ITEMS, [instance.id])
+
+
+@receiver(post_delete, sender=ItemTormentaIdeas)
+def desindexar_item(sender, instance, **kwargs):
+    desindexar(TABLA_FTS_ITEMS, [instance.id])
+
+
+# ==================== CONEXIONES SQLITE ====================
+
+@receiver(connection_created)
+def configurar_conexion_sqlite(sender, connection, **kwargs):
+    """WAL, synchronous y caches de SQLITE_PRAGMAS en cada conexión nueva"""
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', {})
+    if 'mode=ro' in str(connection.settings_dict['NAME']):
+        # El modo WAL lo fija la conexión que escribe; una de sólo lectura no puede cambiarlo
+        pragmas = {nombre: valor for nombre, valor in pragmas.items() if nombre != 'journal_mode'}
+    # Cursor DB-API directo: los PRAGMA no pasan por los execute_wrapper del perfilado
+    # ni cuentan contra el presupuesto de consultas del primer request de la conexión
+    cursor = connection.connection.cursor()
+    try:
+        aplicar_pragmas(cursor, pragmas)
+    finally:
+        cursor.close()
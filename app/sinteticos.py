@@ -0,0 +1,180 @@
+import random
+from datetime import datetime, timedelta, timezone
+
+from django.contrib.auth.models import User
+from django.db import connection, models
+
+from .busqueda import TABLA_FTS_EXPERTOS, TABLA_FTS_MENSAJES, TABLA_FTS_ITEMS, reconstruir_indice
+from .models import (
+    Experto, Proyecto, EncuestaSatisfaccion, ListaChequeo, ItemTormentaIdeas, MensajeChat, VotoItem,
+    ConteoVotosItem, EstadisticasExperto
+)
+
+CATEGORIAS = ['Software', 'Energía', 'Salud', 'Educación', 'Finanzas', 'Logística', 'Agricultura', 'Turismo']
+CARGOS = ['Analista', 'Jefe de proyecto', 'Investigador', 'Consultor', 'Ingeniero', 'Profesor', 'Gerente']
+DEPARTAMENTOS = ['Desarrollo', 'Redes', 'Calidad', 'Operaciones', 'Investigación', 'Dirección']
+NOMBRES = ['Ana', 'Luis', 'María', 'Carlos', 'Elena', 'Jorge', 'Lucía', 'Pedro', 'Rosa', 'Andrés']
+APELLIDOS = ['Pérez', 'Gómez', 'López', 'Martínez', 'Rodríguez', 'Fernández', 'Díaz', 'Castro']
+PALABRAS = [
+    'propuesta', 'riesgo', 'costo', 'proveedor', 'calidad', 'plazo', 'cliente', 'servidor',
+    'migración', 'capacitación', 'energía', 'red', 'seguridad', 'prueba', 'usuario', 'datos',
+]
+
+CAMPOS_INFLUENCIA = [
+    'influencia_analisis_teoricos', 'influencia_experiencia', 'influencia_autores_nacionales',
+    'influencia_autores_extranjeros', 'influencia_conocimiento_extranjero', 'influencia_intuicion',
+]
+
+TAMANO_LOTE = 5000
+
+
+def _insertar(cursor, modelo, columnas, filas):
+    """INSERT por lotes con SQL directo (sin instanciar modelos ni emitir signals)"""
+    sql = (
+        f'INSERT INTO {modelo._meta.db_table} ({", ".join(columnas)}) '
+        f'VALUES ({", ".join(["%s"] * len(columnas))})'
+    )
+    lote = []
+    for fila in filas:
+        lote.append(fila)
+        if len(lote) == TAMANO_LOTE:
+            cursor.executemany(sql, lote)
+            lote = []
+    if lote:
+        cursor.executemany(sql, lote)
+
+
+def generar_datos(expertos, proyectos, expertos_por_proyecto=20, mensajes=0,
+                  items_por_proyecto=0, votantes_por_item=0, semilla=1, reconstruir_derivados=True):
+    """
+    Genera un conjunto de datos sintético y reproducible (misma semilla, mismos datos).
+
+    Usuarios, expertos, proyectos, membresías y encuestas se crean con bulk_create;
+    items, votos y mensajes, que son los que llegan a millones, con SQL directo.
+    Como nada de eso emite signals, al final se regeneran los conteos de votos, los
+    índices FTS, los coeficientes K y las estadísticas por experto (salvo
+    reconstruir_derivados=False, para datos que se van a descartar). Conviene llamarla dentro de transaction.atomic().
+
+    Returns: dict con las filas generadas por tabla
+    """
+    aleatorio = random.Random(semilla)
+    ahora = datetime.now(timezone.utc)
+    fecha = connection.ops.adapt_datetimefield_value
+
+    # Prefijo único para poder generar más de una vez sobre la misma base
+    prefijo = f'sintetico{(User.objects.aggregate(maximo=models.Max("id"))["maximo"] or 0) + 1}'
+    usuarios = User.objects.bulk_create([
+        User(
+            username=f'{prefijo}_{i}', password='!',
+            first_name=aleatorio.choice(NOMBRES), last_name=aleatorio.choice(APELLIDOS)
+        )
+        for i in range(expertos)
+    ], batch_size=TAMANO_LOTE)
+    lista_expertos = Experto.objects.bulk_create([
+        Experto(
+            usuario=usuario,
+            grado_cientifico=aleatorio.choice(Experto.GRADO_CIENTIFICO_CHOICES)[0],
+            categoria=aleatorio.choice(CATEGORIAS),
+            cargo_actual=aleatorio.choice(CARGOS),
+            departamento=aleatorio.choice(DEPARTAMENTOS),
+            anos_experiencia=aleatorio.randint(0, 35),
+            coeficiente_experticidad=round(aleatorio.uniform(20, 100), 2),
+        )
+        for usuario in usuarios
+    ], batch_size=TAMANO_LOTE)
+    lista_proyectos = Proyecto.objects.bulk_create([
+        Proyecto(
+            nombre=f'Proyecto sintético {i}', empresa_cliente=f'Cliente {i % 97}',
+            categoria=aleatorio.choice(CATEGORIAS),
+            investigador=aleatorio.choice(lista_expertos),
+            estado_tormenta='activa' if aleatorio.random() < 0.8 else 'cerrada',
+        )
+        for i in range(proyectos)
+    ], batch_size=TAMANO_LOTE)
+
+    # Membresías: el primer miembro de cada proyecto es el moderador
+    miembros = {}
+    listas, encuestas = [], []
+    for proyecto in lista_proyectos:
+        elegidos = aleatorio.sample(lista_expertos, min(expertos_por_proyecto, len(lista_expertos)))
+        miembros[proyecto.id] = []
+        for j, experto in enumerate(elegidos):
+            seleccionado = j == 0 or aleatorio.random() < 0.7
+            if seleccionado:
+                miembros[proyecto.id].append(experto.id)
+            listas.append(ListaChequeo(
+                proyecto=proyecto, experto=experto, es_moderador=j == 0,
+                estado='seleccionado' if seleccionado else aleatorio.choice(['pendiente', 'rechazado']),
+                fecha_decision=ahora - timedelta(days=aleatorio.randint(0, 365)),
+                coeficiente_experticidad_en_decision=experto.coeficiente_experticidad,
+            ))
+            encuestas.append(EncuestaSatisfaccion(
+                proyecto=proyecto, experto=experto,
+                estado='completada' if seleccionado or aleatorio.random() < 0.5 else 'pendiente',
+                cargo_actual=experto.cargo_actual, anos_experiencia=experto.anos_experiencia,
+                grado_cientifico=experto.grado_cientifico, conocimiento_materia=aleatorio.randint(0, 10),
+                **{campo: aleatorio.choice('AMB') for campo in CAMPOS_INFLUENCIA},
+            ))
+    ListaChequeo.objects.bulk_create(listas, batch_size=TAMANO_LOTE)
+    EncuestaSatisfaccion.objects.bulk_create(encuestas, batch_size=TAMANO_LOTE)
+
+    proyecto_ids = [proyecto_id for proyecto_id, ids in miembros.items() if ids]
+
+    def autor(i):
+        """Reparte la fila i entre proyectos y, dentro del proyecto, entre sus seleccionados"""
+        proyecto_id = proyecto_ids[i % len(proyecto_ids)]
+        ids = miembros[proyecto_id]
+        return proyecto_id, ids[(i // len(proyecto_ids)) % len(ids)]
+
+    def texto(palabras):
+        return ' '.join(aleatorio.choices(PALABRAS, k=palabras))
+
+    total_items = items_por_proyecto * len(proyecto_ids)
+    ultimo_item = ItemTormentaIdeas.objects.aggregate(maximo=models.Max('id'))['maximo'] or 0
+    with connection.cursor() as cursor:
+        _insertar(cursor, ItemTormentaIdeas, [
+            'titulo', 'descripcion', 'proyecto_id', 'experto_id', 'experto_propietario_id',
+            'estado', 'fecha_creacion', 'fecha_actualizacion',
+        ], (
+            (texto(4).capitalize(), texto(20), *autor(i), autor(i)[1],
+             'seleccionado' if aleatorio.random() < 0.75 else 'pendiente',
+             fecha(ahora - timedelta(minutes=total_items - i)), fecha(ahora))
+            for i in range(total_items)
+        ))
+
+        # Cada item seleccionado recibe votos de ~votantes_por_item seleccionados del proyecto
+        if votantes_por_item:
+            divisor = max(1, expertos_por_proyecto // votantes_por_item)
+            cursor.execute(f'''
+                INSERT INTO {VotoItem._meta.db_table}
+                    (experto_id, item_id, proyecto_id, de_acuerdo, evaluacion, fecha_voto)
+                SELECT l.experto_id, i.id, i.proyecto_id,
+                       (l.experto_id + i.id) %% 3 > 0, (l.experto_id * 7 + i.id) %% 5 + 1, i.fecha_creacion
+                FROM {ItemTormentaIdeas._meta.db_table} i
+                JOIN {ListaChequeo._meta.db_table} l
+                  ON l.proyecto_id = i.proyecto_id AND l.estado = 'seleccionado'
+                WHERE i.id > %s AND i.estado = 'seleccionado' AND (l.experto_id + i.id) %% %s = 0
+            ''', [ultimo_item, divisor])
+
+        _insertar(cursor, MensajeChat, ['proyecto_id', 'experto_id', 'contenido', 'fecha_envio'], (
+            (*autor(i), texto(aleatorio.randint(3, 25)), fecha(ahora - timedelta(seconds=mensajes - i)))
+            for i in range(mensajes)
+        ))
+
+    # Lo que mantienen los signals en uso normal
+    if reconstruir_derivados:
+        ConteoVotosItem.objects.reconstruir()
+        for tabla in [TABLA_FTS_EXPERTOS, TABLA_FTS_MENSAJES, TABLA_FTS_ITEMS]:
+            reconstruir_indice(tabla)
+        EncuestaSatisfaccion.objects.recalcular_coeficientes_k()
+        EstadisticasExperto.objects.recalcular()
+
+    return {
+        'expertos': len(lista_expertos),
+        'proyectos': len(lista_proyectos),
+        'listas_chequeo': len(listas),
+        'encuestas': len(encuestas),
+        'items': total_items,
+        'votos': VotoItem.objects.filter(item_id__gt=ultimo_item).count(),
+        'mensajes': mensajes,
+    }
@@ -0,0 +1,55 @@
+import copy
+import os
+import re
+import tempfile
+from contextlib import contextmanager
+
+from asgiref.local import Local
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, connections
+
+_NOMBRE_PRAGMA = re.compile(r'[a-z_]+')
+_VALOR_PRAGMA = re.compile(r'-?\w+')
+
+
+def aplicar_pragmas(cursor, pragmas):
+    """
+    Ejecuta los PRAGMA de SQLITE_PRAGMAS sobre una conexión recién abierta.
+    Acepta un cursor de Django o de sqlite3 (lo usa también benchmark_sqlite).
+    """
+    for nombre, valor in pragmas.items():
+        # Los PRAGMA no admiten parámetros: se validan antes de interpolarlos
+        if not _NOMBRE_PRAGMA.fullmatch(nombre) or not _VALOR_PRAGMA.fullmatch(str(valor)):
+            raise ImproperlyConfigured(f'PRAGMA SQLite inválido: {nombre} = {valor!r}')
+        cursor.execute(f'PRAGMA {nombre} = {valor}')
+
+
+@contextmanager
+def base_temporal():
+    """
+    Apunta el ORM a un archivo SQLite temporal con las migraciones aplicadas (la
+    réplica de lectura, en modo sólo lectura sobre el mismo archivo) y lo borra al
+    salir. Las conexiones abiertas no se tocan: se restauran tal cual, con sus
+    transacciones. Para benchmarks y pruebas de carga: no escriben en la base
+    configurada ni retienen su lock de escritura.
+    Returns: str, ruta del archivo temporal
+    """
+    if connections[DEFAULT_DB_ALIAS].vendor != 'sqlite':
+        raise ImproperlyConfigured('base_temporal() sólo admite SQLite')
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, 'temporal.sqlite3')
+        ajustes = copy.deepcopy(connections.settings)
+        for alias, ajustes_alias in ajustes.items():
+            ajustes_alias['NAME'] = ruta if alias == DEFAULT_DB_ALIAS else f'file:{ruta}?mode=ro'
+
+        originales = connections.settings, connections._connections
+        connections.settings = ajustes
+        connections._connections = Local(connections.thread_critical)
+        try:
+            call_command('migrate', database=DEFAULT_DB_ALIAS, interactive=False, verbosity=0)
+            yield ruta
+        finally:
+            connections.close_all()
+            connections.settings, connections._connections = originales
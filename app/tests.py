@@ -1,3 +1,1519 @@
-from django.test import TestCase
+import asyncio
+import contextvars
+import itertools
+import json
+import os
+import random
+import tempfile
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.cache import cache, caches
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection, connections
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import (
+    Experto, Proyecto, EncuestaSatisfaccion, ListaChequeo, ItemTormentaIdeas, VotoItem, PerfilPesosK,
+    MensajeChat, ConteoVotosItem, RecomendacionExperto, MarcaIndiceRecomendaciones, EstadisticasExperto,
+    VersionRecurso
+)
+from .difusion import difusor_chat
+from .buffer_chat import BufferChat, buffer_chat
+from .middleware import LecturasPrimariaMiddleware
+from .perfilado import PresupuestoConsultasExcedido
+from .preseleccion import preseleccionar
+from .sinteticos import generar_datos
+from .routers import (
+    LecturaEscrituraRouter, fijar_lecturas_en_primaria, lecturas_en_primaria, restaurar_lecturas
+)
+from .coeficiente_k import CAMPOS_COEFICIENTE_K, PESOS_K
+from .busqueda import TABLA_FTS_EXPERTOS, TABLA_FTS_MENSAJES, fts_disponible, reconstruir_indice
+from .views.expertos import dashboard
+from .views.utils import calculos
+
+
+def crear_experto(username, **extra):
+    usuario = User.objects.create(username=username, first_name=username.title(), last_name='Test')
+    extra.setdefault('grado_cientifico', 'Doctor')
+    return Experto.objects.create(usuario=usuario, **extra)
+
+
+class DashboardExpertoTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.investigador = crear_experto('investigador')
+        self.experto = crear_experto('experto')
+        self.moderador = crear_experto('moderador')
+
+    def crear_proyectos(self, cantidad):
+        """Crea proyectos en todos los estados que muestra el dashboard"""
+        for i in range(cantidad):
+            # Tormenta cerrada con items por votar
+            cerrado = Proyecto.objects.create(
+                nombre=f'Cerrado {i}', empresa_cliente='C', investigador=self.investigador,
+                estado_tormenta='cerrada'
+            )
+            ListaChequeo.objects.create(proyecto=cerrado, experto=self.experto, estado='seleccionado')
+            ListaChequeo.objects.create(
+                proyecto=cerrado, experto=self.moderador, estado='seleccionado', es_moderador=True
+            )
+            for j in range(2):
+                item = ItemTormentaIdeas.objects.create(
+                    titulo=f'Item {j}', descripcion='d', proyecto=cerrado, estado='seleccionado',
+                    experto=self.moderador, experto_propietario=self.moderador
+                )
+            VotoItem.objects.create(experto=self.experto, item=item, proyecto=cerrado, evaluacion=3)
+
+            # Tormenta activa
+            activo = Proyecto.objects.create(
+                nombre=f'Activo {i}', empresa_cliente='C', investigador=self.investigador
+            )
+            ListaChequeo.objects.create(proyecto=activo, experto=self.experto, estado='seleccionado')
+
+            # Encuestas pendientes (una bloqueada) y completada
+            abierto = Proyecto.objects.create(
+                nombre=f'Abierto {i}', empresa_cliente='C', investigador=self.investigador
+            )
+            for proyecto, estado in [(abierto, 'pendiente'), (activo, 'pendiente'), (cerrado, 'completada')]:
+                EncuestaSatisfaccion.objects.create(
+                    proyecto=proyecto, experto=self.experto, estado=estado,
+                    cargo_actual='c', anos_experiencia=1, grado_cientifico='Doctor'
+                )
+
+    def contar_consultas_dashboard(self):
+        cache.clear()
+        url = reverse('app:dashboard_experto', args=[self.experto.id])
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(consultas)
+
+    def test_consultas_constantes_con_mas_proyectos(self):
+        self.crear_proyectos(1)
+        pocas = self.contar_consultas_dashboard()
+
+        self.crear_proyectos(5)
+        muchas = self.contar_consultas_dashboard()
+
+        self.assertEqual(pocas, muchas)
+        # experto + chats + pendientes + completadas + moderadores
+        self.assertEqual(muchas, 5)
+
+    def test_votaciones_pendientes(self):
+        self.crear_proyectos(2)
+        datos = self.experto.get_dashboard_data()
+
+        self.assertEqual(datos['total_votaciones_pendientes'], 2)
+        self.assertEqual({v['cantidad_items'] for v in datos['votaciones_pendientes']}, {1})
+        self.assertEqual(
+            {v['moderador'] for v in datos['votaciones_pendientes']}, {'Moderador Test'}
+        )
+        self.assertEqual(len(datos['pendientes_bloqueadas']), 2)
+        self.assertEqual(len(datos['pendientes_no_bloqueadas']), 2)
+
+    def test_cache_invalidado_por_signals(self):
+        self.crear_proyectos(1)
+        self.contar_consultas_dashboard()
+
+        # Segunda visita servida desde el cache: sólo la consulta del experto
+        url = reverse('app:dashboard_experto', args=[self.experto.id])
+        with self.assertNumQueries(1):
+            self.client.get(url)
+
+        proyecto = Proyecto.objects.get(nombre='Cerrado 0')
+        with self.captureOnCommitCallbacks(execute=True):
+            ItemTormentaIdeas.objects.create(
+                titulo='Nuevo', descripcion='d', proyecto=proyecto, estado='seleccionado',
+                experto=self.moderador, experto_propietario=self.moderador
+            )
+
+        datos = self.experto.get_dashboard_data()
+        self.assertEqual(datos['votaciones_pendientes'][0]['cantidad_items'], 2)
+
+
+class CoeficienteKLoteTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.proyecto = Proyecto.objects.create(nombre='P', empresa_cliente='C')
+        letras = ['A', 'M', 'B']
+        combinaciones = itertools.product(letras, letras, letras, [None, 0, 3, 7, 10])
+        for i, (analisis, extranjero, intuicion, materia) in enumerate(combinaciones):
+            EncuestaSatisfaccion.objects.create(
+                proyecto=self.proyecto, experto=crear_experto(f'e{i}'), estado='completada',
+                cargo_actual='c', anos_experiencia=1, grado_cientifico='Doctor',
+                conocimiento_materia=materia,
+                influencia_analisis_teoricos=analisis,
+                influencia_experiencia='M',
+                influencia_autores_nacionales=intuicion,
+                influencia_autores_extranjeros=extranjero,
+                influencia_conocimiento_extranjero=analisis,
+                influencia_intuicion=intuicion,
+            )
+
+    def coeficientes_escalares(self):
+        return {
+            encuesta.id: calculos.calcular_coeficiente_k(encuesta).coeficiente_k
+            for encuesta in EncuestaSatisfaccion.objects.order_by('id')
+        }
+
+    def test_mismo_redondeo_que_calculo_escalar(self):
+        esperados = self.coeficientes_escalares()
+
+        call_command('recalcular_coeficientes_k', stdout=StringIO())
+
+        for encuesta_id, coeficiente_k in EncuestaSatisfaccion.objects.values_list('id', 'coeficiente_k'):
+            self.assertEqual(coeficiente_k, Decimal(str(esperados[encuesta_id])).quantize(Decimal('0.01')))
+
+    def test_lote_coincide_con_calculo_escalar(self):
+        columnas = dict(zip(
+            CAMPOS_COEFICIENTE_K,
+            zip(*EncuestaSatisfaccion.objects.order_by('id').values_list(*CAMPOS_COEFICIENTE_K))
+        ))
+        lote = calculos.calcular_coeficientes_k_lote(columnas)
+        self.assertEqual(lote, list(self.coeficientes_escalares().values()))
+
+    def test_dry_run_no_guarda(self):
+        salida = StringIO()
+        call_command('recalcular_coeficientes_k', '--dry-run', stdout=salida)
+
+        self.assertIn('encuestas con diferencias', salida.getvalue())
+        self.assertFalse(EncuestaSatisfaccion.objects.filter(coeficiente_k__isnull=False).exists())
+
+        call_command('recalcular_coeficientes_k', stdout=StringIO())
+        salida = StringIO()
+        call_command('recalcular_coeficientes_k', '--dry-run', stdout=salida)
+        self.assertIn('sin diferencias', salida.getvalue())
+
+    def test_recalculo_incremental_por_version_de_perfil(self):
+        call_command('recalcular_coeficientes_k', stdout=StringIO())
+        self.assertEqual(EncuestaSatisfaccion.objects.recalcular_coeficientes_k(), [])
+
+        pesos = dict(PESOS_K, conocimiento_materia=0.30)
+        success, perfil, _ = PerfilPesosK.objects.crear_version(self.proyecto, pesos)
+        self.assertTrue(success)
+        self.assertEqual(perfil.version, 1)
+
+        diferencias = EncuestaSatisfaccion.objects.recalcular_coeficientes_k()
+        self.assertEqual(len(diferencias), EncuestaSatisfaccion.objects.count())
+        self.assertFalse(EncuestaSatisfaccion.objects.exclude(perfil_k=perfil).exists())
+        self.assertEqual(EncuestaSatisfaccion.objects.recalcular_coeficientes_k(), [])
+
+        # La calculadora del proyecto es la misma que usó el recálculo por lotes
+        encuesta = EncuestaSatisfaccion.objects.filter(conocimiento_materia=10).first()
+        guardado = encuesta.coeficiente_k
+        calculadora = self.proyecto.get_calculadora_k()
+        self.assertIs(calculadora, self.proyecto.get_calculadora_k())
+        calculadora(encuesta)
+        self.assertEqual(Decimal(str(encuesta.coeficiente_k)), guardado)
+        self.assertEqual(encuesta.perfil_k_id, perfil.id)
+
+
+    @override_settings(
+        CACHES={
+            'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'tests-default'},
+            'compartido': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'tests-compartido'},
+        },
+        PERFIL_K_CACHE_ALIAS='compartido'
+    )
+    def test_perfil_activo_en_el_alias_configurado(self):
+        key = PerfilPesosK.objects.CACHE_ACTIVO_KEY.format(self.proyecto.id)
+        self.proyecto.get_calculadora_k()
+        self.assertEqual(caches['compartido'].get(key), 0)
+        self.assertIsNone(caches['default'].get(key))
+
+        _, perfil, _ = PerfilPesosK.objects.crear_version(self.proyecto, dict(PESOS_K, intuicion=0.5))
+        self.assertEqual(self.proyecto.get_calculadora_k().perfil_id, perfil.id)
+        self.assertIsNone(caches['default'].get(key))
+
+
+class CatalogoExpertosTests(TestCase):
+    def setUp(self):
+        self.proyecto = Proyecto.objects.create(nombre='P', empresa_cliente='C', categoria='Software')
+        otro = Proyecto.objects.create(nombre='Otro', empresa_cliente='C')
+        grados = ['Doctor', 'Master', 'Licenciado']
+        for i in range(23):
+            experto = crear_experto(
+                f'experto{i % 7}_{i}', categoria='Software',
+                grado_cientifico=grados[i % 3],
+                anos_experiencia=i % 4,
+                coeficiente_experticidad=None if i % 5 == 0 else Decimal(i % 6)
+            )
+            # Encuestas en otros proyectos no deben duplicar filas
+            EncuestaSatisfaccion.objects.create(
+                proyecto=otro, experto=experto, estado='completada',
+                cargo_actual='c', anos_experiencia=1, grado_cientifico='Doctor'
+            )
+            if i % 2:
+                EncuestaSatisfaccion.objects.create(
+                    proyecto=self.proyecto, experto=experto,
+                    cargo_actual='c', anos_experiencia=1, grado_cientifico='Doctor'
+                )
+        crear_experto('fuera', categoria='Otra')
+
+    def recorrer(self, orden, limite):
+        url = reverse('app:pagina_expertos', args=[self.proyecto.id])
+        ids, cursor = [], ''
+        while True:
+            datos = self.client.get(url, {'orden': orden, 'cursor': cursor, 'limite': limite}).json()
+            ids += [experto['id'] for experto in datos['expertos']]
+            cursor = datos['siguiente_cursor']
+            if not cursor:
+                return ids
+
+    def test_paginas_recorren_el_orden_completo(self):
+        for orden in ['id', 'nombre', 'coeficiente', 'grado', 'experiencia']:
+            esperado = list(
+                Experto.objects.con_estado_encuesta(self.proyecto, orden)
+                .filter(categoria='Software').values_list('id', flat=True)
+            )
+            self.assertEqual(len(esperado), 23)
+            self.assertEqual(self.recorrer(orden, 4), esperado, orden)
+
+    def test_estado_encuesta_del_proyecto(self):
+        expertos, _ = Experto.objects.pagina_catalogo(self.proyecto, limite=100)
+        self.assertEqual(
+            sum(1 for experto in expertos if experto.estado_encuesta == 'pendiente'), 11
+        )
+        self.assertFalse(any(experto.estado_encuesta == 'completada' for experto in expertos))
+
+    def test_cursor_invalido(self):
+        url = reverse('app:pagina_expertos', args=[self.proyecto.id])
+        self.assertEqual(self.client.get(url, {'cursor': 'no-es-un-cursor'}).status_code, 400)
+
+
+class BusquedaExpertosTests(TestCase):
+    def setUp(self):
+        self.proyecto = Proyecto.objects.create(nombre='P', empresa_cliente='C', categoria='Software')
+        self.ana = crear_experto('ana', cargo_actual='Jefa de redes', categoria='Software')
+        self.luis = crear_experto('luis', cargo_actual='Analista', departamento='Redes', categoria='Energía')
+        crear_experto('pedro', cargo_actual='Contador', grado_cientifico='Master')
+
+    def buscar(self, texto, **kwargs):
+        return [experto.id for experto in Experto.objects.buscar(texto, self.proyecto, **kwargs)]
+
+    def test_busqueda_fts_ordenada_por_relevancia(self):
+        self.assertTrue(fts_disponible(TABLA_FTS_EXPERTOS))
+        # Por prefijo "ana" también encuentra "Analista", pero el nombre pesa más
+        self.assertEqual(self.buscar('ana'), [self.ana.id, self.luis.id])
+        self.assertEqual(set(self.buscar('red')), {self.ana.id, self.luis.id})
+        self.assertEqual(self.buscar('redes', solo_categoria=True), [self.ana.id])
+        # Sin acentos y por prefijo
+        self.assertEqual(self.buscar('energia'), [self.luis.id])
+        self.assertEqual(self.buscar('mast'), [Experto.objects.get(grado_cientifico='Master').id])
+        # La sintaxis FTS5 del usuario no rompe la consulta
+        self.assertEqual(self.buscar('"jefa" -* ('), [self.ana.id])
+
+    def test_signals_mantienen_el_indice(self):
+        self.ana.usuario.first_name = 'Mariana'
+        self.ana.usuario.save()
+        self.luis.cargo_actual = 'Gerente'
+        self.luis.save()
+
+        self.assertEqual(self.buscar('mariana'), [self.ana.id])
+        self.assertEqual(self.buscar('gerente'), [self.luis.id])
+        self.assertEqual(self.buscar('analista'), [])
+
+        self.luis.delete()
+        self.assertEqual(self.buscar('gerente'), [])
+
+    def test_fallback_like_sin_fts(self):
+        with mock.patch('app.models.fts_disponible', return_value=False):
+            self.assertEqual(set(self.buscar('red')), {self.ana.id, self.luis.id})
+            self.assertEqual(self.buscar('jefa redes'), [self.ana.id])
+
+
+class BusquedaChatModeradorTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.proyecto = Proyecto.objects.create(nombre='P', empresa_cliente='C')
+        self.moderador = crear_experto('moderador')
+        self.autor = crear_experto('autor')
+        ListaChequeo.objects.create(
+            proyecto=self.proyecto, experto=self.moderador, estado='seleccionado', es_moderador=True
+        )
+        ListaChequeo.objects.create(proyecto=self.proyecto, experto=self.autor, estado='seleccionado')
+        self.mensajes = [
+            MensajeChat.objects.create(proyecto=self.proyecto, experto=self.autor, contenido=f'Idea {i} sobre <b>redes</b>')
+            for i in range(5)
+        ]
+        otro = Proyecto.objects.create(nombre='Otro', empresa_cliente='C')
+        MensajeChat.objects.create(proyecto=otro, experto=self.autor, contenido='Idea sobre redes')
+
+    def buscar(self, **params):
+        params.setdefault('moderador_id', self.moderador.id)
+        return self.client.get(reverse('app:api_buscar_proyecto', args=[self.proyecto.id]), params)
+
+    def test_busqueda_paginada_y_resaltada(self):
+        self.assertTrue(fts_disponible(TABLA_FTS_MENSAJES))
+        ids = []
+        cursor = ''
+        while True:
+            data = self.buscar(q='red', cursor=cursor).json()
+            ids += [mensaje['id'] for mensaje in data['resultados']]
+            cursor = data['siguiente_cursor']
+            if not cursor:
+                break
+
+        # Más recientes primero y sin mensajes de otros proyectos
+        self.assertEqual(ids, [mensaje.id for mensaje in reversed(self.mensajes)])
+        resaltado = data['resultados'][-1]['contenido_resaltado']
+        self.assertEqual(resaltado, 'Idea 0 sobre &lt;b&gt;<mark>redes</mark>&lt;/b&gt;')
+
+    def test_filtra_el_proyecto_dentro_del_match(self):
+        # Muchos proyectos con los mismos términos (bulk_create no emite signals)
+        otros = Proyecto.objects.bulk_create([
+            Proyecto(nombre=f'Otro {i}', empresa_cliente='C') for i in range(40)
+        ])
+        MensajeChat.objects.bulk_create([
+            MensajeChat(proyecto=otro, experto=self.autor, contenido=f'Idea {i} sobre redes')
+            for otro in otros for i in range(5)
+        ])
+        reconstruir_indice(TABLA_FTS_MENSAJES)
+
+        resultados, _ = MensajeChat.objects.buscar(self.proyecto.id, 'redes idea')
+        self.assertEqual([m['id'] for m in resultados], [mensaje.id for mensaje in reversed(self.mensajes)])
+        # El id del proyecto sólo filtra: buscarlo como término no encuentra sus mensajes
+        self.assertEqual(MensajeChat.objects.buscar(otros[-1].id, str(otros[-1].id))[0], [])
+
+    def test_fallback_like_sin_fts(self):
+        with mock.patch('app.models.fts_disponible', return_value=False):
+            data = self.buscar(q='redes idea').json()
+        self.assertEqual(len(data['resultados']), 5)
+        self.assertIn('<mark>redes</mark>', data['resultados'][0]['contenido_resaltado'])
+
+    def test_solo_moderador_y_promover_mensaje(self):
+        self.assertEqual(self.buscar(moderador_id=self.autor.id, q='redes').status_code, 403)
+        self.assertEqual(self.buscar(q='redes', cursor='x').status_code, 400)
+
+        url = reverse('app:api_promover_mensaje', args=[self.proyecto.id, self.mensajes[2].id])
+        response = self.client.post(url, {'moderador_id': self.moderador.id}, content_type='application/json')
+        self.assertTrue(response.json()['success'])
+
+        item = ItemTormentaIdeas.objects.get()
+        self.assertEqual((item.experto, item.descripcion), (self.autor, self.mensajes[2].contenido))
+        data = self.buscar(tipo='items', q='idea 2').json()
+        self.assertEqual([resultado['id'] for resultado in data['resultados']], [item.id])
+
+
+class FinalizarSeleccionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.proyecto = Proyecto.objects.create(nombre='P', empresa_cliente='C')
+        self.anterior = crear_experto('anterior')
+        ListaChequeo.objects.create(
+            proyecto=self.proyecto, experto=self.anterior, estado='seleccionado', es_moderador=True
+        )
+        self.encuestados = [crear_experto(f'e{i}') for i in range(6)]
+        for experto in self.encuestados:
+            EncuestaSatisfaccion.objects.create(
+                proyecto=self.proyecto, experto=experto, estado='completada',
+                cargo_actual='c', anos_experiencia=1, grado_cientifico='Doctor', conocimiento_materia=8,
+                **{campo: 'A' for campo in [
+                    'influencia_analisis_teoricos', 'influencia_experiencia', 'influencia_autores_nacionales',
+                    'influencia_autores_extranjeros', 'influencia_conocimiento_extranjero', 'influencia_intuicion',
+                ]}
+            )
+        ListaChequeo.objects.create(proyecto=self.proyecto, experto=self.encuestados[0], estado='pendiente')
+
+    def finalizar(self, moderador):
+        response = self.client.post(
+            reverse('app:finalizar_proceso_encuesta', args=[self.proyecto.id]),
+            json.dumps({'moderador_id': moderador.id}), content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_crea_actualiza_y_reasigna_moderador_en_bloque(self):
+        moderador = self.encuestados[1]
+        # Membresías en cache antes de finalizar: bulk_* no emite signals
+        self.assertTrue(ListaChequeo.objects.es_moderador(self.proyecto.id, self.anterior))
+
+        with CaptureQueriesContext(connection) as consultas:
+            datos = self.finalizar(moderador)
+
+        self.assertEqual((datos['creados'], datos['actualizados']), (5, 2))
+        self.assertIn('duracion_ms', datos)
+        # Una consulta por paso, no por encuesta
+        self.assertLess(len(consultas), 15)
+        self.assertEqual(
+            ListaChequeo.objects.filter(proyecto=self.proyecto, estado='seleccionado').count(), 7
+        )
+        self.assertFalse(ListaChequeo.objects.es_moderador(self.proyecto.id, self.anterior))
+        self.assertTrue(ListaChequeo.objects.es_moderador(self.proyecto.id, moderador))
+        fila = ListaChequeo.objects.get(proyecto=self.proyecto, experto=self.encuestados[0])
+        self.assertEqual(fila.comentarios, f'Seleccionado. K={fila.coeficiente_experticidad_en_decision}')
+        self.assertEqual(ListaChequeo.objects.get(proyecto=self.proyecto, experto=moderador).comentarios,
+                         'Moderador del proyecto')
+
+        # Repetir con los mismos datos no reescribe nada; cambiar de moderador toca dos filas
+        self.assertEqual((self.finalizar(moderador)['creados'], self.finalizar(moderador)['actualizados']), (0, 0))
+        self.assertEqual(self.finalizar(self.encuestados[2])['actualizados'], 2)
+        self.assertEqual(
+            ListaChequeo.objects.filter(proyecto=self.proyecto, es_moderador=True).get().experto,
+            self.encuestados[2]
+        )
+
+
+class PreseleccionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.proyecto = Proyecto.objects.create(nombre='P', empresa_cliente='C')
+        departamentos = ['Redes', 'Redes', 'Redes', 'Redes', 'Calidad', 'Calidad', 'Datos']
+        grados = ['Doctor', 'Doctor', 'Master', 'Doctor', 'Doctor', 'Licenciado', 'Doctor']
+        coeficientes = ['95', '90', '85', '80', '70', '60', '40']
+        self.encuestas = []
+        for i, (departamento, grado, k) in enumerate(zip(departamentos, grados, coeficientes)):
+            experto = crear_experto(f'e{i}', departamento=departamento, grado_cientifico=grado)
+            self.encuestas.append(EncuestaSatisfaccion.objects.create(
+                proyecto=self.proyecto, experto=experto, estado='completada', cargo_actual='c',
+                anos_experiencia=1, grado_cientifico=grado, conocimiento_materia=5,
+                **{campo: 'M' for campo in [
+                    'influencia_analisis_teoricos', 'influencia_experiencia', 'influencia_autores_nacionales',
+                    'influencia_autores_extranjeros', 'influencia_conocimiento_extranjero', 'influencia_intuicion',
+                ]}
+            ))
+        # K fijo para el test (el signal lo calcula al guardar)
+        for encuesta, k in zip(self.encuestas, coeficientes):
+            EncuestaSatisfaccion.objects.filter(id=encuesta.id).update(coeficiente_k=Decimal(k))
+
+    def test_top_k_igual_que_ordenar_sin_restricciones(self):
+        aleatorio = random.Random(3)
+        filas = [
+            (i, i, Decimal(aleatorio.randint(0, 10000)) / 100, aleatorio.choice('ABCD'), aleatorio.choice('XY'))
+            for i in range(1, 2000)
+        ]
+        seleccion, evaluadas = preseleccionar(iter(filas), 25, diversificar=False)
+
+        esperados = sorted(filas, key=lambda fila: (-fila[2], fila[0]))[:25]
+        self.assertEqual([elegido['encuesta_id'] for elegido in seleccion], [fila[0] for fila in esperados])
+        self.assertEqual(evaluadas, len(filas))
+
+    def test_restricciones_y_diversidad(self):
+        resultado = EncuestaSatisfaccion.objects.preseleccionar(
+            self.proyecto.id, 4, k_minimo=Decimal('50'), max_por_departamento=2
+        )
+        seleccion = resultado['seleccion']
+        # 40 no llega al mínimo; Redes no pasa de 2; Master y Licenciado entran por diversidad
+        self.assertEqual(resultado['evaluadas'], 6)
+        self.assertEqual(
+            [elegido['experto_id'] for elegido in seleccion],
+            [self.encuestas[i].experto_id for i in [0, 2, 4, 5]]
+        )
+        self.assertEqual([elegido['motivo'] for elegido in seleccion], ['diversidad'] * 4)
+
+        sin_diversidad = EncuestaSatisfaccion.objects.preseleccionar(
+            self.proyecto.id, 3, max_por_departamento=2, diversificar=False
+        )['seleccion']
+        self.assertEqual(
+            [elegido['experto_id'] for elegido in sin_diversidad],
+            [self.encuestas[i].experto_id for i in [0, 1, 4]]
+        )
+
+    def test_vista_previa_y_aplicar(self):
+        url = reverse('app:api_preseleccion', args=[self.proyecto.id])
+        self.assertEqual(self.client.get(url, {'total': 0}).status_code, 400)
+
+        previa = self.client.get(url, {'total': 3, 'k_minimo': '50', 'diversificar': 'false'}).json()
+        self.assertEqual(len(previa['seleccion']), 3)
+        self.assertFalse(ListaChequeo.objects.exists())
+
+        response = self.client.post(
+            url, json.dumps({'total': 3, 'k_minimo': '50', 'diversificar': False}),
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        datos = response.json()
+        self.assertEqual(datos['seleccion'], previa['seleccion'])
+        elegidos = {elegido['experto_id'] for elegido in previa['seleccion']}
+        self.assertEqual(set(ListaChequeo.objects.filter(
+            proyecto=self.proyecto, estado='seleccionado'
+        ).values_list('experto_id', flat=True)), elegidos)
+        self.assertEqual(ListaChequeo.objects.filter(proyecto=self.proyecto, estado='rechazado').count(), 4)
+        # Sin moderador marcado modera el primero de la preselección
+        self.assertEqual(self.proyecto.moderador_id, self.encuestas[0].experto_id)
+
+
+class RecomendacionesTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        generar_datos(expertos=30, proyectos=6, expertos_por_proyecto=8, items_por_proyecto=4, votantes_por_item=4)
+
+    def indice(self):
+        return {
+            (fila.categoria, fila.experto_id): (
+                fila.encuestas_completadas, fila.suma_k, fila.selecciones, fila.items_propuestos,
+                fila.votos_recibidos, fila.votos_de_acuerdo, fila.puntuacion
+            )
+            for fila in RecomendacionExperto.objects.all()
+        }
+
+    def test_incremental_igual_que_completo(self):
+        self.assertTrue(RecomendacionExperto.objects.reconstruir()['completo'])
+        self.assertEqual(RecomendacionExperto.objects.reconstruir()['expertos'], 0)
+
+        # Un proyecto nuevo de una categoría existente con decisiones, items y votos
+        categoria = Proyecto.objects.first().categoria
+        proyecto = Proyecto.objects.create(nombre='Nuevo', empresa_cliente='C', categoria=categoria)
+        autor, votante = Experto.objects.order_by('id')[:2]
+        ListaChequeo.objects.create(
+            proyecto=proyecto, experto=autor, estado='seleccionado', fecha_decision=timezone.now()
+        )
+        item = ItemTormentaIdeas.objects.create(
+            titulo='Idea', descripcion='d', proyecto=proyecto, experto=autor, experto_propietario=autor,
+            estado='seleccionado'
+        )
+        VotoItem.objects.create(experto=votante, item=item, proyecto=proyecto, de_acuerdo=True, evaluacion=5)
+
+        # Una encuesta que se responde (K calculada en lote) y borrados de un item y un voto
+        pendiente = EncuestaSatisfaccion.objects.filter(estado='pendiente').exclude(
+            experto__in=[autor, votante]
+        ).first()
+        pendiente.estado = 'completada'
+        pendiente.save()
+        EncuestaSatisfaccion.objects.recalcular_coeficientes_k()
+        item_borrado = ItemTormentaIdeas.objects.exclude(
+            experto_propietario__in=[autor, votante, pendiente.experto]
+        ).filter(votos_recibidos__isnull=True).first()
+        item_borrado.delete()
+        voto_borrado = VotoItem.objects.exclude(item__experto_propietario__in=[
+            autor, votante, pendiente.experto, item_borrado.experto_propietario
+        ]).first()
+        voto_borrado.delete()
+
+        resultado = RecomendacionExperto.objects.reconstruir()
+        self.assertFalse(resultado['completo'])
+        self.assertEqual(resultado['expertos'], 4)
+        incremental = self.indice()
+
+        RecomendacionExperto.objects.reconstruir(completo=True)
+        self.assertEqual(incremental, self.indice())
+        fila = RecomendacionExperto.objects.get(categoria=categoria, experto=autor)
+        self.assertGreaterEqual(fila.items_propuestos, 1)
+
+    def test_item_reasignado_por_moderador(self):
+        categoria = Proyecto.objects.first().categoria
+        proyecto = Proyecto.objects.create(nombre='Nuevo', empresa_cliente='C', categoria=categoria)
+        anterior, nuevo, moderador = Experto.objects.order_by('id')[:3]
+        for experto in (anterior, nuevo, moderador):
+            ListaChequeo.objects.create(
+                proyecto=proyecto, experto=experto, estado='seleccionado', es_moderador=experto == moderador
+            )
+        item = ItemTormentaIdeas.objects.create(
+            titulo='Idea', descripcion='d', proyecto=proyecto, experto=anterior, experto_propietario=anterior,
+            estado='seleccionado'
+        )
+        VotoItem.objects.create(experto=moderador, item=item, proyecto=proyecto, de_acuerdo=True, evaluacion=5)
+        RecomendacionExperto.objects.reconstruir(completo=True)
+
+        exito, _, _ = ItemTormentaIdeas.objects.actualizar_desde_chat_moderador(
+            item.id, proyecto.id, 'Idea', nuevo.id, moderador
+        )
+        self.assertTrue(exito)
+        marca = MarcaIndiceRecomendaciones.objects.get()
+        self.assertTrue({anterior.id, nuevo.id} <= RecomendacionExperto.objects.expertos_afectados(marca))
+        mantenidos = list(EstadisticasExperto.objects.order_by('experto_id').values_list('experto_id', 'total_items'))
+        EstadisticasExperto.objects.recalcular()
+        self.assertEqual(
+            mantenidos, list(EstadisticasExperto.objects.order_by('experto_id').values_list('experto_id', 'total_items'))
+        )
+
+        RecomendacionExperto.objects.reconstruir()
+        incremental = self.indice()
+        RecomendacionExperto.objects.reconstruir(completo=True)
+        self.assertEqual(incremental, self.indice())
+
+    def test_recomendados_en_una_consulta(self):
+        RecomendacionExperto.objects.reconstruir()
+        categoria = RecomendacionExperto.objects.values_list('categoria', flat=True).first()
+        proyecto = Proyecto.objects.create(nombre='Nuevo', empresa_cliente='C', categoria=categoria)
+
+        with self.assertNumQueries(1):
+            recomendados = RecomendacionExperto.objects.para_proyecto(proyecto, limite=5)
+            nombres = [recomendacion.experto.usuario.username for recomendacion in recomendados]
+        self.assertEqual(len(nombres), min(5, RecomendacionExperto.objects.filter(categoria=categoria).count()))
+        puntuaciones = [recomendacion.puntuacion for recomendacion in recomendados]
+        self.assertEqual(puntuaciones, sorted(puntuaciones, reverse=True))
+
+        # Quien ya tiene encuesta en el proyecto deja de aparecer
+        primero = recomendados[0].experto
+        EncuestaSatisfaccion.objects.create(
+            proyecto=proyecto, experto=primero, estado='pendiente', cargo_actual='c', anos_experiencia=1,
+            grado_cientifico='Doctor', conocimiento_materia=5
+        )
+        self.assertNotIn(primero, [r.experto for r in RecomendacionExperto.objects.para_proyecto(proyecto)])
+
+        response = self.client.get(reverse('app:expertos_totales', args=[proyecto.id]))
+        self.assertContains(response, 'Expertos recomendados')
+
+
+class EstadisticasExpertoTests(TestCase):
+    CAMPOS = [
+        'total_encuestas', 'encuestas_completadas', 'total_items', 'items_activos',
+        'votos_emitidos', 'proyectos_seleccionado', 'k_promedio',
+    ]
+
+    def setUp(self):
+        cache.clear()
+        self.proyecto = Proyecto.objects.create(nombre='P', empresa_cliente='C')
+        self.expertos = [crear_experto(f'e{i}') for i in range(3)]
+        for experto in self.expertos:
+            ListaChequeo.objects.create(proyecto=self.proyecto, experto=experto, estado='seleccionado')
+            EncuestaSatisfaccion.objects.create(
+                proyecto=self.proyecto, experto=experto, estado='completada', cargo_actual='c',
+                anos_experiencia=1, grado_cientifico='Doctor', conocimiento_materia=7,
+                **{campo: 'A' for campo in [
+                    'influencia_analisis_teoricos', 'influencia_experiencia', 'influencia_autores_nacionales',
+                    'influencia_autores_extranjeros', 'influencia_conocimiento_extranjero', 'influencia_intuicion',
+                ]}
+            )
+        self.items = [
+            ItemTormentaIdeas.objects.create(
+                titulo=f'Item {i}', descripcion='D', proyecto=self.proyecto, experto=self.expertos[0],
+                experto_propietario=self.expertos[0], estado='seleccionado'
+            )
+            for i in range(3)
+        ]
+
+    def contadores(self):
+        return {
+            fila.experto_id: [getattr(fila, campo) for campo in self.CAMPOS]
+            for fila in EstadisticasExperto.objects.all()
+        }
+
+    def test_signals_y_caminos_en_lote_igual_que_reconstruir(self):
+        votante = self.expertos[1]
+        VotoItem.objects.crear_voto_validado(self.proyecto.id, votante.id, self.items[0].id, True, 4)
+        VotoItem.objects.crear_votos_validados(self.proyecto.id, votante.id, [
+            {'item_id': item.id, 'de_acuerdo': False, 'evaluacion': 2} for item in self.items[1:]
+        ])
+        self.items[2].estado = 'rechazado'
+        self.items[2].save()
+        VotoItem.objects.filter(item=self.items[0]).get().delete()
+        EncuestaSatisfaccion.objects.enviar_lote(
+            Proyecto.objects.create(nombre='Otro', empresa_cliente='C'), [votante.id]
+        )
+        EncuestaSatisfaccion.objects.recalcular_coeficientes_k()
+
+        mantenidos = self.contadores()
+        self.assertEqual(mantenidos[votante.id][:6], [2, 1, 0, 0, 2, 1])
+        self.assertEqual(mantenidos[self.expertos[0].id][2:4], [3, 2])
+        self.assertIsNotNone(mantenidos[votante.id][6])
+
+        EstadisticasExperto.objects.recalcular()
+        self.assertEqual(mantenidos, self.contadores())
+
+    def test_detalle_una_consulta_y_etag(self):
+        url = reverse('app:detalle_experto', args=[self.expertos[0].id])
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(response.json()['total_aportes'], 3)
+        etag = response['ETag']
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        # Un cambio en cualquier fuente (o en el propio experto) cambia la versión
+        self.items[0].delete()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['total_aportes'], 2)
+        self.assertNotEqual(response['ETag'], etag)
+
+
+class RespuestaCondicionalTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        buffer_chat.limpiar()
+        self.proyecto = Proyecto.objects.create(nombre='P', empresa_cliente='C')
+        self.expertos = [crear_experto(f'e{i}') for i in range(2)]
+        for experto in self.expertos:
+            ListaChequeo.objects.create(proyecto=self.proyecto, experto=experto, estado='seleccionado')
+        MensajeChat.objects.crear_mensaje_validado(self.proyecto.id, self.expertos[0], 'Hola')
+
+    def test_mensajes_304_sin_ejecutar_la_vista(self):
+        url = reverse('app:obtener_mensajes_ajax', args=[self.proyecto.id, self.expertos[1].id])
+        response = self.client.get(url, {'ultimo_id': 0})
+        self.assertEqual(len(response.json()['mensajes']), 1)
+        etag = response['ETag']
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url, {'ultimo_id': 0}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        # Otro cursor es otro contenido
+        self.assertEqual(self.client.get(url, {'ultimo_id': 5}, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            MensajeChat.objects.crear_mensaje_validado(self.proyecto.id, self.expertos[0], 'Otro')
+        response = self.client.get(url, {'ultimo_id': 0}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(len(response.json()['mensajes']), 2)
+        self.assertNotEqual(response['ETag'], etag)
+
+        # Cerrar la tormenta invalida el ETag: la vista vuelve a comprobar el acceso
+        etag = response['ETag']
+        self.proyecto.cerrar_tormenta()
+        self.assertEqual(self.client.get(url, {'ultimo_id': 0}, HTTP_IF_NONE_MATCH=etag).status_code, 403)
+
+    def test_estados_encuestas(self):
+        url = reverse('app:actualizar_estado_encuestas', args=[self.proyecto.id])
+        response = self.client.get(url)
+        self.assertEqual(response.json(), {})
+        etag = response['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        # bulk_create no emite signals: enviar_lote incrementa la versión explícitamente
+        EncuestaSatisfaccion.objects.enviar_lote(self.proyecto, [experto.id for experto in self.expertos])
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.json().values()), {'pendiente'})
+
+
+class BufferChatTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        buffer_chat.limpiar()
+        self.proyecto = Proyecto.objects.create(nombre='P', empresa_cliente='C')
+        self.experto = crear_experto('autor')
+        ListaChequeo.objects.create(proyecto=self.proyecto, experto=self.experto, estado='seleccionado')
+
+    def publicar(self, contenido):
+        with self.captureOnCommitCallbacks(execute=True):
+            return MensajeChat.objects.crear_mensaje_validado(self.proyecto.id, self.experto, contenido)[1]
+
+    def version(self):
+        return VersionRecurso.objects.obtener(VersionRecurso.AMBITO_MENSAJES, self.proyecto.id)[0]
+
+    def test_contadores_recorte_y_expulsion(self):
+        buffer = BufferChat(tamano=3, max_proyectos=2)
+        self.assertIsNone(buffer.leer(1, 0, 10, 1))
+        self.assertTrue(buffer.iniciar_carga(1))
+        self.assertFalse(buffer.iniciar_carga(1))
+        buffer.completar_carga(1, [{'id': 1}, {'id': 2}], 1)
+        self.assertEqual([m['id'] for m in buffer.leer(1, 0, 10, 1)], [1, 2])
+
+        # Al pasar de `tamano` se recorta por el frente y el cursor 0 deja de estar cubierto
+        for version, mensaje_id in enumerate((3, 4, 5), start=2):
+            buffer.agregar(1, {'id': mensaje_id}, version)
+        self.assertEqual(buffer.cobertura(1), (2, 3, 4))
+        self.assertIsNone(buffer.leer(1, 0, 10, 4))
+        self.assertEqual([m['id'] for m in buffer.leer(1, 2, 10, 4)], [3, 4, 5])
+
+        # Un salto de versión (escritura de otro proceso) no avanza el buffer y lo descarta
+        buffer.agregar(1, {'id': 7}, 6)
+        self.assertEqual(buffer.cobertura(1), (3, 3, 4))
+        self.assertIsNone(buffer.leer(1, 3, 10, 6))
+        self.assertIsNone(buffer.cobertura(1))
+
+        # El proyecto menos usado sale al superar max_proyectos
+        for proyecto_id in (1, 2, 3):
+            buffer.iniciar_carga(proyecto_id)
+            buffer.completar_carga(proyecto_id, [], 0)
+        self.assertIsNone(buffer.cobertura(1))
+        self.assertEqual(buffer.estadisticas()['proyectos'], 2)
+        self.assertEqual((buffer.estadisticas()['hits'], buffer.estadisticas()['misses']), (2, 3))
+
+    def test_lectura_fria_y_caliente(self):
+        primero = self.publicar('Uno')
+        with self.assertNumQueries(3):
+            # Fría: versión, carga del buffer y lectura desde la BD
+            mensajes = MensajeChat.objects.obtener_recientes_serializados(self.proyecto.id, self.experto.id)
+        self.assertEqual([m['id'] for m in mensajes], [primero.id])
+
+        segundo = self.publicar('Dos')
+        # El mensaje propio avanza el buffer a la versión que dejó en la BD
+        self.assertEqual(buffer_chat.cobertura(self.proyecto.id), (0, 2, self.version()))
+        version = self.version()
+        with self.assertNumQueries(0):
+            # Caliente con la versión que ya leyó @respuesta_condicional: sin consultas
+            mensajes = MensajeChat.objects.obtener_recientes_serializados(
+                self.proyecto.id, self.experto.id, primero.id, version=version
+            )
+        self.assertEqual([m['id'] for m in mensajes], [segundo.id])
+        self.assertEqual(buffer_chat.estadisticas()['hits'], 1)
+
+    def test_vista_usa_la_version_del_etag(self):
+        primero = self.publicar('Uno')
+        segundo = self.publicar('Dos')
+        url = reverse('app:obtener_mensajes_ajax', args=[self.proyecto.id, self.experto.id])
+        self.client.get(url)
+        with self.assertNumQueries(3):
+            # Versión (ETag), experto y proyecto (acceso en caché); los mensajes salen del buffer
+            response = self.client.get(url, {'ultimo_id': primero.id})
+        self.assertEqual([m['id'] for m in response.json()['mensajes']], [segundo.id])
+        self.assertEqual(buffer_chat.estadisticas()['hits'], 1)
+
+    def test_mensaje_de_otro_proceso_no_se_pierde(self):
+        primero = self.publicar('Uno')
+        MensajeChat.objects.obtener_recientes_serializados(self.proyecto.id, self.experto.id)
+        # Escrito por otro worker: este proceso no recibe su on_commit, pero sube la versión
+        ajeno = MensajeChat.objects.create(proyecto=self.proyecto, experto=self.experto, contenido='Ajeno')
+
+        mensajes = MensajeChat.objects.obtener_recientes_serializados(
+            self.proyecto.id, self.experto.id, primero.id
+        )
+        self.assertEqual([m['id'] for m in mensajes], [ajeno.id])
+        # El buffer se recargó en la nueva versión y vuelve a servir sin ir a la BD
+        self.assertEqual(buffer_chat.cobertura(self.proyecto.id), (0, 2, self.version()))
+
+
+class ConteoVotosTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.proyecto = Proyecto.objects.create(nombre='P', empresa_cliente='C')
+        self.expertos = [crear_experto(f'e{i}') for i in range(3)]
+        for experto in self.expertos:
+            ListaChequeo.objects.create(proyecto=self.proyecto, experto=experto, estado='seleccionado')
+        self.item = ItemTormentaIdeas.objects.create(
+            titulo='Item', descripcion='D', proyecto=self.proyecto, experto=self.expertos[0],
+            experto_propietario=self.expertos[0], estado='seleccionado'
+        )
+
+    def votar(self, experto, de_acuerdo, evaluacion):
+        with self.captureOnCommitCallbacks(execute=True):
+            return VotoItem.objects.crear_voto_validado(
+                self.proyecto.id, experto.id, self.item.id, de_acuerdo, evaluacion
+            )
+
+    def resultado_item(self):
+        return VotoItem.objects.get_resultados_por_item(self.proyecto.id)['items'][0]
+
+    def test_votos_sueltos_y_borrados(self):
+        self.votar(self.expertos[1], True, 4)
+        self.votar(self.expertos[2], False, 2)
+        conteo = ConteoVotosItem.objects.get(item=self.item)
+        self.assertEqual((conteo.total_votos, conteo.votos_de_acuerdo, conteo.suma_evaluacion), (2, 1, 6))
+        self.assertEqual(conteo.suma_cuadrados, 20)
+        resultado = self.resultado_item()
+        self.assertEqual((resultado['total_votos'], resultado['votos_positivos']), (2, 1))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            VotoItem.objects.get(experto=self.expertos[1]).delete()
+        conteo = ConteoVotosItem.objects.get(item=self.item)
+        self.assertEqual((conteo.total_votos, conteo.votos_de_acuerdo, conteo.suma_evaluacion), (1, 0, 2))
+        self.assertEqual((conteo.votos_nivel_4, conteo.votos_nivel_2), (0, 1))
+        self.assertEqual(self.resultado_item()['total_votos'], 1)
+        self.assertEqual(ConteoVotosItem.objects.reconstruir(aplicar=False), [])
+
+    def test_resultados_incluyen_items_sin_votos(self):
+        sin_votos = ItemTormentaIdeas.objects.create(
+            titulo='Sin votos', descripcion='D', proyecto=self.proyecto, experto=self.expertos[0],
+            experto_propietario=self.expertos[0], estado='seleccionado'
+        )
+        ItemTormentaIdeas.objects.create(
+            titulo='Pendiente', descripcion='D', proyecto=self.proyecto, experto=self.expertos[0],
+            experto_propietario=self.expertos[0], estado='pendiente'
+        )
+        self.votar(self.expertos[1], True, 4)
+
+        response = self.client.get(
+            reverse('app:api_resultados_votacion', args=[self.proyecto.id]),
+            {'experto_id': self.expertos[1].id}
+        )
+        data = response.json()
+        self.assertEqual([i['titulo'] for i in data['items']], ['Item', 'Sin votos'])
+        self.assertEqual(data['total_votos_cast'], 1)
+        self.assertEqual(data['items'][1], {
+            'id': sin_votos.id, 'titulo': 'Sin votos', 'total_votos': 0, 'avg_evaluacion': None,
+            'varianza_evaluacion': None, 'votos_positivos': 0, 'porcentaje_aceptacion': 0.0,
+            'histograma': {str(nivel): 0 for nivel in range(1, 6)},
+        })
+
+    @override_settings(
+        CACHES={
+            'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'tests-default'},
+            'compartido': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'tests-compartido'},
+        },
+        RESULTADOS_VOTACION_CACHE_ALIAS='compartido'
+    )
+    def test_resultados_en_el_alias_configurado(self):
+        self.votar(self.expertos[1], True, 4)
+        self.assertEqual(self.resultado_item()['total_votos'], 1)
+        key = VotoItem.objects.CACHE_RESULTADOS_KEY.format(self.proyecto.id)
+        self.assertIsNone(caches['default'].get(key))
+        self.assertIsNotNone(caches['compartido'].get(key))
+
+        self.votar(self.expertos[2], False, 2)
+        self.assertIsNone(caches['compartido'].get(key))
+        self.assertEqual(self.resultado_item()['total_votos'], 2)
+
+    def test_evaluacion_fuera_de_rango_no_se_escribe(self):
+        self.assertEqual(self.votar(self.expertos[1], True, 7), (False, None, 'Evaluación fuera de rango'))
+        self.assertEqual(self.votar(self.expertos[1], True, 'alta'), (False, None, 'Datos inválidos'))
+        self.assertFalse(VotoItem.objects.exists())
+        with self.assertRaises(ValueError):
+            ConteoVotosItem.objects.registrar_votos([VotoItem(item=self.item, proyecto=self.proyecto, evaluacion=7)])
+
+    def test_reconstruir_y_comando_verificar(self):
+        self.votar(self.expertos[1], True, 5)
+        self.assertEqual(self.resultado_item()['total_votos'], 1)
+        # Un UPDATE directo no pasa por los contadores
+        VotoItem.objects.update(de_acuerdo=False)
+
+        salida = StringIO()
+        call_command('reconstruir_conteos_votos', '--verificar', stdout=salida)
+        self.assertIn(f'Item {self.item.id}:', salida.getvalue())
+        self.assertIn('1 items con diferencias.', salida.getvalue())
+        self.assertEqual(ConteoVotosItem.objects.get(item=self.item).votos_de_acuerdo, 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('reconstruir_conteos_votos', stdout=StringIO())
+        self.assertEqual(self.resultado_item()['votos_positivos'], 0)
+
+        salida = StringIO()
+        call_command('reconstruir_conteos_votos', '--verificar', stdout=salida)
+        self.assertIn('Conteos sin diferencias.', salida.getvalue())
+
+
+class EnvioEncuestasLoteTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.proyecto = Proyecto.objects.create(nombre='P', empresa_cliente='C', categoria='Salud')
+        self.expertos = [crear_experto(f'e{i}', categoria='Salud') for i in range(3)]
+        self.otra_categoria = crear_experto('otro', categoria='Energía')
+        self.url = reverse('app:enviar_encuestas_lote', args=[self.proyecto.id])
+
+    def enviar(self, **datos):
+        return self.client.post(self.url, json.dumps(datos), content_type='application/json')
+
+    def test_solo_ids_dados_y_reenvio_idempotente(self):
+        ids = [self.expertos[0].id, self.otra_categoria.id, 9999]
+        data = self.enviar(experto_ids=ids).json()
+        self.assertEqual(data['creadas'], [self.expertos[0].id, self.otra_categoria.id])
+        self.assertEqual(data['no_encontrados'], [9999])
+        self.assertEqual(
+            set(EncuestaSatisfaccion.objects.values_list('experto_id', flat=True)),
+            {self.expertos[0].id, self.otra_categoria.id}
+        )
+
+        data = self.enviar(experto_ids=ids).json()
+        self.assertEqual(data['creadas'], [])
+        self.assertEqual(data['existentes'], sorted([self.expertos[0].id, self.otra_categoria.id]))
+        self.assertEqual(EncuestaSatisfaccion.objects.count(), 2)
+
+    def test_toda_la_categoria(self):
+        EncuestaSatisfaccion.objects.create(
+            proyecto=self.proyecto, experto=self.expertos[0], cargo_actual='c',
+            anos_experiencia=1, grado_cientifico='Doctor'
+        )
+        data = self.enviar(todos_categoria=True).json()
+        self.assertEqual(data['creadas'], [e.id for e in self.expertos[1:]])
+        self.assertEqual(data['existentes'], [self.expertos[0].id])
+
+    def test_sin_categoria_no_envia_a_todos(self):
+        self.proyecto.categoria = ''
+        self.proyecto.save()
+        self.assertEqual(self.enviar(todos_categoria=True).status_code, 400)
+        with self.assertRaises(ValueError):
+            EncuestaSatisfaccion.objects.enviar_lote(self.proyecto)
+        self.assertFalse(EncuestaSatisfaccion.objects.exists())
+
+    def test_creadas_excluye_las_de_otro_request(self):
+        # Otro request envía la encuesta de expertos[0] después de que este leyera las existentes
+        EncuestaSatisfaccion.objects.enviar_lote(self.proyecto, [self.expertos[0].id])
+        filtrar = EncuestaSatisfaccion.objects.filter
+        lecturas = []
+
+        def filtro_con_lectura_obsoleta(*args, **kwargs):
+            lecturas.append(kwargs)
+            return EncuestaSatisfaccion.objects.none() if len(lecturas) == 1 else filtrar(*args, **kwargs)
+
+        with mock.patch.object(EncuestaSatisfaccion.objects, 'filter', side_effect=filtro_con_lectura_obsoleta):
+            resultado = EncuestaSatisfaccion.objects.enviar_lote(self.proyecto, [e.id for e in self.expertos])
+        self.assertEqual(len(lecturas), 2)
+        self.assertEqual(resultado['creadas'], [e.id for e in self.expertos[1:]])
+        self.assertEqual(resultado['existentes'], [self.expertos[0].id])
+
+
+class MembresiasCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.proyecto = Proyecto.objects.create(nombre='P', empresa_cliente='C')
+        self.experto = crear_experto('experto')
+        self.fila = ListaChequeo.objects.create(proyecto=self.proyecto, experto=self.experto, estado='seleccionado')
+
+    def test_signals_invalidan_al_guardar_y_borrar(self):
+        self.assertTrue(ListaChequeo.objects.es_seleccionado(self.proyecto.id, self.experto))
+        with self.assertNumQueries(0):
+            self.assertTrue(ListaChequeo.objects.es_seleccionado(self.proyecto.id, self.experto))
+
+        self.fila.estado = 'rechazado'
+        self.fila.save()
+        self.assertFalse(ListaChequeo.objects.es_seleccionado(self.proyecto.id, self.experto))
+
+        self.fila.estado = 'seleccionado'
+        self.fila.es_moderador = True
+        self.fila.save()
+        self.assertTrue(ListaChequeo.objects.es_moderador(self.proyecto.id, self.experto))
+
+        self.fila.delete()
+        self.assertEqual(ListaChequeo.objects.get_membresias(self.proyecto.id), {})
+
+    def test_invalidacion_al_confirmar(self):
+        ListaChequeo.objects.get_membresias(self.proyecto.id)
+        with self.captureOnCommitCallbacks() as callbacks:
+            ListaChequeo.objects.filter(pk=self.fila.pk).update(estado='rechazado')
+            ListaChequeo.objects.invalidar_membresias(self.proyecto.id)
+            # Una lectura concurrente vuelve a llenar el cache antes del commit
+            cache.set(
+                ListaChequeo.objects.CACHE_MEMBRESIAS_KEY.format(self.proyecto.id),
+                {self.experto.id: ('seleccionado', False)}
+            )
+        for callback in callbacks:
+            callback()
+        self.assertFalse(ListaChequeo.objects.es_seleccionado(self.proyecto.id, self.experto))
+
+
+class BorradoVotosCascadaTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.proyecto = Proyecto.objects.create(nombre='P', empresa_cliente='C')
+        self.otro = Proyecto.objects.create(nombre='Otro', empresa_cliente='C')
+        self.autor = crear_experto('autor')
+        self.votantes = [crear_experto(f'v{i}') for i in range(10)]
+
+    def crear_item(self, proyecto, votantes):
+        item = ItemTormentaIdeas.objects.create(
+            titulo='Item', descripcion='D', proyecto=proyecto, experto=self.autor,
+            experto_propietario=self.autor, estado='seleccionado'
+        )
+        for i, votante in enumerate(votantes):
+            VotoItem.objects.create(
+                experto=votante, item=item, proyecto=proyecto, de_acuerdo=bool(i % 2), evaluacion=i % 5 + 1
+            )
+        ConteoVotosItem.objects.reconstruir()
+        return item
+
+    def consultas_al_borrar(self, objeto):
+        with CaptureQueriesContext(connection) as consultas:
+            objeto.delete()
+        return len(consultas)
+
+    def assert_contadores_al_dia(self):
+        self.assertEqual(ConteoVotosItem.objects.reconstruir(aplicar=False), [])
+        mantenidos = list(EstadisticasExperto.objects.order_by('experto_id').values_list('experto_id', 'votos_emitidos'))
+        EstadisticasExperto.objects.recalcular()
+        self.assertEqual(
+            mantenidos, list(EstadisticasExperto.objects.order_by('experto_id').values_list('experto_id', 'votos_emitidos'))
+        )
+
+    def test_consultas_independientes_del_numero_de_votos(self):
+        # La primera vez VersionRecurso inserta sus filas en vez de actualizarlas
+        self.crear_item(self.proyecto, self.votantes).delete()
+        pocos = self.consultas_al_borrar(self.crear_item(self.proyecto, self.votantes[:2]))
+        muchos = self.consultas_al_borrar(self.crear_item(self.proyecto, self.votantes))
+        self.assertEqual(pocos, muchos)
+        self.assert_contadores_al_dia()
+
+        Proyecto.objects.create(nombre='Previo', empresa_cliente='C').delete()
+        self.crear_item(self.proyecto, self.votantes[:2])
+        pocos = self.consultas_al_borrar(self.proyecto)
+        self.crear_item(self.otro, self.votantes)
+        self.assertEqual(pocos, self.consultas_al_borrar(self.otro))
+        self.assert_contadores_al_dia()
+
+    def test_borrar_experto_descuenta_sus_votos(self):
+        ajeno = ItemTormentaIdeas.objects.create(
+            titulo='Ajeno', descripcion='D', proyecto=self.proyecto, experto=self.votantes[1],
+            experto_propietario=self.votantes[1], estado='seleccionado'
+        )
+        VotoItem.objects.create(experto=self.votantes[0], item=ajeno, proyecto=self.proyecto, de_acuerdo=True)
+        self.crear_item(self.proyecto, self.votantes[:4])
+
+        self.votantes[0].usuario.delete()
+        self.assertEqual(ConteoVotosItem.objects.get(item=ajeno).total_votos, 0)
+        self.assert_contadores_al_dia()
+
+        # Votos sueltos siguen ajustándose fila a fila
+        VotoItem.objects.filter(experto=self.votantes[2]).delete()
+        self.assert_contadores_al_dia()
+
+
+class VotacionLoteTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.proyecto = Proyecto.objects.create(nombre='P', empresa_cliente='C')
+        self.autor = crear_experto('autor')
+        self.votante = crear_experto('votante')
+        for experto in (self.autor, self.votante):
+            ListaChequeo.objects.create(proyecto=self.proyecto, experto=experto, estado='seleccionado')
+        self.items = [
+            ItemTormentaIdeas.objects.create(
+                titulo=f'Item {i}', descripcion='D', proyecto=self.proyecto, experto=self.autor,
+                experto_propietario=self.autor, estado='seleccionado'
+            )
+            for i in range(3)
+        ]
+        otro = Proyecto.objects.create(nombre='Otro', empresa_cliente='C')
+        self.ajeno = ItemTormentaIdeas.objects.create(
+            titulo='Ajeno', descripcion='D', proyecto=otro, experto=self.autor, experto_propietario=self.autor
+        )
+        self.url = reverse('app:api_guardar_votos_lote', args=[self.proyecto.id])
+
+    def votar(self, votos, experto=None):
+        return self.client.post(
+            self.url,
+            json.dumps({'experto_id': (experto or self.votante).id, 'votos': votos}),
+            content_type='application/json'
+        )
+
+    def test_resultados_en_orden_recibido(self):
+        VotoItem.objects.crear_voto_validado(self.proyecto.id, self.votante.id, self.items[2].id, True, 3)
+        response = self.votar([
+            {'item_id': self.items[0].id, 'de_acuerdo': True, 'evaluacion': 5},
+            {'item_id': self.ajeno.id, 'de_acuerdo': True},
+            {'item_id': self.items[2].id, 'de_acuerdo': False},
+            {'item_id': self.items[0].id, 'de_acuerdo': False},
+            {'item_id': self.items[1].id, 'de_acuerdo': 'false'},
+            {'item_id': self.items[1].id, 'de_acuerdo': False, 'evaluacion': 2},
+        ])
+        data = response.json()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((data['creados'], data['errores']), (2, 4))
+        self.assertEqual(
+            [(r['item_id'], r['success'], r.get('error')) for r in data['resultados']],
+            [
+                (self.items[0].id, True, None),
+                (self.ajeno.id, False, 'Item no encontrado'),
+                (self.items[2].id, False, 'Ya has votado este item'),
+                (self.items[0].id, False, 'Ya has votado este item'),
+                (self.items[1].id, False, 'Datos inválidos'),
+                (self.items[1].id, True, None),
+            ]
+        )
+        self.assertFalse(VotoItem.objects.get(item=self.items[1]).de_acuerdo)
+        self.assertEqual(ConteoVotosItem.objects.reconstruir(aplicar=False), [])
+
+    def test_no_miembro_recibe_403(self):
+        intruso = crear_experto('intruso')
+        response = self.votar([{'item_id': self.items[0].id, 'de_acuerdo': True}], experto=intruso)
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(VotoItem.objects.exists())
+
+    def test_reintento_tras_integrity_error(self):
+        # Otro request vota items[0] después de que este leyera los votos existentes
+        VotoItem.objects.crear_voto_validado(self.proyecto.id, self.votante.id, self.items[0].id, True, 4)
+        filtrar = VotoItem.objects.filter
+        lecturas = []
+
+        def filtro_con_lectura_obsoleta(*args, **kwargs):
+            lecturas.append(kwargs)
+            return VotoItem.objects.none() if len(lecturas) == 1 else filtrar(*args, **kwargs)
+
+        with mock.patch.object(VotoItem.objects, 'filter', side_effect=filtro_con_lectura_obsoleta):
+            response = self.votar([
+                {'item_id': item.id, 'de_acuerdo': True, 'evaluacion': 4} for item in self.items[:2]
+            ])
+        self.assertEqual(len(lecturas), 2)
+        self.assertEqual(
+            [(r['item_id'], r['success']) for r in response.json()['resultados']],
+            [(self.items[0].id, False), (self.items[1].id, True)]
+        )
+        self.assertEqual(VotoItem.objects.filter(experto=self.votante).count(), 2)
+        self.assertEqual(ConteoVotosItem.objects.reconstruir(aplicar=False), [])
+
+
+class StreamMensajesTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        buffer_chat.limpiar()
+        self.proyecto = Proyecto.objects.create(nombre='P', empresa_cliente='C')
+        self.experto = crear_experto('autor')
+        self.membresia = ListaChequeo.objects.create(
+            proyecto=self.proyecto, experto=self.experto, estado='seleccionado'
+        )
+
+    def url(self, experto, ultimo_id=0):
+        return reverse('app:stream_mensajes', args=[self.proyecto.id, experto.id]) + f'?ultimo_id={ultimo_id}'
+
+    def publicar(self, contenido):
+        with self.captureOnCommitCallbacks(execute=True):
+            return MensajeChat.objects.crear_mensaje_validado(self.proyecto.id, self.experto, contenido)[1]
+
+    def test_wsgi_responde_204(self):
+        self.assertEqual(self.client.get(self.url(self.experto)).status_code, 204)
+
+    async def test_no_miembro_recibe_403(self):
+        intruso = await sync_to_async(crear_experto)('intruso')
+        response = await self.async_client.get(self.url(intruso))
+        self.assertEqual(response.status_code, 403)
+
+    async def test_recibe_mensaje_publicado(self):
+        previo = await sync_to_async(self.publicar)('Previo')
+        response = await self.async_client.get(self.url(self.experto, previo.id))
+        eventos = aiter(response.streaming_content)
+        self.assertEqual(await anext(eventos), b'retry: 3000\n\n')
+
+        siguiente = asyncio.ensure_future(anext(eventos))
+        # Dejar que el stream consulte la BD y quede esperando en la cola
+        await asyncio.sleep(0.05)
+        nuevo = await sync_to_async(self.publicar)('Nuevo')
+        evento = (await asyncio.wait_for(siguiente, timeout=2)).decode()
+        self.assertTrue(evento.startswith(f'id: {nuevo.id}\nevent: mensaje\n'))
+        self.assertEqual(json.loads(evento.split('data: ', 1)[1])['contenido'], 'Nuevo')
+        await eventos.aclose()
+
+    async def test_keepalive_corta_stream_sin_acceso(self):
+        response = await self.async_client.get(self.url(self.experto))
+        eventos = aiter(response.streaming_content)
+        await anext(eventos)
+        with mock.patch('app.views.expertos.chat.STREAM_KEEPALIVE', 0.01), \
+                mock.patch('app.views.expertos.chat.STREAM_REVISAR_ACCESO', 0):
+            self.assertEqual(await anext(eventos), b': keepalive\n\n')
+            await sync_to_async(self.membresia.delete)()
+            self.assertTrue((await anext(eventos)).startswith(b'event: cerrado\n'))
+            with self.assertRaises(StopAsyncIteration):
+                await anext(eventos)
+
+    async def test_pierde_acceso_con_trafico_continuo(self):
+        response = await self.async_client.get(self.url(self.experto))
+        eventos = aiter(response.streaming_content)
+        await anext(eventos)
+        # El keepalive (15 s) nunca llega: la revisión depende sólo del reloj
+        with mock.patch('app.views.expertos.chat.STREAM_REVISAR_ACCESO', 0):
+            siguiente = asyncio.ensure_future(anext(eventos))
+            await asyncio.sleep(0.05)
+            await sync_to_async(self.publicar)('Uno')
+            self.assertIn(b'event: mensaje', await asyncio.wait_for(siguiente, timeout=2))
+
+            await sync_to_async(self.membresia.delete)()
+            siguiente = asyncio.ensure_future(anext(eventos))
+            await asyncio.sleep(0.05)
+            # Mensaje de otro miembro del proyecto
+            ajeno = await sync_to_async(MensajeChat.objects.create)(
+                proyecto=self.proyecto, experto=self.experto, contenido='Dos'
+            )
+            difusor_chat.publicar(self.proyecto.id, ajeno.id)
+            self.assertTrue((await asyncio.wait_for(siguiente, timeout=2)).startswith(b'event: cerrado\n'))
+
+
+class IndicesConsultasTests(TestCase):
+    def test_benchmark_usa_los_indices_y_no_deja_datos(self):
+        salida = StringIO()
+        call_command('benchmark_indices', mensajes=2000, expertos=30, repeticiones=1, stdout=salida)
+        lineas = salida.getvalue().splitlines()
+        con_indices = ' '.join(linea for linea in lineas if 'con índices' in linea)
+
+        for indice in ['lista_moderador_idx', 'lista_experto_estado_idx', 'item_proyecto_estado_idx',
+                       'encuesta_experto_estado_idx', 'voto_proyecto_experto_idx']:
+            self.assertIn(indice, con_indices)
+        self.assertNotIn('TEMP B-TREE', con_indices)
+        self.assertFalse(MensajeChat.objects.exists())
+        self.assertFalse(Experto.objects.exists())
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'lista_moderador_idx'")
+            self.assertIsNotNone(cursor.fetchone())
+
+
+class ConexionSQLiteTests(TestCase):
+    def test_pragmas_aplicados_al_conectar(self):
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone()[0], 1)  # NORMAL
+            cursor.execute('PRAGMA cache_size')
+            self.assertEqual(cursor.fetchone()[0], -64000)
+
+    def test_benchmark_concurrente(self):
+        salida = StringIO()
+        call_command('benchmark_sqlite', segundos=0.2, escritores=2, lectores=2, stdout=salida)
+        self.assertIn("ajustada (IMMEDIATE", salida.getvalue())
+        self.assertIn("'database is locked': 0", salida.getvalue().split('ajustada')[1])
+
+
+class RouterLecturaEscrituraTests(TestCase):
+    def setUp(self):
+        self.router = LecturaEscrituraRouter()
+        self.addCleanup(restaurar_lecturas, fijar_lecturas_en_primaria(False))
+
+    def test_lecturas_a_replica_salvo_en_transaccion_o_tras_escribir(self):
+        # TestCase envuelve cada test en una transacción: se lee de la primaria
+        self.assertEqual(self.router.db_for_read(Experto), 'default')
+
+        with mock.patch.object(connections['default'], 'in_atomic_block', False):
+            self.assertEqual(self.router.db_for_read(Experto), 'lectura')
+            self.assertEqual(self.router.db_for_write(Experto), 'default')
+            self.assertEqual(self.router.db_for_read(Experto), 'default')
+
+        self.assertFalse(self.router.allow_migrate('lectura', 'app'))
+
+    def test_escritura_fija_solo_su_ambito(self):
+        with mock.patch.object(connections['default'], 'in_atomic_block', False):
+            token = fijar_lecturas_en_primaria(False)
+            self.router.db_for_write(Experto)
+            self.assertEqual(self.router.db_for_read(Experto), 'default')
+            restaurar_lecturas(token)
+            # El ámbito exterior no hereda la fijación
+            self.assertEqual(self.router.db_for_read(Experto), 'lectura')
+
+            # Fuera de todo ámbito (comandos, hilos propios) escribir no fija nada
+            sin_ambito = contextvars.Context()
+            sin_ambito.run(self.router.db_for_write, Experto)
+            self.assertFalse(sin_ambito.run(lecturas_en_primaria))
+
+    def test_post_fija_las_lecturas_de_la_sesion(self):
+        vistos = []
+
+        def vista(request):
+            vistos.append(lecturas_en_primaria())
+            return HttpResponse()
+
+        middleware = LecturasPrimariaMiddleware(vista)
+        factory = RequestFactory()
+
+        self.assertNotIn(middleware.COOKIE, middleware(factory.get('/')).cookies)
+        response = middleware(factory.post('/'))
+        self.assertEqual(response.cookies[middleware.COOKIE]['max-age'], 5)
+
+        peticion = factory.get('/')
+        peticion.COOKIES[middleware.COOKIE] = '1'
+        middleware(peticion)
+
+        self.assertEqual(vistos, [False, True, True])
+        self.assertFalse(lecturas_en_primaria())
+
+    def test_get_que_escribe_no_deja_fijadas_las_siguientes(self):
+        vistos = []
+
+        def vista(request):
+            self.router.db_for_write(Experto)
+            vistos.append(lecturas_en_primaria())
+            return HttpResponse()
+
+        middleware = LecturasPrimariaMiddleware(vista)
+        response = middleware(RequestFactory().get('/'))
+        self.assertEqual(vistos, [True])
+        self.assertNotIn(middleware.COOKIE, response.cookies)
+        self.assertFalse(lecturas_en_primaria())
+
+
+@override_settings(PRESUPUESTO_CONSULTAS_ESTRICTO=True)
+class PresupuestoConsultasTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.proyecto = Proyecto.objects.create(
+            nombre='P', empresa_cliente='C', categoria='Software', investigador=crear_experto('investigador')
+        )
+        self.expertos = [crear_experto(f'experto{i}', categoria='Software') for i in range(12)]
+        for i, experto in enumerate(self.expertos):
+            ListaChequeo.objects.create(
+                proyecto=self.proyecto, experto=experto, estado='seleccionado', es_moderador=i == 0
+            )
+            item = ItemTormentaIdeas.objects.create(
+                titulo=f'Item {i}', descripcion='D', proyecto=self.proyecto,
+                experto=experto, experto_propietario=experto, estado='seleccionado'
+            )
+            MensajeChat.objects.create(proyecto=self.proyecto, experto=experto, contenido='Hola')
+            if i % 2:
+                VotoItem.objects.create(experto=self.expertos[0], item=item, proyecto=self.proyecto, evaluacion=3)
+        cache.clear()
+
+    def test_vistas_dentro_del_presupuesto(self):
+        moderador, experto = self.expertos[0], self.expertos[1]
+        urls = [
+            reverse('app:inicio_investigador'),
+            reverse('app:expertos_totales', args=[self.proyecto.id]),
+            reverse('app:pagina_expertos', args=[self.proyecto.id]),
+            reverse('app:expertos_finales', args=[self.proyecto.id]),
+            reverse('app:detalle_experto', args=[experto.id]),
+            reverse('app:dashboard_experto', args=[moderador.id]),
+            reverse('app:obtener_mensajes_ajax', args=[self.proyecto.id, experto.id]),
+            reverse('app:actualizar_estado_encuestas', args=[self.proyecto.id]),
+            reverse('app:votar_items', args=[self.proyecto.id, moderador.id]),
+            reverse('app:chat_moderador', args=[self.proyecto.id, moderador.id]),
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertRegex(response['Server-Timing'], r'^sql;dur=[\d.]+;desc="consultas=\d+", plantillas;')
+
+    def test_presupuesto_excedido(self):
+        url = reverse('app:dashboard_experto', args=[self.expertos[0].id])
+        with mock.patch.object(dashboard.dashboard_experto, 'presupuesto_consultas', 1), \
+                self.assertLogs('app.perfilado', 'WARNING'), \
+                self.assertRaises(PresupuestoConsultasExcedido):
+            self.client.get(url)
+
+
+class DatosSinteticosTests(TestCase):
+    def test_generar_datos_consistentes(self):
+        salida = StringIO()
+        call_command(
+            'generar_datos_sinteticos', expertos=40, proyectos=4, expertos_por_proyecto=8,
+            mensajes=300, items_por_proyecto=5, votantes_por_item=4, stdout=salida
+        )
+
+        self.assertEqual(Experto.objects.count(), 40)
+        self.assertEqual(ListaChequeo.objects.filter(es_moderador=True).count(), 4)
+        self.assertEqual(MensajeChat.objects.count(), 300)
+        self.assertTrue(VotoItem.objects.exists())
+        # Conteos, índices FTS y K quedan como los dejarían los signals
+        self.assertEqual(ConteoVotosItem.objects.reconstruir(aplicar=False), [])
+        self.assertFalse(EncuestaSatisfaccion.objects.filter(estado='completada', coeficiente_k=None).exists())
+        self.assertTrue(MensajeChat.objects.buscar(MensajeChat.objects.first().proyecto_id, 'riesgo')[0])
+
+        with self.assertRaises(CommandError):
+            call_command('generar_datos_sinteticos', expertos=1, proyectos=1, stdout=StringIO())
+
+    def test_benchmark_escala_guarda_json(self):
+        with tempfile.TemporaryDirectory() as directorio:
+            ruta = os.path.join(directorio, 'benchmark.json')
+            call_command('benchmark_escala', escalas='20', repeticiones=1, salida=ruta, stdout=StringIO())
+            with open(ruta, encoding='utf-8') as archivo:
+                resultados = json.load(archivo)
+
+            salida = StringIO()
+            call_command('benchmark_escala', escalas='20', repeticiones=1, comparar=ruta, stdout=salida)
+
+        casos = resultados['escalas']['20']['casos']
+        self.assertIn('vista:votar_items', casos)
+        self.assertIn('MensajeChat.objects.buscar', casos)
+        self.assertIn('[20] vista:votar_items', salida.getvalue())
+        # Los datos se generan en una base temporal: la configurada no cambia
+        self.assertFalse(Experto.objects.exists())
+
+
+class PruebaCargaTests(TransactionTestCase):
+    # Las vistas corren en el hilo del handler ASGI: los datos tienen que estar confirmados
+    # y, fuera de un atomic, las lecturas van por el router a la réplica
+    databases = {'default', 'lectura'}
+
+    def setUp(self):
+        cache.clear()
+
+    def test_sesion_completa_sin_errores(self):
+        with tempfile.TemporaryDirectory() as directorio:
+            ruta = os.path.join(directorio, 'carga.json')
+            call_command(
+                'prueba_carga', expertos='3', segundos=0.6, intervalo=0.1, intervalo_items=0.1,
+                prob_mensaje=0.5, salida=ruta, stdout=StringIO()
+            )
+            with open(ruta, encoding='utf-8') as archivo:
+                ronda = json.load(archivo)['rondas']['3']
+
+        endpoints = ronda['endpoints']
+        for nombre in ['obtener_mensajes_ajax', 'api_items_moderador', 'api_cerrar_tormenta', 'api_guardar_voto']:
+            self.assertIn(nombre, endpoints)
+            self.assertEqual(endpoints[nombre]['errores'], 0, endpoints[nombre]['ultimo_error'])
+        # Cada experto vota cada item creado por el moderador
+        self.assertEqual(endpoints['api_guardar_voto']['peticiones'], 3 * ronda['fases']['items'])
+        self.assertLessEqual(endpoints['obtener_mensajes_ajax']['p50_ms'], endpoints['obtener_mensajes_ajax']['p99_ms'])
+        # Lo creado para la prueba se borra
+        self.assertFalse(Experto.objects.exists())
+        self.assertFalse(Proyecto.objects.exists())
+
+    def test_en_proceso_no_escribe_en_la_base_configurada(self):
+        call_command(
+            'prueba_carga', expertos='2', segundos=0.2, intervalo=0.1, intervalo_items=0.1,
+            conservar=True, stdout=StringIO()
+        )
+        # Aun conservando los datos, quedaron en la base temporal
+        self.assertFalse(Experto.objects.exists())
+        self.assertFalse(User.objects.exists())
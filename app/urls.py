@@ -14,8 +14,14 @@ urlpatterns = [
         seleccion_expertos.encuesta_satisfaccion, name='seleccion_expertos'),
     path('proyecto/<int:proyecto_id>/lista-chequeo/', 
         expertos_finales.lista_chequeo, name='expertos_finales'),
+    path('ajax/proyecto/<int:proyecto_id>/encuestas/estados/',
+        seleccion_expertos.actualizar_estado_encuestas, name='actualizar_estado_encuestas'),
     path('proyecto/<int:proyecto_id>/encuesta/<int:encuesta_id>/eliminar/',
         seleccion_expertos.eliminar_experto_encuesta, name='eliminar_experto_encuesta'),
+    path('api/proyecto/<int:proyecto_id>/perfiles-k/',
+        seleccion_expertos.api_perfiles_k, name='api_perfiles_k'),
+    path('api/proyecto/<int:proyecto_id>/preseleccion/',
+        seleccion_expertos.api_preseleccion, name='api_preseleccion'),
     
     # Expertos
     path('expertos/<int:experto_id>/', 
@@ -30,6 +36,12 @@ urlpatterns = [
         expertos_finales.finalizar_proceso_encuesta, name='finalizar_proceso_encuesta'),
     path('ajax/proyecto/<int:proyecto_id>/enviar-encuesta/<int:experto_id>/', 
         expertos_totales.enviar_encuesta, name='enviar_encuesta'),
+    path('ajax/proyecto/<int:proyecto_id>/enviar-encuestas/', 
+        expertos_totales.enviar_encuestas_lote, name='enviar_encuestas_lote'),
+    path('ajax/proyecto/<int:proyecto_id>/expertos/', 
+        expertos_totales.pagina_expertos, name='pagina_expertos'),
+    path('ajax/proyecto/<int:proyecto_id>/expertos/buscar/', 
+        expertos_totales.buscar_expertos, name='buscar_expertos'),
     
     path('ajax/expertos/<int:experto_id>/encuesta/<int:encuesta_id>/guardar/', 
         encuestas.guardar_encuesta_ajax, name='guardar_encuesta_ajax'),
@@ -44,6 +56,10 @@ urlpatterns = [
          chat.obtener_mensajes_ajax, name='obtener_mensajes_ajax'),
     path('ajax/proyecto/<int:proyecto_id>/chat/<int:experto_id>/enviar/', 
          chat.enviar_mensaje_ajax, name='enviar_mensaje_ajax'),
+    path('ajax/proyecto/<int:proyecto_id>/chat/<int:experto_id>/stream/', 
+         chat.stream_mensajes, name='stream_mensajes'),
+    path('api/chat/buffer/estadisticas/', 
+         chat.api_estadisticas_buffer_chat, name='api_estadisticas_buffer_chat'),
     
     path('api/proyecto/<int:proyecto_id>/items/', 
         chat_moderador.api_items_moderador, name='api_items_moderador'),
@@ -53,10 +69,20 @@ urlpatterns = [
         chat_moderador.api_editar_item, name='api_editar_item'),
     path('api/proyecto/<int:proyecto_id>/cerrar-tormenta/', 
         chat_moderador.api_cerrar_tormenta, name='api_cerrar_tormenta'),
+    path('api/proyecto/<int:proyecto_id>/buscar/', 
+        chat_moderador.api_buscar_proyecto, name='api_buscar_proyecto'),
+    path('api/proyecto/<int:proyecto_id>/mensajes/<int:mensaje_id>/promover/', 
+        chat_moderador.api_promover_mensaje, name='api_promover_mensaje'),
     
     # Rutas para votaciones
     path('proyecto/<int:proyecto_id>/votar/<int:experto_id>/', 
          votacion.votar_items, name='votar_items'),
     path('api/proyecto/<int:proyecto_id>/item/<int:item_id>/votar/', 
          votacion.api_guardar_voto, name='api_guardar_voto'),
+    path('api/proyecto/<int:proyecto_id>/votar-lote/', 
+         votacion.api_guardar_votos_lote, name='api_guardar_votos_lote'),
+    path('proyecto/<int:proyecto_id>/resultados/<int:experto_id>/', 
+         votacion.resultados_votacion, name='resultados_votacion'),
+    path('api/proyecto/<int:proyecto_id>/resultados-votacion/', 
+         votacion.api_resultados_votacion, name='api_resultados_votacion'),
 ]
\ No newline at end of file
@@ -1,9 +1,24 @@
 from django.shortcuts import render, get_object_or_404, redirect
-from django.http import JsonResponse, HttpResponseForbidden
-from django.views.decorators.http import require_POST
+from django.http import JsonResponse, HttpResponse, HttpResponseForbidden, StreamingHttpResponse
+from django.views.decorators.http import require_GET, require_POST
 from django.contrib import messages
-from ...models import Experto, Proyecto, MensajeChat
+from django.core.handlers.asgi import ASGIRequest
+from asgiref.sync import sync_to_async
+from ...models import Experto, Proyecto, MensajeChat, VersionRecurso
+from ...condicional import respuesta_condicional
+from ...perfilado import presupuesto_consultas
+from ...difusion import difusor_chat
+from ...buffer_chat import buffer_chat
+import asyncio
 import json
+import time
+
+# Segundos sin mensajes antes de enviar un keepalive (y revisar la BD por si
+# el mensaje se escribió desde otro proceso)
+STREAM_KEEPALIVE = 15
+STREAM_LOTE = 50
+# Cada cuántos segundos se vuelve a verificar el acceso, haya tráfico o no
+STREAM_REVISAR_ACCESO = 15
 
 
 def chat_proyecto(request, proyecto_id, experto_id):
@@ -66,9 +81,12 @@ def enviar_mensaje_ajax(request, proyecto_id, experto_id):
         return JsonResponse({'success': False, 'error': str(e)}, status=500)
 
 
+@presupuesto_consultas(6)
+@respuesta_condicional(VersionRecurso.AMBITO_MENSAJES)
 def obtener_mensajes_ajax(request, proyecto_id, experto_id):
     """
     Obtiene mensajes nuevos. Solo orquestación.
+    Sin mensajes nuevos desde el ETag del cliente responde 304 (ver condicional.py).
     """
     experto = get_object_or_404(Experto, id=experto_id)
     proyecto = get_object_or_404(Proyecto, id=proyecto_id)
@@ -81,15 +99,113 @@ def obtener_mensajes_ajax(request, proyecto_id, experto_id):
     try:
         ultimo_id = int(request.GET.get('ultimo_id', 0))
         
-        # Obtener mensajes usando el manager
-        mensajes = MensajeChat.objects.obtener_recientes(proyecto_id, ultimo_id, 20)
+        # Obtener mensajes usando el manager (buffer en memoria + BD)
+        mensajes = MensajeChat.objects.obtener_recientes_serializados(
+            proyecto_id, experto.id, ultimo_id, 20, version=request.version_recurso
+        )
         
         return JsonResponse({
             'success': True,
-            'mensajes': [
-                m.serializar_para_json(experto.id) for m in mensajes
-            ]
+            'mensajes': mensajes
         })
         
     except Exception as e:
-        return JsonResponse({'success': False, 'error': str(e)}, status=500)
\ No newline at end of file
+        return JsonResponse({'success': False, 'error': str(e)}, status=500)
+
+
+def _autorizar_stream(proyecto_id, experto_id):
+    """Carga y valida acceso una sola vez por conexión. Returns: tuple (experto, error)"""
+    experto = get_object_or_404(Experto, id=experto_id)
+    proyecto = get_object_or_404(Proyecto, id=proyecto_id)
+    _, error = proyecto.experto_puede_chatear(experto)
+    return experto, error
+
+
+def _revisar_acceso_stream(proyecto_id, experto):
+    """La tormenta pudo cerrarse o el experto salir del proyecto. Returns: str|None con el error"""
+    proyecto = Proyecto.objects.filter(id=proyecto_id).first()
+    if proyecto is None:
+        return 'Proyecto no encontrado'
+    return proyecto.experto_puede_chatear(experto)[1]
+
+
+def _mensajes_nuevos(proyecto_id, desde_id, experto_id):
+    return MensajeChat.objects.obtener_recientes_serializados(
+        proyecto_id, experto_id, desde_id, STREAM_LOTE
+    )
+
+
+def _evento_sse(mensaje):
+    return f"id: {mensaje['id']}\nevent: mensaje\ndata: {json.dumps(mensaje)}\n\n"
+
+
+def _evento_cierre(error):
+    return f"event: cerrado\ndata: {json.dumps({'error': error})}\n\n"
+
+
+async def stream_mensajes(request, proyecto_id, experto_id):
+    """
+    Stream SSE de mensajes nuevos del proyecto.
+    Requiere servidor ASGI; en WSGI responde 204 y el cliente vuelve al polling.
+    El acceso se revisa cada STREAM_REVISAR_ACCESO segundos aunque lleguen mensajes;
+    si se pierde se envía `cerrado` y termina.
+    """
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+    
+    experto, error = await sync_to_async(_autorizar_stream)(proyecto_id, experto_id)
+    if error:
+        return JsonResponse({'success': False, 'error': error}, status=403)
+    
+    try:
+        ultimo_id = int(
+            request.headers.get('Last-Event-ID') or request.GET.get('ultimo_id', 0)
+        )
+    except ValueError:
+        ultimo_id = 0
+    
+    async def eventos():
+        nonlocal ultimo_id
+        suscripcion = difusor_chat.suscribir(proyecto_id)
+        _, cola = suscripcion
+        revisado = time.monotonic()
+        try:
+            yield 'retry: 3000\n\n'
+            while True:
+                if time.monotonic() - revisado >= STREAM_REVISAR_ACCESO:
+                    error = await sync_to_async(_revisar_acceso_stream)(proyecto_id, experto)
+                    if error:
+                        yield _evento_cierre(error)
+                        return
+                    revisado = time.monotonic()
+                
+                mensajes = await sync_to_async(_mensajes_nuevos)(
+                    proyecto_id, ultimo_id, experto.id
+                )
+                for mensaje in mensajes:
+                    ultimo_id = mensaje['id']
+                    yield _evento_sse(mensaje)
+                if len(mensajes) == STREAM_LOTE:
+                    continue
+                
+                try:
+                    await asyncio.wait_for(cola.get(), timeout=STREAM_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    yield ': keepalive\n\n'
+                
+                # Agrupar notificaciones acumuladas en una sola consulta
+                while not cola.empty():
+                    cola.get_nowait()
+        finally:
+            difusor_chat.cancelar(proyecto_id, suscripcion)
+    
+    response = StreamingHttpResponse(eventos(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@require_GET
+def api_estadisticas_buffer_chat(request):
+    """Contadores hit/miss del buffer de mensajes de este proceso."""
+    return JsonResponse({'success': True, **buffer_chat.estadisticas()})
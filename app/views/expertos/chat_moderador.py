@@ -1,11 +1,13 @@
 from django.shortcuts import render, get_object_or_404, redirect
-from django.views.decorators.http import require_POST, require_http_methods
+from django.views.decorators.http import require_GET, require_POST, require_http_methods
 from django.http import JsonResponse, HttpResponseForbidden
 from django.contrib import messages
-from ...models import Experto, Proyecto, ItemTormentaIdeas
+from ...models import Experto, Proyecto, ItemTormentaIdeas, ListaChequeo, MensajeChat
+from ...perfilado import presupuesto_consultas
 import json
 
 
+@presupuesto_consultas(8)
 def chat_moderador(request, proyecto_id, experto_id):
     """Vista exclusiva para moderador."""
     experto = get_object_or_404(Experto, id=experto_id)
@@ -112,4 +114,66 @@ def api_editar_item(request, proyecto_id, item_id):
         return JsonResponse({'success': False, 'error': error}, status=400)
         
     except Exception as e:
-        return JsonResponse({'success': False, 'error': str(e)}, status=500)
\ No newline at end of file
+        return JsonResponse({'success': False, 'error': str(e)}, status=500)
+
+
+BUSQUEDA_TAMANO_PAGINA = 20
+
+
+@require_GET
+def api_buscar_proyecto(request, proyecto_id):
+    """Busca en el historial del chat (tipo=mensajes) o en los items (tipo=items). Sólo moderador."""
+    proyecto = get_object_or_404(Proyecto, id=proyecto_id)
+    moderador = get_object_or_404(Experto, id=request.GET.get('moderador_id'))
+    
+    if not ListaChequeo.objects.es_moderador(proyecto.id, moderador):
+        return JsonResponse({'success': False, 'error': 'Acceso exclusivo para moderador.'}, status=403)
+    
+    tipo = request.GET.get('tipo', 'mensajes')
+    buscadores = {'mensajes': MensajeChat.objects.buscar, 'items': ItemTormentaIdeas.objects.buscar}
+    if tipo not in buscadores:
+        return JsonResponse({'success': False, 'error': 'Tipo de búsqueda inválido'}, status=400)
+    
+    try:
+        resultados, siguiente_cursor = buscadores[tipo](
+            proyecto.id,
+            request.GET.get('q', ''),
+            cursor=request.GET.get('cursor'),
+            limite=BUSQUEDA_TAMANO_PAGINA
+        )
+    except ValueError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    
+    return JsonResponse({
+        'success': True,
+        'tipo': tipo,
+        'resultados': resultados,
+        'siguiente_cursor': siguiente_cursor
+    })
+
+
+@require_POST
+def api_promover_mensaje(request, proyecto_id, mensaje_id):
+    """Convierte un mensaje del chat en item, asignado a su autor."""
+    try:
+        data = json.loads(request.body)
+        moderador = get_object_or_404(Experto, id=data.get('moderador_id'))
+        proyecto = get_object_or_404(Proyecto, id=proyecto_id)
+        
+        valido, error = proyecto.validar_acceso_moderador(moderador)
+        if not valido:
+            return JsonResponse({'success': False, 'error': error}, status=403)
+        
+        success, item, error = ItemTormentaIdeas.objects.crear_desde_mensaje(
+            proyecto.id, mensaje_id, moderador, data.get('titulo')
+        )
+        
+        if success:
+            return JsonResponse({
+                'success': True,
+                'item': {'id': item.id, 'titulo': item.titulo, 'experto_id': item.experto_id, **item.get_info_moderador()}
+            })
+        return JsonResponse({'success': False, 'error': error}, status=400)
+        
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=500)
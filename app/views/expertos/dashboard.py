@@ -1,9 +1,11 @@
 from django.shortcuts import render, get_object_or_404
 from ...models import Experto
+from ...perfilado import presupuesto_consultas
 
+@presupuesto_consultas(6)
 def dashboard_experto(request, experto_id):
     """Dashboard del experto. Toda la lógica está en el modelo."""
-    experto = get_object_or_404(Experto, id=experto_id)
+    experto = get_object_or_404(Experto.objects.select_related('usuario'), id=experto_id)
     
     contexto = experto.get_dashboard_data()
     
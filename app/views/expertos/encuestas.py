@@ -4,7 +4,6 @@ from django.urls import reverse
 from django.contrib import messages
 from django.views.decorators.http import require_POST
 from ...models import Experto, EncuestaSatisfaccion
-from ..utils.calculos import calcular_coeficiente_k
 
 def completar_encuesta(request, experto_id, encuesta_id):
     experto = get_object_or_404(Experto, id=experto_id)
@@ -26,7 +25,7 @@ def completar_encuesta(request, experto_id, encuesta_id):
     ]
     
     if request.method == 'POST':
-        exito, error = encuesta.procesar_respuestas(request.POST, calcular_coeficiente_k)
+        exito, error = encuesta.procesar_respuestas(request.POST, encuesta.proyecto.get_calculadora_k())
         if exito:
             messages.success(request, '¡Encuesta completada exitosamente!')
             return redirect('app:dashboard_experto', experto_id=experto_id)
@@ -56,7 +55,7 @@ def guardar_encuesta_ajax(request, experto_id, encuesta_id):
             return JsonResponse({'success': False, 'error': error}, status=403)
         
         # Procesar usando lógica del modelo
-        exito, error = encuesta.procesar_respuestas(request.POST, calcular_coeficiente_k)
+        exito, error = encuesta.procesar_respuestas(request.POST, encuesta.proyecto.get_calculadora_k())
         
         if exito:
             return JsonResponse({
@@ -1,11 +1,13 @@
 from django.shortcuts import render, get_object_or_404
-from django.views.decorators.http import require_POST
-from django.http import JsonResponse, Http404
+from django.views.decorators.http import require_POST, require_GET
+from django.http import JsonResponse, Http404, HttpResponseForbidden
 from django.contrib import messages
-from ...models import Experto, Proyecto, ItemTormentaIdeas, VotoItem
+from ...models import Experto, Proyecto, ItemTormentaIdeas, ListaChequeo, VotoItem
+from ...perfilado import presupuesto_consultas
 import json
 
 
+@presupuesto_consultas(8)
 def votar_items(request, proyecto_id, experto_id):
     """Vista para que el experto vote items."""
     experto = get_object_or_404(Experto, id=experto_id)
@@ -62,4 +64,89 @@ def api_guardar_voto(request, proyecto_id, item_id):
     except Http404:
         return JsonResponse({'success': False, 'error': 'Item o proyecto no encontrado'}, status=404)
     except Exception as e:
-        return JsonResponse({'success': False, 'error': f'Error inesperado: {str(e)}'}, status=500)
\ No newline at end of file
+        return JsonResponse({'success': False, 'error': f'Error inesperado: {str(e)}'}, status=500)
+
+
+@require_POST
+def api_guardar_votos_lote(request, proyecto_id):
+    """API para guardar varios votos del experto en una sola petición."""
+    try:
+        data = json.loads(request.body)
+        experto_id = data.get('experto_id')
+        votos = data.get('votos')
+        
+        if not experto_id:
+            return JsonResponse({
+                'success': False, 
+                'error': 'Experto no identificado'
+            }, status=400)
+        
+        if not isinstance(votos, list) or not votos:
+            return JsonResponse({
+                'success': False,
+                'error': 'No se recibieron votos'
+            }, status=400)
+        
+        if not ListaChequeo.objects.es_seleccionado(proyecto_id, experto_id):
+            return JsonResponse({
+                'success': False,
+                'error': 'No perteneces a este proyecto'
+            }, status=403)
+        
+        success, resultados, error = VotoItem.objects.crear_votos_validados(
+            proyecto_id=proyecto_id,
+            experto_id=experto_id,
+            votos=votos
+        )
+        
+        if not success:
+            return JsonResponse({'success': False, 'error': error}, status=400)
+        
+        creados = sum(1 for r in resultados if r['success'])
+        return JsonResponse({
+            'success': True,
+            'resultados': resultados,
+            'creados': creados,
+            'errores': len(resultados) - creados,
+            'message': f'{creados} votos registrados'
+        })
+        
+    except ValueError as e:
+        return JsonResponse({'success': False, 'error': f'Datos inválidos: {str(e)}'}, status=400)
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': f'Error inesperado: {str(e)}'}, status=500)
+
+
+def resultados_votacion(request, proyecto_id, experto_id):
+    """Vista de resultados; los datos se cargan vía api_resultados_votacion."""
+    experto = get_object_or_404(Experto, id=experto_id)
+    proyecto = get_object_or_404(Proyecto, id=proyecto_id)
+    
+    valido, error = proyecto.verificar_acceso_experto(experto)
+    if not valido:
+        return HttpResponseForbidden(error)
+    
+    return render(request, 'expertos/resultados_votacion.html', {
+        'experto': experto,
+        'proyecto': proyecto,
+    })
+
+
+@require_GET
+def api_resultados_votacion(request, proyecto_id):
+    """API con los votos agregados por item (cacheado por proyecto)."""
+    experto_id = request.GET.get('moderador_id') or request.GET.get('experto_id')
+    if not experto_id:
+        return JsonResponse({'success': False, 'error': 'Experto no identificado'}, status=400)
+    
+    experto = get_object_or_404(Experto, id=experto_id)
+    proyecto = get_object_or_404(Proyecto, id=proyecto_id)
+    
+    valido, error = proyecto.verificar_acceso_experto(experto)
+    if not valido:
+        return JsonResponse({'success': False, 'error': error}, status=403)
+    
+    return JsonResponse({
+        'success': True,
+        **VotoItem.objects.get_resultados_por_item(proyecto.id)
+    })
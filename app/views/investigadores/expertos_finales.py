@@ -3,7 +3,9 @@ from django.http import JsonResponse
 from django.views.decorators.http import require_POST
 import json
 from ...models import Proyecto
+from ...perfilado import presupuesto_consultas
 
+@presupuesto_consultas(5)
 def lista_chequeo(request, proyecto_id):
     """Vista de lista de chequeo con moderador destacado"""
     proyecto = get_object_or_404(
@@ -46,7 +48,10 @@ def finalizar_proceso_encuesta(request, proyecto_id):
             return JsonResponse({
                 'success': True,
                 'message': f'✅ {resultado["message"]}',
-                'redirect_url': f'/proyecto/{proyecto_id}/lista-chequeo/'
+                'redirect_url': f'/proyecto/{proyecto_id}/lista-chequeo/',
+                'creados': resultado['creados'],
+                'actualizados': resultado['actualizados'],
+                'duracion_ms': resultado['duracion_ms']
             })
         else:
             return JsonResponse({
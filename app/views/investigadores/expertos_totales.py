@@ -1,43 +1,100 @@
 from django.shortcuts import render, get_object_or_404
-from django.http import JsonResponse
-from ...models import Proyecto, Experto, EncuestaSatisfaccion, ListaChequeo
+from django.http import Http404, JsonResponse
+from django.views.decorators.http import require_GET, require_POST
+import json
+from ...models import Proyecto, Experto, EncuestaSatisfaccion, ListaChequeo, RecomendacionExperto, EstadisticasExperto
+from ...condicional import marcar_version, no_modificado
+from ...perfilado import presupuesto_consultas
 from ..utils.calculos import calcular_coeficiente_k
 
+CATALOGO_TAMANO_PAGINA = 50
+CATALOGO_MAX_PAGINA = 200
+RECOMENDADOS_LIMITE = 10
+
+@presupuesto_consultas(5)
 def seleccion_expertos(request, proyecto_id):
     proyecto = get_object_or_404(Proyecto, id=proyecto_id)
+    orden = request.GET.get('orden', 'id')
+    proceso_finalizado = proyecto.proceso_seleccion_finalizado()
     
-    expertos = Experto.objects.con_estado_encuesta(
-        proyecto, 
-        orden=request.GET.get('orden', 'id')
+    # Primera página; el resto se pide por AJAX con el cursor
+    expertos, siguiente_cursor = Experto.objects.pagina_catalogo(
+        proyecto, orden=orden, limite=CATALOGO_TAMANO_PAGINA
     )
     
-    if proyecto.categoria:
-        expertos = expertos.filter(categoria=proyecto.categoria)
+    # Candidatos con buen historial en proyectos de la misma categoría (índice precalculado)
+    recomendados = [] if proceso_finalizado else RecomendacionExperto.objects.para_proyecto(
+        proyecto, limite=RECOMENDADOS_LIMITE
+    )
     
     return render(request, 'investigadores/expertos_totales.html', {
         'proyecto': proyecto,
         'expertos': expertos,
+        'siguiente_cursor': siguiente_cursor,
+        'recomendados': recomendados,
+        'proceso_finalizado': proceso_finalizado,
+        'orden_actual': orden
+    })
+
+@presupuesto_consultas(4)
+@require_GET
+def pagina_expertos(request, proyecto_id):
+    """Vista AJAX: siguiente página del catálogo (paginación por keyset)"""
+    proyecto = get_object_or_404(Proyecto, id=proyecto_id)
+    
+    try:
+        limite = min(int(request.GET.get('limite', CATALOGO_TAMANO_PAGINA)), CATALOGO_MAX_PAGINA)
+        expertos, siguiente_cursor = Experto.objects.pagina_catalogo(
+            proyecto,
+            orden=request.GET.get('orden', 'id'),
+            cursor=request.GET.get('cursor'),
+            limite=max(limite, 1)
+        )
+    except ValueError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    
+    return JsonResponse({
+        'success': True,
+        'expertos': [experto.serializar_para_catalogo() for experto in expertos],
+        'siguiente_cursor': siguiente_cursor,
         'proceso_finalizado': proyecto.proceso_seleccion_finalizado(),
-        'orden_actual': request.GET.get('orden', 'id')
     })
 
+@require_GET
+def buscar_expertos(request, proyecto_id):
+    """Vista AJAX: búsqueda de texto libre en el catálogo, ordenada por relevancia"""
+    proyecto = get_object_or_404(Proyecto, id=proyecto_id)
+    
+    expertos = Experto.objects.buscar(
+        request.GET.get('q', ''),
+        proyecto,
+        limite=CATALOGO_MAX_PAGINA,
+        solo_categoria=request.GET.get('solo_categoria') == '1'
+    )
+    
+    return JsonResponse({
+        'success': True,
+        'expertos': [experto.serializar_para_catalogo() for experto in expertos],
+        'proceso_finalizado': proyecto.proceso_seleccion_finalizado(),
+    })
+
+@presupuesto_consultas(1)
 def detalle_experto(request, experto_id):
-    """Vista AJAX para ver detalles del experto"""
-    experto = get_object_or_404(Experto, id=experto_id)
+    """Vista AJAX para ver detalles del experto (contadores precalculados, con ETag)"""
+    try:
+        estadisticas = EstadisticasExperto.objects.para_detalle(experto_id)
+    except Experto.DoesNotExist:
+        raise Http404('Experto no encontrado')
     
-    data = {
-        'nombre': experto.usuario.get_full_name(),
-        'email': experto.usuario.email,
-        'grado': experto.get_grado_cientifico_display(),
-        'cargo': experto.cargo_actual or 'No especificado',
-        'departamento': experto.departamento or 'No especificado',
-        'experiencia': experto.anos_experiencia,
-        'coeficiente': str(experto.coeficiente_experticidad or 'N/A'),
-        'indice': str(experto.indice_experticidad or 'N/A'),
-        **experto.get_estadisticas(),
-    }
+    # La versión viene en la misma fila: sin cambios no se serializa nada
+    respuesta = no_modificado(request, estadisticas.etag, estadisticas.fecha_actualizacion)
+    if respuesta is not None:
+        return respuesta
     
-    return JsonResponse(data)
+    return marcar_version(
+        JsonResponse(estadisticas.serializar_para_detalle()),
+        estadisticas.etag, estadisticas.fecha_actualizacion
+    )
 
 def enviar_encuesta(request, proyecto_id, experto_id):
     """Vista AJAX para enviar encuesta a un experto"""
@@ -62,3 +119,42 @@ def enviar_encuesta(request, proyecto_id, experto_id):
         
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
+
+
+@require_POST
+def enviar_encuestas_lote(request, proyecto_id):
+    """Vista AJAX para enviar encuestas a varios expertos (o a toda la categoría)"""
+    proyecto = get_object_or_404(Proyecto, id=proyecto_id)
+    
+    if proyecto.proceso_seleccion_finalizado():
+        return JsonResponse({
+            'error': 'El proceso de selección de expertos ha finalizado.'
+        }, status=400)
+    
+    try:
+        data = json.loads(request.body or '{}')
+        experto_ids = None if data.get('todos_categoria') else data.get('experto_ids')
+        
+        if experto_ids is not None and (not isinstance(experto_ids, list) or not experto_ids):
+            return JsonResponse({'error': 'No se seleccionaron expertos'}, status=400)
+        
+        if experto_ids is None and not proyecto.categoria:
+            return JsonResponse({
+                'error': 'El proyecto no tiene categoría: selecciona los expertos'
+            }, status=400)
+        
+        resultado = EncuestaSatisfaccion.objects.enviar_lote(proyecto, experto_ids)
+        
+        return JsonResponse({
+            'success': True,
+            'message': (
+                f'Encuestas enviadas: {len(resultado["creadas"])}. '
+                f'Ya existentes: {len(resultado["existentes"])}.'
+            ),
+            **resultado
+        })
+        
+    except (ValueError, TypeError) as e:
+        return JsonResponse({'error': f'Datos inválidos: {str(e)}'}, status=400)
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
@@ -1,7 +1,11 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.http import JsonResponse
-from django.views.decorators.http import require_POST, require_http_methods
-from ...models import Proyecto, Experto, EncuestaSatisfaccion
+from django.views.decorators.http import require_GET, require_POST, require_http_methods
+import json
+from ...models import Proyecto, Experto, EncuestaSatisfaccion, PerfilPesosK, VersionRecurso
+from ...condicional import respuesta_condicional
+from ...perfilado import presupuesto_consultas
+from ...preseleccion import leer_parametros
 
 def encuesta_satisfaccion(request, proyecto_id):
     """Vista principal de encuestas de satisfacción"""
@@ -21,8 +25,11 @@ def encuesta_satisfaccion(request, proyecto_id):
         'moderador_actual_id': proyecto.moderador_id,
     })
 
+@presupuesto_consultas(3)
+@require_GET
+@respuesta_condicional(VersionRecurso.AMBITO_ENCUESTAS)
 def actualizar_estado_encuestas(request, proyecto_id):
-    """Endpoint para actualización vía AJAX"""
+    """Endpoint para actualización vía AJAX (304 si ninguna encuesta cambió)"""
     proyecto = get_object_or_404(Proyecto, id=proyecto_id)
     return JsonResponse(proyecto.get_estados_encuestas_dict())
 
@@ -44,4 +51,78 @@ def eliminar_experto_encuesta(request, proyecto_id, encuesta_id):
             'encuesta_id': encuesta_id
         })
     
-    return redirect('app:seleccion_expertos', proyecto_id=proyecto_id)
\ No newline at end of file
+    return redirect('app:seleccion_expertos', proyecto_id=proyecto_id)
+
+@require_http_methods(["GET", "POST"])
+def api_perfiles_k(request, proyecto_id):
+    """
+    GET: versiones del perfil de pesos K del proyecto (la primera es la activa).
+    POST: crea una nueva versión y recalcula las encuestas puntuadas con la anterior.
+    """
+    proyecto = get_object_or_404(Proyecto, id=proyecto_id)
+    
+    if request.method == 'GET':
+        return JsonResponse({
+            'success': True,
+            'perfiles': [perfil.serializar() for perfil in proyecto.perfiles_k.all()]
+        })
+    
+    try:
+        data = json.loads(request.body or '{}')
+    except json.JSONDecodeError:
+        return JsonResponse({'success': False, 'error': 'JSON inválido'}, status=400)
+    
+    success, perfil, error = PerfilPesosK.objects.crear_version(
+        proyecto,
+        data.get('pesos'),
+        data.get('valores_influencia'),
+        nombre=data.get('nombre', '')
+    )
+    if not success:
+        return JsonResponse({'success': False, 'error': error}, status=400)
+    
+    recalculadas = []
+    if data.get('recalcular', True):
+        recalculadas = EncuestaSatisfaccion.objects.recalcular_coeficientes_k(proyecto_id=proyecto.id)
+    
+    return JsonResponse({
+        'success': True,
+        'perfil': perfil.serializar(),
+        'encuestas_recalculadas': len(recalculadas)
+    }, status=201)
+
+@require_http_methods(["GET", "POST"])
+def api_preseleccion(request, proyecto_id):
+    """
+    GET: vista previa de la preselección automática (top-k por K con restricciones).
+    POST: la aplica a la lista de chequeo con los mismos parámetros.
+    """
+    proyecto = get_object_or_404(Proyecto, id=proyecto_id)
+    
+    if request.method == 'GET':
+        datos = request.GET
+    else:
+        try:
+            datos = json.loads(request.body or '{}')
+        except json.JSONDecodeError:
+            return JsonResponse({'success': False, 'error': 'JSON inválido'}, status=400)
+    
+    parametros, error = leer_parametros(datos)
+    if error:
+        return JsonResponse({'success': False, 'error': error}, status=400)
+    
+    if request.method == 'GET':
+        return JsonResponse({
+            'success': True,
+            **EncuestaSatisfaccion.objects.preseleccionar(proyecto.id, **parametros)
+        })
+    
+    admin_user = request.user if request.user.is_authenticated else None
+    if not admin_user:
+        from django.contrib.auth.models import User
+        admin_user = User.objects.filter(is_superuser=True).first()
+    
+    resultado = proyecto.aplicar_preseleccion(parametros, admin_user, moderador_id=datos.get('moderador_id'))
+    if not resultado['success']:
+        return JsonResponse(resultado, status=400)
+    return JsonResponse(resultado)
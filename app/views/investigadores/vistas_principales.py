@@ -2,7 +2,9 @@ from django.shortcuts import render, redirect
 from django.db.models import Count, Q
 from ...forms import ProyectoForm
 from ...models import Proyecto, Experto
+from ...perfilado import presupuesto_consultas
 
+@presupuesto_consultas(2)
 def inicio_investigador(request):
     """Vista principal del investigador"""
     proyectos = Proyecto.objects.con_estadisticas()
@@ -3,6 +3,10 @@ ASGI config for project project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+The chat stream (``stream_mensajes``, Server-Sent Events) needs this entry
+point, e.g. ``uvicorn project.asgi:application``. Under WSGI the stream
+answers 204 and the browser falls back to polling ``obtener_mensajes_ajax``.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
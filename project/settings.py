@@ -42,7 +42,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'app.middleware.PerfiladoMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'app.middleware.LecturasPrimariaMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -55,7 +57,8 @@ ROOT_URLCONF = 'project.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates que además mide el render para Server-Timing (app/perfilado.py)
+        'BACKEND': 'app.perfilado.DjangoTemplatesPerfilados',
         'DIRS': [BASE_DIR / 'app/templates'],  # Ruta corregida
         'APP_DIRS': True,
         'OPTIONS': {
@@ -79,7 +82,44 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
-    }
+        'OPTIONS': {
+            # Las transacciones toman el lock de escritura al empezar (BEGIN IMMEDIATE):
+            # si no, una transacción que lee y luego escribe falla con "database is locked"
+            # sin esperar cuando otra escribe a la vez
+            'transaction_mode': 'IMMEDIATE',
+            # Segundos que una conexión espera el lock antes de fallar (busy timeout)
+            'timeout': 20,
+        },
+    },
+    # Lecturas del ORM (app.routers.LecturaEscrituraRouter): por defecto el mismo archivo
+    # abierto en modo sólo lectura. SQLITE_LECTURA apunta a otro archivo (p. ej. una copia
+    # hecha con ".backup") para probar en local con una réplica separada.
+    'lectura': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': f"file:{os.environ.get('SQLITE_LECTURA', BASE_DIR / 'db.sqlite3')}?mode=ro",
+        'OPTIONS': {
+            'timeout': 20,
+        },
+        'TEST': {
+            'MIRROR': 'default',
+        },
+    },
+}
+
+DATABASE_ROUTERS = ['app.routers.LecturaEscrituraRouter']
+
+# Tras un POST, segundos durante los que ese navegador sigue leyendo de la primaria
+LECTURA_FIJAR_SEGUNDOS = 5
+
+# PRAGMA aplicados a cada conexión SQLite nueva (app/signals.py, connection_created).
+# WAL permite leer mientras otra conexión escribe; con WAL, synchronous=NORMAL
+# sólo arriesga las últimas transacciones ante un corte de luz, no la integridad.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'cache_size': -64000,       # en KiB (64 MB) por conexión
+    'mmap_size': 268435456,     # 256 MB de lectura por memoria mapeada
+    'temp_store': 'memory',
 }
 
 
@@ -126,3 +166,48 @@ STATICFILES_DIRS = [
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# locmem es por proceso; en producción con varios workers usar un backend
+# compartido (Redis/Memcached) para que la invalidación llegue a todos.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'tesis-default',
+    }
+}
+
+# Dashboard de expertos: cache por experto invalidado por signals (app/signals.py)
+DASHBOARD_CACHE_ALIAS = 'default'
+DASHBOARD_CACHE_TIMEOUT = 300
+
+# Membresías por proyecto ({experto_id: (estado, es_moderador)}) para permisos.
+# Con locmem un experto quitado del proyecto conserva acceso en los otros workers
+# hasta el timeout: se mantiene corto. Con varios workers apuntar el alias a un
+# backend compartido para que la invalidación por signals llegue a todos.
+MEMBRESIAS_CACHE_ALIAS = 'default'
+MEMBRESIAS_CACHE_TIMEOUT = 30
+
+# Chat: ring buffer en memoria de mensajes recientes (por proceso)
+CHAT_BUFFER_TAMANO = 200
+CHAT_BUFFER_MAX_PROYECTOS = 100
+
+# Resultados de votación: cache por proyecto (se invalida al votar). Igual que las
+# membresías: timeout corto con locmem, o un alias compartido con varios workers
+RESULTADOS_VOTACION_CACHE_ALIAS = 'default'
+RESULTADOS_VOTACION_CACHE_TIMEOUT = 30
+
+# Coeficiente K: perfil de pesos activo por proyecto (las calculadoras compiladas viven en memoria).
+# Tras crear una versión, otro worker con locmem puntúa con la anterior hasta el timeout
+PERFIL_K_CACHE_ALIAS = 'default'
+PERFIL_K_CACHE_TIMEOUT = 30
+
+# Perfilado por request (app.middleware.PerfiladoMiddleware): cabecera Server-Timing con
+# consultas SQL, tiempo de plantillas y total. Desactivar si no se quiere exponer tiempos.
+PERFILADO_SERVER_TIMING = True
+# Superar el presupuesto de @presupuesto_consultas siempre deja un warning en el log
+# (logger app.perfilado); en modo estricto además lanza PresupuestoConsultasExcedido
+PRESUPUESTO_CONSULTAS_ESTRICTO = False
@@ -78,10 +78,22 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     }
 
+    // ETag de la última respuesta del polling y la URL a la que corresponde
+    let etagMensajes = null;
+    let urlEtagMensajes = null;
+
     async function obtenerNuevosMensajes() {
         try {
             const url = `/ajax/proyecto/${proyectoId}/chat/${expertoId}/mensajes/?ultimo_id=${ultimoId}`;
-            const response = await fetch(url);
+            const headers = {};
+            if (etagMensajes && urlEtagMensajes === url) {
+                headers['If-None-Match'] = etagMensajes;
+            }
+            const response = await fetch(url, { headers, cache: 'no-store' });
+            // 304: sin mensajes nuevos, el servidor no ejecutó la consulta
+            if (response.status === 304) return;
+            etagMensajes = response.headers.get('ETag');
+            urlEtagMensajes = url;
             const data = await response.json();
 
             if (data.success && data.mensajes.length > 0) {
@@ -95,6 +107,52 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     }
 
+    // Stream SSE (ASGI). Si el navegador o el servidor no lo soportan,
+    // se usa el polling clásico sobre obtener_mensajes_ajax.
+    let pollingInterval = null;
+
+    function iniciarPolling() {
+        if (pollingInterval) return;
+        console.log('🔁 Usando polling de mensajes');
+        pollingInterval = setInterval(obtenerNuevosMensajes, 3000);
+    }
+
+    function iniciarStream() {
+        if (!window.EventSource) {
+            iniciarPolling();
+            return;
+        }
+
+        const url = `/ajax/proyecto/${proyectoId}/chat/${expertoId}/stream/?ultimo_id=${ultimoId}`;
+        const source = new EventSource(url);
+        let conectado = false;
+
+        source.onopen = function() {
+            conectado = true;
+            console.log('📡 Stream de mensajes conectado');
+        };
+
+        source.addEventListener('mensaje', function(e) {
+            const mensaje = JSON.parse(e.data);
+            agregarMensajeAlDOM(mensaje, mensaje.es_propio);
+            ultimoId = Math.max(ultimoId, mensaje.id);
+        });
+
+        // Se perdió el acceso (tormenta cerrada, experto fuera del proyecto)
+        source.addEventListener('cerrado', function(e) {
+            source.close();
+            mostrarToast(JSON.parse(e.data).error, 'warning');
+        });
+
+        source.onerror = function() {
+            // Sin conexión inicial (204, 403, WSGI...) → polling
+            if (!conectado || source.readyState === EventSource.CLOSED) {
+                source.close();
+                iniciarPolling();
+            }
+        };
+    }
+
     function mostrarToast(mensaje, tipo = 'info') {
         const toastContainer = document.getElementById('toastContainer');
         if (!toastContainer) return;
@@ -133,5 +191,7 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     });
 
+    iniciarStream();
+
     console.log('✅ Chat inicializado perfectamente');
 });
\ No newline at end of file
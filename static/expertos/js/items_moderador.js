@@ -211,6 +211,113 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     });
 
+    // ==================== BÚSQUEDA Y PROMOCIÓN DE MENSAJES ====================
+
+    const formBusqueda = document.getElementById('formBusqueda');
+    const inputBusqueda = document.getElementById('inputBusqueda');
+    const tipoBusqueda = document.getElementById('tipoBusqueda');
+    const resultadosBusqueda = document.getElementById('resultadosBusqueda');
+    const btnMasResultados = document.getElementById('btnMasResultados');
+    let cursorBusqueda = null;
+
+    function resultadoBusqueda(resultado, tipo) {
+        // El servidor ya escapa el texto; sólo añade <mark> alrededor de las coincidencias
+        if (tipo === 'items') {
+            return `
+                <div class="border-bottom py-2 small">
+                    <div class="fw-bold">${resultado.titulo_resaltado}</div>
+                    <div class="text-muted">${resultado.descripcion_resaltada}</div>
+                    <small class="text-muted">${resultado.experto_nombre} · ${resultado.estado}</small>
+                </div>`;
+        }
+        return `
+            <div class="border-bottom py-2 small d-flex justify-content-between align-items-start">
+                <div class="flex-grow-1 me-2">
+                    <div>${resultado.contenido_resaltado}</div>
+                    <small class="text-muted">${resultado.experto_nombre} · ${resultado.fecha_envio}</small>
+                </div>
+                <button class="btn btn-outline-success btn-sm promover-mensaje"
+                        data-mensaje-id="${resultado.id}" title="Convertir en idea">
+                    <i class="fas fa-lightbulb"></i>
+                </button>
+            </div>`;
+    }
+
+    async function buscar(continuar = false) {
+        const texto = inputBusqueda.value.trim();
+        if (!texto) return;
+
+        const params = new URLSearchParams({
+            q: texto,
+            tipo: tipoBusqueda.value,
+            moderador_id: moderadorId
+        });
+        if (continuar && cursorBusqueda) {
+            params.set('cursor', cursorBusqueda);
+        }
+
+        try {
+            const response = await fetch(`/api/proyecto/${proyectoId}/buscar/?${params}`);
+            const data = await response.json();
+
+            if (!data.success) {
+                mostrarToast('❌ ' + data.error, 'danger');
+                return;
+            }
+
+            const html = data.resultados.map(r => resultadoBusqueda(r, data.tipo)).join('');
+            if (continuar) {
+                resultadosBusqueda.insertAdjacentHTML('beforeend', html);
+            } else {
+                resultadosBusqueda.innerHTML = html || '<p class="text-muted small text-center mb-0">Sin resultados</p>';
+            }
+            cursorBusqueda = data.siguiente_cursor;
+            btnMasResultados.classList.toggle('d-none', !cursorBusqueda);
+        } catch (error) {
+            console.error('❌ Error buscando:', error);
+            mostrarToast('Error de conexión', 'danger');
+        }
+    }
+
+    formBusqueda?.addEventListener('submit', function(e) {
+        e.preventDefault();
+        buscar();
+    });
+    tipoBusqueda?.addEventListener('change', () => buscar());
+    btnMasResultados?.addEventListener('click', () => buscar(true));
+
+    resultadosBusqueda?.addEventListener('click', async function(e) {
+        const btnPromover = e.target.closest('.promover-mensaje');
+        if (!btnPromover) return;
+
+        btnPromover.disabled = true;
+        try {
+            const response = await fetch(
+                `/api/proyecto/${proyectoId}/mensajes/${btnPromover.dataset.mensajeId}/promover/`, {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                    'X-CSRFToken': document.querySelector('[name=csrfmiddlewaretoken]').value
+                },
+                body: JSON.stringify({ moderador_id: moderadorId })
+            });
+            const data = await response.json();
+
+            if (data.success) {
+                agregarItemAlDOM(data.item);
+                btnPromover.innerHTML = '<i class="fas fa-check"></i>';
+                mostrarToast('✅ Mensaje convertido en idea', 'success');
+            } else {
+                btnPromover.disabled = false;
+                mostrarToast('❌ ' + data.error, 'danger');
+            }
+        } catch (error) {
+            btnPromover.disabled = false;
+            console.error('❌ Error promoviendo mensaje:', error);
+            mostrarToast('Error de conexión', 'danger');
+        }
+    });
+
     function mostrarToast(mensaje, tipo = 'info') {
         const toastContainer = document.getElementById('toastContainer');
         if (!toastContainer) return;
@@ -77,6 +77,80 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     });
 
+    // Guardar todos los votos con evaluación en una sola petición
+    const btnGuardarTodos = document.getElementById('guardarTodos');
+
+    function votosPendientes() {
+        const votos = [];
+        document.querySelectorAll('.guardar-voto').forEach(boton => {
+            const tr = boton.closest('tr[data-item-id]');
+            const checkbox = tr?.querySelector('input[type="checkbox"]');
+            const select = tr?.querySelector('select.evaluacion-select');
+            if (!checkbox || !select || !select.value) return;
+            votos.push({
+                item_id: parseInt(tr.dataset.itemId),
+                de_acuerdo: checkbox.checked,
+                evaluacion: parseInt(select.value)
+            });
+        });
+        return votos;
+    }
+
+    if (btnGuardarTodos) {
+        btnGuardarTodos.addEventListener('click', async function() {
+            const votos = votosPendientes();
+            if (votos.length === 0) {
+                mostrarToast('❌ Selecciona al menos una evaluación', 'danger');
+                return;
+            }
+
+            const csrfToken = getCSRFToken();
+            if (!csrfToken) {
+                mostrarToast('❌ Error CSRF: Token no encontrado', 'danger');
+                return;
+            }
+
+            btnGuardarTodos.disabled = true;
+            try {
+                const response = await fetch(`/api/proyecto/${proyectoId}/votar-lote/`, {
+                    method: 'POST',
+                    headers: {
+                        'Content-Type': 'application/json',
+                        'X-CSRFToken': csrfToken
+                    },
+                    body: JSON.stringify({
+                        experto_id: expertoId,
+                        votos: votos
+                    })
+                });
+
+                const data = await response.json();
+                console.log('🗳️ RESPUESTA LOTE:', data);
+
+                if (!data.success) {
+                    mostrarToast('❌ ' + data.error, 'danger');
+                    btnGuardarTodos.disabled = false;
+                    return;
+                }
+
+                data.resultados
+                    .filter(r => !r.success)
+                    .forEach(r => mostrarToast(`❌ Item ${r.item_id}: ${r.error}`, 'danger'));
+
+                if (data.errores === 0) {
+                    location.reload();
+                } else {
+                    mostrarToast(`✅ ${data.message}`, 'success');
+                    setTimeout(() => location.reload(), 2000);
+                }
+            } catch (error) {
+                console.error('❌ Error completo:', error);
+                mostrarToast('Error de red: ' + error.message, 'danger');
+                btnGuardarTodos.disabled = false;
+            }
+        });
+    }
+
     // Habilitar botón cuando se selecciona evaluación
     document.querySelectorAll('.evaluacion-select').forEach(select => {
         select.addEventListener('change', function() {
@@ -85,6 +159,9 @@ document.addEventListener('DOMContentLoaded', function() {
             if (boton) {
                 boton.disabled = !this.value;
             }
+            if (btnGuardarTodos) {
+                btnGuardarTodos.disabled = votosPendientes().length === 0;
+            }
         });
     });
 
@@ -43,33 +43,58 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     }
 
-    // Búsqueda en tiempo real
+    // Búsqueda de texto libre en el servidor (FTS5), con debounce
     const buscarInput = document.getElementById('buscarInput');
     const btnBuscar = document.getElementById('btnBuscar');
+    let catalogoGuardado = null;
+    let temporizadorBusqueda = null;
 
-    function filtrarTabla() {
-        const texto = buscarInput ? buscarInput.value.toLowerCase() : '';
-        const filas = document.querySelectorAll('#tablaExpertos tbody tr');
+    function restaurarCatalogo() {
+        if (catalogoGuardado === null) return;
+        document.querySelector('#tablaExpertos tbody').innerHTML = catalogoGuardado;
+        catalogoGuardado = null;
+        document.getElementById('contenedorCargarMas')?.classList.toggle(
+            'd-none', !document.getElementById('btnCargarMas')?.dataset.cursor
+        );
+        actualizarBotonLote();
+    }
 
-        filas.forEach(fila => {
-            if (fila.querySelector('td[colspan]')) return; // Skip "no hay datos"
+    function buscarExpertos() {
+        const texto = buscarInput ? buscarInput.value.trim() : '';
+        if (texto.length < 2) {
+            restaurarCatalogo();
+            return;
+        }
 
-            const nombre = fila.cells[0].textContent.toLowerCase();
-            const cargo = fila.cells[2].textContent.toLowerCase();
+        fetch(`/ajax/proyecto/${proyectoId}/expertos/buscar/?${new URLSearchParams({ q: texto })}`)
+            .then(response => response.json())
+            .then(data => {
+                if (!data.success || buscarInput.value.trim() !== texto) return;
 
-            if (nombre.includes(texto) || cargo.includes(texto)) {
-                fila.style.display = '';
-            } else {
-                fila.style.display = 'none';
-            }
-        });
+                const tbody = document.querySelector('#tablaExpertos tbody');
+                if (catalogoGuardado === null) {
+                    catalogoGuardado = tbody.innerHTML;
+                }
+                tbody.innerHTML = data.expertos.length
+                    ? data.expertos.map(e => filaExperto(e, data.proceso_finalizado)).join('')
+                    : '<tr><td colspan="7" class="text-center">Sin resultados</td></tr>';
+                document.getElementById('contenedorCargarMas')?.classList.add('d-none');
+                actualizarBotonLote();
+            })
+            .catch(error => {
+                console.error('Error en la búsqueda:', error);
+                mostrarToast('error', 'Error de conexión con el servidor');
+            });
     }
 
     if (buscarInput) {
-        buscarInput.addEventListener('keyup', filtrarTabla);
+        buscarInput.addEventListener('keyup', function() {
+            clearTimeout(temporizadorBusqueda);
+            temporizadorBusqueda = setTimeout(buscarExpertos, 250);
+        });
     }
     if (btnBuscar) {
-        btnBuscar.addEventListener('click', filtrarTabla);
+        btnBuscar.addEventListener('click', buscarExpertos);
     }
 
     // Modal de confirmación de encuesta
@@ -78,17 +103,20 @@ document.addEventListener('DOMContentLoaded', function() {
     const modalConfirmar = modalConfirmarEl ? new bootstrap.Modal(modalConfirmarEl) : null;
     const nombreExpertoSpan = document.getElementById('nombreExpertoEncuesta');
 
-    document.querySelectorAll('.btn-encuestar:not([disabled])').forEach(btn => {
-        btn.addEventListener('click', function() {
-            expertoActual = {
-                expertoId: this.dataset.expertoId,
-                nombre: this.closest('tr').cells[0].textContent.trim()
-            };
-            if (nombreExpertoSpan) {
-                nombreExpertoSpan.textContent = expertoActual.nombre;
-            }
-            modalConfirmar?.show();
-        });
+    // Delegación en el tbody: las filas cargadas por AJAX también responden
+    const tbodyExpertos = document.querySelector('#tablaExpertos tbody');
+
+    tbodyExpertos?.addEventListener('click', function(event) {
+        const btn = event.target.closest('.btn-encuestar:not([disabled])');
+        if (!btn) return;
+        expertoActual = {
+            expertoId: btn.dataset.expertoId,
+            nombre: btn.closest('tr').cells[0].textContent.trim()
+        };
+        if (nombreExpertoSpan) {
+            nombreExpertoSpan.textContent = expertoActual.nombre;
+        }
+        modalConfirmar?.show();
     });
 
     // ===== ENVIAR ENCUENTA CON CSRF CORRECTO =====
@@ -151,53 +179,280 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     }
 
+    // ===== ENVÍO DE ENCUESTAS EN LOTE =====
+    const btnEncuestarSeleccionados = document.getElementById('btnEncuestarSeleccionados');
+    const btnEncuestarCategoria = document.getElementById('btnEncuestarCategoria');
+    const chkTodos = document.getElementById('chkTodos');
+
+    function expertosMarcados() {
+        return Array.from(document.querySelectorAll('.chk-encuestar:checked'))
+            .map(chk => parseInt(chk.dataset.expertoId));
+    }
+
+    function actualizarBotonLote() {
+        if (btnEncuestarSeleccionados) {
+            btnEncuestarSeleccionados.disabled = expertosMarcados().length === 0;
+        }
+    }
+
+    tbodyExpertos?.addEventListener('change', function(event) {
+        if (event.target.matches('.chk-encuestar')) {
+            actualizarBotonLote();
+        }
+    });
+
+    if (chkTodos) {
+        chkTodos.addEventListener('change', function() {
+            document.querySelectorAll('.chk-encuestar').forEach(chk => {
+                chk.checked = this.checked;
+            });
+            actualizarBotonLote();
+        });
+    }
+
+    function marcarEnviadas(expertoIds) {
+        expertoIds.forEach(expertoId => {
+            const btn = document.querySelector(`.btn-encuestar[data-experto-id="${expertoId}"]`);
+            if (btn) {
+                btn.disabled = true;
+                btn.innerHTML = '<i class="fas fa-paper-plane me-1"></i> Enviada';
+                btn.classList.remove('btn-outline-primary');
+                btn.classList.add('btn-secondary');
+            }
+            document.querySelector(`.chk-encuestar[data-experto-id="${expertoId}"]`)?.remove();
+        });
+        actualizarBotonLote();
+    }
+
+    function quitarRecomendados(expertoIds) {
+        expertoIds.forEach(expertoId => {
+            document.querySelector(`.fila-recomendado[data-experto-id="${expertoId}"]`)?.remove();
+        });
+        if (!document.querySelector('.fila-recomendado')) {
+            document.getElementById('cardRecomendados')?.remove();
+        }
+    }
+
+    function enviarEncuestasLote(payload) {
+        const csrfToken = getCSRFToken();
+        if (!csrfToken) {
+            alert('Error: No se pudo obtener el token CSRF. Actualiza la página.');
+            return;
+        }
+
+        fetch(`/ajax/proyecto/${proyectoId}/enviar-encuestas/`, {
+            method: 'POST',
+            headers: {
+                'X-CSRFToken': csrfToken,
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify(payload)
+        })
+        .then(response => response.json())
+        .then(data => {
+            if (data.success) {
+                mostrarToast('success', data.message);
+                marcarEnviadas([...data.creadas, ...data.existentes]);
+                quitarRecomendados([...data.creadas, ...data.existentes]);
+            } else {
+                mostrarToast('error', data.error || 'Error al enviar encuestas');
+            }
+        })
+        .catch(error => {
+            console.error('Error en la petición:', error);
+            mostrarToast('error', 'Error de conexión con el servidor');
+        });
+    }
+
+    if (btnEncuestarSeleccionados) {
+        btnEncuestarSeleccionados.addEventListener('click', function() {
+            const expertoIds = expertosMarcados();
+            if (expertoIds.length === 0) return;
+            if (confirm(`¿Enviar encuesta a ${expertoIds.length} expertos?`)) {
+                enviarEncuestasLote({ experto_ids: expertoIds });
+            }
+        });
+    }
+
+    const btnEncuestarRecomendados = document.getElementById('btnEncuestarRecomendados');
+    if (btnEncuestarRecomendados) {
+        btnEncuestarRecomendados.addEventListener('click', function() {
+            const expertoIds = Array.from(document.querySelectorAll('.fila-recomendado'))
+                .map(fila => parseInt(fila.dataset.expertoId));
+            if (expertoIds.length === 0) return;
+            if (confirm(`¿Enviar encuesta a los ${expertoIds.length} expertos recomendados?`)) {
+                enviarEncuestasLote({ experto_ids: expertoIds });
+            }
+        });
+    }
+
+    if (btnEncuestarCategoria) {
+        btnEncuestarCategoria.addEventListener('click', function() {
+            if (confirm('¿Enviar encuesta a todos los expertos de la categoría del proyecto?')) {
+                enviarEncuestasLote({ todos_categoria: true });
+            }
+        });
+    }
+
     // Ver detalles de experto
     const modalDetallesEl = document.getElementById('modalDetallesExperto');
     const modalDetalles = modalDetallesEl ? new bootstrap.Modal(modalDetallesEl) : null;
     const detallesContent = document.getElementById('detallesExpertoContent');
 
-    document.querySelectorAll('.btn-ver-detalles').forEach(btn => {
-        btn.addEventListener('click', function() {
-            const expertoId = this.dataset.expertoId;
+    // Detalles ya descargados por experto: {etag, data}. Se revalidan con If-None-Match
+    const detallesCache = new Map();
 
-            fetch(`/ajax/experto/${expertoId}/detalles/`)
-                .then(response => response.json())
-                .then(data => {
-                    if (detallesContent) {
-                        detallesContent.innerHTML = `
-                            <div class="row">
-                                <div class="col-md-6">
-                                    <p><strong>Nombre:</strong> ${data.nombre}</p>
-                                    <p><strong>Email:</strong> ${data.email}</p>
-                                    <p><strong>Grado:</strong> ${data.grado}</p>
-                                    <p><strong>Cargo:</strong> ${data.cargo}</p>
-                                </div>
-                                <div class="col-md-6">
-                                    <p><strong>Departamento:</strong> ${data.departamento}</p>
-                                    <p><strong>Años de Experiencia:</strong> ${data.experiencia}</p>
-                                    <p><strong>Coeficiente K:</strong> ${data.coeficiente}</p>
-                                    <p><strong>Índice:</strong> ${data.indice}</p>
-                                </div>
+    function obtenerDetalles(expertoId) {
+        const guardado = detallesCache.get(expertoId);
+        const headers = guardado ? { 'If-None-Match': guardado.etag } : {};
+        return fetch(`/ajax/experto/${expertoId}/detalles/`, { headers, cache: 'no-store' })
+            .then(response => {
+                if (response.status === 304 && guardado) return guardado.data;
+                return response.json().then(data => {
+                    const etag = response.headers.get('ETag');
+                    if (response.ok && etag) detallesCache.set(expertoId, { etag, data });
+                    return data;
+                });
+            });
+    }
+
+    tbodyExpertos?.addEventListener('click', function(event) {
+        const btn = event.target.closest('.btn-ver-detalles');
+        if (!btn) return;
+        const expertoId = btn.dataset.expertoId;
+
+        obtenerDetalles(expertoId)
+            .then(data => {
+                if (detallesContent) {
+                    detallesContent.innerHTML = `
+                        <div class="row">
+                            <div class="col-md-6">
+                                <p><strong>Nombre:</strong> ${data.nombre}</p>
+                                <p><strong>Email:</strong> ${data.email}</p>
+                                <p><strong>Grado:</strong> ${data.grado}</p>
+                                <p><strong>Cargo:</strong> ${data.cargo}</p>
+                            </div>
+                            <div class="col-md-6">
+                                <p><strong>Departamento:</strong> ${data.departamento}</p>
+                                <p><strong>Años de Experiencia:</strong> ${data.experiencia}</p>
+                                <p><strong>Coeficiente K:</strong> ${data.coeficiente}</p>
+                                <p><strong>Índice:</strong> ${data.indice}</p>
                             </div>
-                            <hr>
-                            <div class="row">
-                                <div class="col-12">
-                                    <h6>Estadísticas</h6>
-                                    <p>Total de encuestas: ${data.total_encuestas}</p>
-                                    <p>Proyectos activos: ${data.proyectos_activos}</p>
-                                    <p>Total de aportes: ${data.total_aportes}</p>
-                                </div>
+                        </div>
+                        <hr>
+                        <div class="row">
+                            <div class="col-12">
+                                <h6>Estadísticas</h6>
+                                <p>Total de encuestas: ${data.total_encuestas} (${data.encuestas_completadas} completadas)</p>
+                                <p>K promedio: ${data.k_promedio ?? 'N/A'}</p>
+                                <p>Proyectos en los que fue seleccionado: ${data.proyectos_seleccionado}</p>
+                                <p>Proyectos activos: ${data.proyectos_activos}</p>
+                                <p>Total de aportes: ${data.total_aportes}</p>
+                                <p>Votos emitidos: ${data.votos_emitidos}</p>
                             </div>
-                        `;
+                        </div>
+                    `;
+                }
+                modalDetalles?.show();
+            })
+            .catch(error => {
+                console.error('Error al cargar detalles:', error);
+                mostrarToast('error', 'Error al cargar los detalles del experto');
+            });
+    });
+
+    // ===== CATÁLOGO PAGINADO (KEYSET) =====
+    const btnCargarMas = document.getElementById('btnCargarMas');
+    const contenedorCargarMas = document.getElementById('contenedorCargarMas');
+
+    function escaparHtml(texto) {
+        const div = document.createElement('div');
+        div.textContent = texto ?? '';
+        return div.innerHTML;
+    }
+
+    function accionesExperto(experto, finalizado) {
+        if (finalizado) {
+            return `<button class="btn btn-secondary btn-sm" disabled title="Proceso finalizado">
+                        <i class="fas fa-lock me-1"></i> Bloqueado
+                    </button>`;
+        }
+        if (experto.estado_encuesta === 'completada') {
+            return `<span class="badge bg-success">
+                        <i class="fas fa-check-circle me-1"></i> Completada
+                    </span>`;
+        }
+        if (experto.estado_encuesta === 'pendiente') {
+            return `<button class="btn btn-secondary btn-sm" disabled>
+                        <i class="fas fa-paper-plane me-1"></i> Enviada
+                    </button>`;
+        }
+        return `<button class="btn btn-outline-primary btn-sm btn-encuestar"
+                        data-experto-id="${experto.id}" data-proyecto-id="${proyectoId}">
+                    <i class="fas fa-poll me-1"></i> Encuestar
+                </button>`;
+    }
+
+    function filaExperto(experto, finalizado) {
+        const claseIndice = experto.indice === null ? 'bg-secondary'
+            : (experto.indice >= 0.8 ? 'bg-success' : 'bg-warning');
+        const marcable = !finalizado && !experto.estado_encuesta;
+        return `
+            <tr>
+                <td><strong>${escaparHtml(experto.nombre)}</strong></td>
+                <td><span class="badge ${claseIndice}">${experto.coeficiente ?? 'N/A'}</span></td>
+                <td>${escaparHtml(experto.cargo || 'No especificado')}</td>
+                <td><span class="badge bg-info">${escaparHtml(experto.grado)}</span></td>
+                <td><span class="badge bg-dark">${experto.anos_experiencia || 'N/A'}</span></td>
+                <td>
+                    <div class="btn-group btn-group-sm">
+                        ${accionesExperto(experto, finalizado)}
+                        <button class="btn btn-outline-info btn-sm btn-ver-detalles" data-experto-id="${experto.id}">
+                            <i class="fas fa-eye"></i>
+                        </button>
+                    </div>
+                </td>
+                <td class="text-center">
+                    ${marcable ? `<input class="form-check-input chk-encuestar" type="checkbox" data-experto-id="${experto.id}">` : ''}
+                </td>
+            </tr>`;
+    }
+
+    if (btnCargarMas) {
+        btnCargarMas.addEventListener('click', function() {
+            const params = new URLSearchParams({
+                orden: this.dataset.orden,
+                cursor: this.dataset.cursor
+            });
+            this.disabled = true;
+
+            fetch(`/ajax/proyecto/${proyectoId}/expertos/?${params}`)
+                .then(response => response.json())
+                .then(data => {
+                    if (!data.success) {
+                        mostrarToast('error', data.error || 'Error al cargar expertos');
+                        return;
+                    }
+                    tbodyExpertos.insertAdjacentHTML(
+                        'beforeend',
+                        data.expertos.map(e => filaExperto(e, data.proceso_finalizado)).join('')
+                    );
+
+                    if (data.siguiente_cursor) {
+                        this.dataset.cursor = data.siguiente_cursor;
+                    } else {
+                        contenedorCargarMas?.classList.add('d-none');
                     }
-                    modalDetalles?.show();
                 })
                 .catch(error => {
-                    console.error('Error al cargar detalles:', error);
-                    mostrarToast('error', 'Error al cargar los detalles del experto');
+                    console.error('Error al cargar expertos:', error);
+                    mostrarToast('error', 'Error de conexión con el servidor');
+                })
+                .finally(() => {
+                    this.disabled = false;
                 });
         });
-    });
+    }
 
     // Botones de acción
     const btnDetener = document.getElementById('btnDetener');
@@ -144,5 +144,164 @@ document.addEventListener('DOMContentLoaded', function() {
 		});
 	});
 
+    // ==================== PRESELECCIÓN AUTOMÁTICA ====================
+    const formPreseleccion = document.getElementById('formPreseleccion');
+    const btnAplicarPreseleccion = document.getElementById('btnAplicarPreseleccion');
+    const resultadoPreseleccion = document.getElementById('resultadoPreseleccion');
+
+    function escaparHtml(texto) {
+        const div = document.createElement('div');
+        div.textContent = texto ?? '';
+        return div.innerHTML;
+    }
+
+    function parametrosPreseleccion() {
+        const parametros = {
+            total: document.getElementById('preseleccionTotal').value,
+            k_minimo: document.getElementById('preseleccionKMinimo').value || 0,
+            diversificar: document.getElementById('preseleccionDiversificar').checked
+        };
+        const maximo = document.getElementById('preseleccionMaxDepartamento').value;
+        if (maximo) parametros.max_por_departamento = maximo;
+        return parametros;
+    }
+
+    function mostrarPreseleccion(data) {
+        if (!data.seleccion.length) {
+            resultadoPreseleccion.innerHTML = '<p class="text-muted mb-0">Ningún experto cumple las restricciones.</p>';
+            return;
+        }
+        const filas = data.seleccion.map((elegido, i) => `
+            <tr>
+                <td>${i + 1}</td>
+                <td><strong>${escaparHtml(elegido.nombre)}</strong></td>
+                <td><span class="badge bg-success">${parseFloat(elegido.coeficiente_k).toFixed(2)}</span></td>
+                <td>${escaparHtml(elegido.departamento)}</td>
+                <td><span class="badge bg-info">${escaparHtml(elegido.grado_cientifico_display)}</span></td>
+                <td>${elegido.motivo === 'diversidad'
+                    ? '<span class="badge bg-primary">Diversidad</span>'
+                    : '<span class="badge bg-secondary">K</span>'}</td>
+            </tr>
+        `).join('');
+        resultadoPreseleccion.innerHTML = `
+            <p class="text-muted mb-2">
+                ${data.seleccion.length} expertos de ${data.evaluadas} encuestas que cumplen el K mínimo,
+                ${data.departamentos} departamentos y ${data.grados} grados científicos.
+            </p>
+            <div class="table-responsive">
+                <table class="table table-sm mb-0">
+                    <thead><tr><th>#</th><th>Experto</th><th>K</th><th>Departamento</th><th>Grado</th><th>Motivo</th></tr></thead>
+                    <tbody>${filas}</tbody>
+                </table>
+            </div>
+        `;
+    }
+
+    if (formPreseleccion) {
+        // Cambiar un parámetro invalida la vista previa
+        formPreseleccion.addEventListener('input', () => { btnAplicarPreseleccion.disabled = true; });
+
+        formPreseleccion.addEventListener('submit', async function(e) {
+            e.preventDefault();
+            resultadoPreseleccion.innerHTML = '<i class="fas fa-spinner fa-spin me-1"></i> Calculando...';
+            try {
+                const query = new URLSearchParams(parametrosPreseleccion());
+                const response = await fetch(`/api/proyecto/${proyectoId}/preseleccion/?${query}`);
+                const data = await response.json();
+                if (!data.success) {
+                    resultadoPreseleccion.innerHTML = '';
+                    mostrarToast('❌ Error: ' + data.error, 'danger');
+                    return;
+                }
+                mostrarPreseleccion(data);
+                btnAplicarPreseleccion.disabled = !data.seleccion.length;
+            } catch (error) {
+                console.error('Error:', error);
+                resultadoPreseleccion.innerHTML = '';
+                mostrarToast('❌ Error de conexión', 'danger');
+            }
+        });
+
+        btnAplicarPreseleccion.addEventListener('click', async function() {
+            const radioSeleccionado = document.querySelector('input[name="moderador_id"]:checked');
+            const mensaje = radioSeleccionado
+                ? '¿Aplicar la preselección a la lista de chequeo? El resto de encuestas completadas quedará como no seleccionado.'
+                : '¿Aplicar la preselección? Sin moderador marcado, moderará el primer experto de la lista.';
+            if (!confirm(mensaje)) {
+                return;
+            }
+
+            btnAplicarPreseleccion.disabled = true;
+            btnAplicarPreseleccion.innerHTML = '<i class="fas fa-spinner fa-spin me-1"></i> Aplicando...';
+            try {
+                const parametros = parametrosPreseleccion();
+                if (radioSeleccionado) parametros.moderador_id = radioSeleccionado.value;
+                const response = await fetch(`/api/proyecto/${proyectoId}/preseleccion/`, {
+                    method: 'POST',
+                    headers: {
+                        'X-CSRFToken': getCSRFToken(),
+                        'Content-Type': 'application/json',
+                    },
+                    body: JSON.stringify(parametros)
+                });
+                const data = await response.json();
+                if (data.success) {
+                    mostrarPreseleccion(data);
+                    mostrarToast('✅ ' + data.message, 'success');
+                    setTimeout(() => {
+                        window.location.href = `/proyecto/${proyectoId}/lista-chequeo/`;
+                    }, 2000);
+                    return;
+                }
+                mostrarToast('❌ Error: ' + data.error, 'danger');
+            } catch (error) {
+                console.error('Error:', error);
+                mostrarToast('❌ Error de conexión', 'danger');
+            }
+            btnAplicarPreseleccion.disabled = false;
+            btnAplicarPreseleccion.innerHTML = '<i class="fas fa-check-double me-1"></i> Aplicar';
+        });
+    }
+
+    // Polling de estados con GET condicional: mientras ninguna encuesta cambie el
+    // servidor responde 304 sin consultarlas
+    let etagEstados = null;
+    let avisoMostrado = false;
+
+    function estadosEnPagina() {
+        const estados = {};
+        document.querySelectorAll('.fila-encuesta').forEach(fila => {
+            estados[fila.dataset.expertoId] = fila.dataset.estado;
+        });
+        return estados;
+    }
+
+    async function revisarEstadosEncuestas() {
+        try {
+            const headers = etagEstados ? { 'If-None-Match': etagEstados } : {};
+            const response = await fetch(`/ajax/proyecto/${proyectoId}/encuestas/estados/`, {
+                headers, cache: 'no-store'
+            });
+            if (response.status === 304 || !response.ok) return;
+            etagEstados = response.headers.get('ETag');
+            const estados = await response.json();
+            const actuales = estadosEnPagina();
+            const cambio = Object.keys(estados).length !== Object.keys(actuales).length
+                || Object.entries(estados).some(([expertoId, estado]) => actuales[expertoId] !== estado);
+            if (cambio && !avisoMostrado) {
+                avisoMostrado = true;
+                mostrarToast(
+                    'Hay cambios en las encuestas. <a href="" class="text-white fw-bold">Recargar</a>', 'info'
+                );
+            }
+        } catch (error) {
+            console.error('Error revisando encuestas:', error);
+        }
+    }
+
+    if (!window.PROCESO_FINALIZADO) {
+        setInterval(revisarEstadosEncuestas, 15000);
+    }
+
     console.log('✅ seleccion_expertos.js inicializado');
 });
\ No newline at end of file